@@ -0,0 +1,42 @@
+"""
+Initial schema
+
+The view_counts table as Base.metadata.create_all built it before any
+later revision: no shard column and no unique constraint. Databases
+created that way by earlier releases are stamped at this revision by
+app.core.migrations and then upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 18:46:07.794620
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "view_counts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_view_counts_event_type", "view_counts", ["event_type"])
+    op.create_index("ix_view_counts_id", "view_counts", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_view_counts_id", table_name="view_counts")
+    op.drop_index("ix_view_counts_event_type", table_name="view_counts")
+    op.drop_table("view_counts")
@@ -0,0 +1,43 @@
+"""
+Unique view count event type
+
+The atomic increment mode upserts with ON CONFLICT (event_type), which
+needs a unique index. Rows duplicated by concurrent ORM increments are
+folded into the oldest one first.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 17:31:20.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migrations import has_column, has_unique
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # A create_all database from a later release already has 0003's shape
+    if has_column(bind, "view_counts", "shard") or has_unique(bind, "view_counts", ["event_type"]):
+        return
+
+    op.execute(
+        "UPDATE view_counts SET count = ("
+        " SELECT SUM(v.count) FROM view_counts v WHERE v.event_type = view_counts.event_type"
+        ") WHERE id IN (SELECT MIN(id) FROM view_counts GROUP BY event_type HAVING COUNT(*) > 1)"
+    )
+    op.execute("DELETE FROM view_counts WHERE id NOT IN (SELECT MIN(id) FROM view_counts GROUP BY event_type)")
+    op.drop_index("ix_view_counts_event_type", table_name="view_counts")
+    op.create_index("ix_view_counts_event_type", "view_counts", ["event_type"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_view_counts_event_type", table_name="view_counts")
+    op.create_index("ix_view_counts_event_type", "view_counts", ["event_type"])
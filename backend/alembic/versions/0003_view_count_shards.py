@@ -0,0 +1,43 @@
+"""
+View count shards
+
+Adds the shard column and moves uniqueness from event_type to
+(event_type, shard). SQLite cannot add a constraint in place, so the
+table is rebuilt there (batch mode); PostgreSQL alters it.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 17:32:29.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_column
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if has_column(op.get_bind(), "view_counts", "shard"):
+        return
+
+    op.drop_index("ix_view_counts_event_type", table_name="view_counts")
+    with op.batch_alter_table("view_counts") as batch:
+        batch.add_column(sa.Column("shard", sa.Integer(), server_default="0", nullable=False))
+        batch.create_unique_constraint("uq_view_counts_event_type_shard", ["event_type", "shard"])
+    op.create_index("ix_view_counts_event_type", "view_counts", ["event_type"])
+
+
+def downgrade() -> None:
+    # Fails if an event type has more than one shard row; compact first
+    op.drop_index("ix_view_counts_event_type", table_name="view_counts")
+    with op.batch_alter_table("view_counts") as batch:
+        batch.drop_constraint("uq_view_counts_event_type_shard", type_="unique")
+        batch.drop_column("shard")
+    op.create_index("ix_view_counts_event_type", "view_counts", ["event_type"], unique=True)
@@ -0,0 +1,44 @@
+"""
+View count buckets
+
+Per-minute, hourly and daily event counts for the time-series endpoint.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 17:34:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_table
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("view_count_minutes", "view_count_hours", "view_count_days")
+
+
+def upgrade() -> None:
+    for name in TABLES:
+        # create_all may have built it already
+        if has_table(op.get_bind(), name):
+            continue
+        op.create_table(
+            name,
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("event_type", sa.String(), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("event_type", "bucket_start", name=f"uq_{name}_event_bucket")
+        )
+
+
+def downgrade() -> None:
+    for name in reversed(TABLES):
+        op.drop_table(name)
@@ -0,0 +1,41 @@
+"""
+Unique visitor sketches
+
+Per-day HyperLogLog sketches of visitors for each event type.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 17:36:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_table
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_all may have built it already
+    if has_table(op.get_bind(), "unique_visitor_sketches"):
+        return
+    op.create_table(
+        "unique_visitor_sketches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("sketch", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event_type", "day", name="uq_unique_visitor_sketches_event_day")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("unique_visitor_sketches")
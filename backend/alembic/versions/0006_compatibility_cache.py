@@ -0,0 +1,41 @@
+"""
+Compatibility cache
+
+Analysis results shared by every worker, keyed on the normalized request.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 17:45:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_table
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_all may have built it already
+    if has_table(op.get_bind(), "compatibility_cache"):
+        return
+    op.create_table(
+        "compatibility_cache",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("result", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key")
+    )
+    op.create_index("ix_compatibility_cache_expires_at", "compatibility_cache", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_compatibility_cache_expires_at", table_name="compatibility_cache")
+    op.drop_table("compatibility_cache")
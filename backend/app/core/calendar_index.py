@@ -0,0 +1,113 @@
+"""
+Calendar Index
+Precomputed day ordinals and per-day birthday tables for O(1) date math
+"""
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+FIRST_YEAR = 1900
+
+# Days in each month and days before each month (index 1-12), for common and leap years
+_DAYS_IN_MONTH = (
+    (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+_DAYS_BEFORE_MONTH = tuple(
+    tuple(sum(days[1:month]) for month in range(13)) for days in _DAYS_IN_MONTH
+)
+
+
+def is_leap(year: int) -> bool:
+    """Gregorian leap year"""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def observed_birthday(year: int, month: int, day: int) -> date:
+    """Birthday in the given year; Feb 29 falls on Feb 28 in common years"""
+    if month == 2 and day == 29 and not is_leap(year):
+        day = 28
+    return date(year, month, day)
+
+
+class CalendarIndex:
+    """
+    Calendar tables for one day, covering FIRST_YEAR to today's year + 1
+
+    `day_number()` is the proleptic Gregorian ordinal (date.toordinal())
+    read from a table of year starts. The birthday tables hold, for every
+    month/day including Feb 29, the days until the next observed birthday
+    and whether this year's birthday has been reached. Feb 29 birthdays
+    are observed on Feb 28 in common years. The index is only valid for
+    `today`; `calendar_index()` rebuilds it after local midnight.
+    """
+
+    def __init__(self, today: date):
+        self.today = today
+        self.last_year = today.year + 1
+        self.today_number = today.toordinal()
+
+        # Ordinal of Jan 1 and leap flag for each covered year
+        self._year_start: List[int] = [
+            date(year, 1, 1).toordinal() for year in range(FIRST_YEAR, self.last_year + 1)
+        ]
+        self._leap: List[int] = [int(is_leap(year)) for year in range(FIRST_YEAR, self.last_year + 1)]
+
+        # [month][day] tables (index 0 unused)
+        self._days_until_birthday = [[0] * 32 for _ in range(13)]
+        self._birthday_reached = [[False] * 32 for _ in range(13)]
+        for month in range(1, 13):
+            for day in range(1, _DAYS_IN_MONTH[1][month] + 1):
+                birthday = observed_birthday(today.year, month, day)
+                reached = birthday <= today
+                if birthday < today:
+                    birthday = observed_birthday(today.year + 1, month, day)
+                self._days_until_birthday[month][day] = birthday.toordinal() - self.today_number
+                self._birthday_reached[month][day] = reached
+
+        # Local midnight after which the index is stale
+        tomorrow = today + timedelta(days=1)
+        self.expires_at = datetime(tomorrow.year, tomorrow.month, tomorrow.day).timestamp()
+
+    def day_number(self, year: int, month: int, day: int) -> int:
+        """
+        Ordinal of a date
+
+        Raises:
+            ValueError: If the date does not exist or is outside the index
+        """
+        if not FIRST_YEAR <= year <= self.last_year:
+            raise ValueError(f"year {year} is outside {FIRST_YEAR}-{self.last_year}")
+        if not 1 <= month <= 12:
+            raise ValueError("month must be in 1..12")
+        leap = self._leap[year - FIRST_YEAR]
+        if not 1 <= day <= _DAYS_IN_MONTH[leap][month]:
+            raise ValueError("day is out of range for month")
+        return self._year_start[year - FIRST_YEAR] + _DAYS_BEFORE_MONTH[leap][month] + day - 1
+
+    def days_since(self, year: int, month: int, day: int) -> int:
+        """Days from a date to today (negative for future dates)"""
+        return self.today_number - self.day_number(year, month, day)
+
+    def days_until_birthday(self, month: int, day: int) -> int:
+        """Days until the next observed birthday (0 on the birthday)"""
+        return self._days_until_birthday[month][day]
+
+    def birthday_tables(self) -> Tuple[List[List[int]], List[List[bool]]]:
+        """[month][day] tables of days until the next birthday and whether it has been reached"""
+        return self._days_until_birthday, self._birthday_reached
+
+    def age(self, year: int, month: int, day: int) -> int:
+        """Completed years, counting a birthday from the day it is observed"""
+        return self.today.year - year - (0 if self._birthday_reached[month][day] else 1)
+
+
+_index: Optional[CalendarIndex] = None
+
+
+def calendar_index() -> CalendarIndex:
+    """Index for the current local day, rebuilt on the first call after midnight"""
+    global _index
+    if _index is None or time.time() >= _index.expires_at:
+        _index = CalendarIndex(date.today())
+    return _index
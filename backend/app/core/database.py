@@ -1,36 +1,188 @@
 """
 Database connection and session management
 """
-from typing import Generator
-from sqlalchemy import create_engine
+import asyncio
+from contextlib import AsyncExitStack
+from types import ModuleType
+from typing import Any, AsyncGenerator, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.core.db_pool import InstrumentedQueuePool, instrument_engine, pool_stats
+from app.core.metrics import metrics_registry
 
-# SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
-)
+# Sync driver prefix -> async driver prefix
+_ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(url: str) -> str:
+    """
+    Rewrite a database URL to use an asyncio driver
+
+    DATABASE_URL keeps its plain form (postgresql://, sqlite://) so tools
+    such as psql and Alembic can share it; the app swaps in asyncpg or
+    aiosqlite here.
+
+    Args:
+        url: Database URL from settings
+
+    Returns:
+        URL with an async driver
+    """
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Pool configuration for create_async_engine from settings
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool,
+    since each new connection would be a separate empty database.
+
+    Args:
+        url: Async database URL
+
+    Returns:
+        Keyword arguments for create_async_engine
+    """
+    options: Dict[str, Any] = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+# Application engine and session factory, created on first use so that
+# importing models or services neither loads a database driver nor needs
+# the database to be reachable
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+metrics_registry.register("db_pool", pool_stats.snapshot)
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Application engine, created and instrumented on first call
+
+    Returns:
+        AsyncEngine for settings.DATABASE_URL
+    """
+    global _engine, _session_factory
+    if _engine is None:
+        url = async_database_url(settings.DATABASE_URL)
+        _engine = create_async_engine(url, **engine_options(url))
+        instrument_engine(
+            _engine.sync_engine,
+            pre_ping_idle_seconds=(
+                settings.DB_POOL_PRE_PING_IDLE_SECONDS if settings.DB_POOL_PRE_PING == "idle" else None
+            )
+        )
+        # Objects stay readable after commit without a refresh query
+        _session_factory = async_sessionmaker(_engine, autoflush=False, expire_on_commit=False)
+    return _engine
+
+
+def SessionLocal() -> AsyncSession:
+    """
+    New session on the application engine
+
+    Returns:
+        AsyncSession (use as an async context manager)
+    """
+    if _session_factory is None:
+        get_engine()
+    return _session_factory()
+
+
+async def dispose_engine() -> None:
+    """Close the pool's connections, if the engine was ever created"""
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+async def warm_pool(connections: int) -> int:
+    """
+    Open pool connections ahead of the first requests
+
+    Each connection runs SELECT 1 and goes back to the pool, so the first
+    requests skip connection setup (TCP, TLS, authentication).
+
+    Args:
+        connections: Connections to open, capped at DB_POOL_SIZE
+
+    Returns:
+        Number of connections opened
+    """
+    engine = get_engine()
+    if not hasattr(engine.pool, "size"):
+        # In-memory SQLite: a single shared connection
+        connections = min(connections, 1)
+    connections = min(connections, settings.DB_POOL_SIZE)
+
+    # Held at the same time, so the pool opens distinct connections
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(connections)),
+            return_exceptions=True
+        )
+        for result in opened:
+            if isinstance(result, BaseException):
+                raise result
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in opened))
+    return connections
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Database session dependency
 
     Yields:
-        Session: SQLAlchemy database session
+        AsyncSession: SQLAlchemy async database session
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def upsert_dialect(db: AsyncSession) -> Optional[ModuleType]:
+    """
+    Dialect module whose insert() supports on_conflict_do_update
+
+    Args:
+        db: Session whose bind decides the dialect
+
+    Returns:
+        sqlalchemy.dialects.postgresql / sqlite, or None if unsupported
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects import postgresql
+        return postgresql
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects import sqlite
+        return sqlite
+    return None
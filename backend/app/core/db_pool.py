@@ -0,0 +1,125 @@
+"""
+Database Pool Instrumentation
+Connection pool statistics and idle-based pre-ping via SQLAlchemy pool events
+"""
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.metrics import Histogram
+
+
+class PoolStats:
+    """Counters and latency histograms for one connection pool"""
+
+    def __init__(self):
+        self.pool: Optional[Pool] = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.pre_pings = 0
+        self.pre_ping_failures = 0
+        # Time spent waiting for a free connection (or opening an overflow one)
+        self.wait_ms = Histogram()
+        # Whole checkout, including checkout events such as pre-ping
+        self.checkout_ms = Histogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool state and cumulative counters"""
+        state: Dict[str, Any] = {}
+        if isinstance(self.pool, AsyncAdaptedQueuePool):
+            state = {
+                "size": self.pool.size(),
+                "checked_out": self.pool.checkedout(),
+                "checked_in": self.pool.checkedin(),
+                "overflow": self.pool.overflow(),
+            }
+        return {
+            "pool_class": type(self.pool).__name__ if self.pool is not None else None,
+            **state,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "pre_pings": self.pre_pings,
+            "pre_ping_failures": self.pre_ping_failures,
+            "wait_ms": self.wait_ms.snapshot(),
+            "checkout_ms": self.checkout_ms.snapshot(),
+        }
+
+
+# Stats for the application engine's pool
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times waits and whole checkouts"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.wait_ms.observe((time.perf_counter() - started) * 1000)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_stats.checkout_ms.observe((time.perf_counter() - started) * 1000)
+
+
+def instrument_engine(sync_engine: Engine, pre_ping_idle_seconds: Optional[float]) -> None:
+    """
+    Attach pool statistics listeners, and optionally pre-ping on idle
+
+    Args:
+        sync_engine: Engine whose pool is instrumented (AsyncEngine.sync_engine)
+        pre_ping_idle_seconds: Ping a connection on checkout only if it has
+            been idle at least this long; None disables idle pre-ping
+    """
+    pool_stats.pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        pool_stats.connects += 1
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        pool_stats.checkins += 1
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        pool_stats.invalidations += 1
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        pool_stats.checkouts += 1
+        if pre_ping_idle_seconds is None:
+            return
+
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < pre_ping_idle_seconds:
+            # Fresh or recently used connection: skip the round trip
+            return
+
+        pool_stats.pre_pings += 1
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            pool_stats.pre_ping_failures += 1
+            # Makes the pool discard this connection and retry the checkout
+            raise exc.DisconnectionError()
@@ -0,0 +1,387 @@
+"""
+Request Instrumentation
+Per-route latency histograms, in-flight gauges, status counters and named
+operation timers, aggregated across uvicorn workers and rendered in the
+Prometheus text format
+"""
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import Histogram, metrics_registry
+from app.core.periodic import PeriodicTask
+
+T = TypeVar("T")
+
+# Label for requests that match no route (404s), so unknown paths cannot grow the label set
+UNMATCHED_ROUTE = "unmatched"
+
+# Paths whose route label is remembered; beyond this, labels are resolved per request
+ROUTE_LABEL_CACHE_SIZE = 4096
+
+RouteKey = Tuple[str, str]  # (method, route template)
+
+
+class OperationTimer:
+    """Context manager timing one named operation; exceptions count as errors"""
+
+    __slots__ = ("_instrumentation", "_name", "_started")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self) -> "OperationTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        # Cancellation and generator close are not failures of the operation
+        failed = exc_type is not None and issubclass(exc_type, Exception)
+        self._instrumentation.observe_operation(self._name, (time.perf_counter() - self._started) * 1000, failed)
+        return False
+
+
+class Instrumentation:
+    """
+    Request and operation metrics of this process
+
+    Recording only touches dicts keyed by tuples; label values are bounded
+    by the route table, status codes and operation names. Each uvicorn
+    worker has its own instance; with a shared snapshot directory every
+    worker writes its state there and the worker answering a scrape sums
+    them (see write_snapshot and collect).
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.latency_ms: Dict[RouteKey, Histogram] = {}
+        self.in_flight: Dict[RouteKey, int] = defaultdict(int)
+        self.operations_ms: Dict[str, Histogram] = {}
+        self.operation_errors: Dict[str, int] = defaultdict(int)
+        self.directory: Optional[str] = None
+
+    def observe_request(self, method: str, route: str, status: int, elapsed_ms: float) -> None:
+        """Record a finished request"""
+        self.requests[method, route, status] += 1
+        histogram = self.latency_ms.get((method, route))
+        if histogram is None:
+            histogram = self.latency_ms[method, route] = Histogram()
+        histogram.observe(elapsed_ms)
+
+    def observe_operation(self, name: str, elapsed_ms: float, failed: bool = False) -> None:
+        """Record one run of a named operation"""
+        histogram = self.operations_ms.get(name)
+        if histogram is None:
+            histogram = self.operations_ms[name] = Histogram()
+        histogram.observe(elapsed_ms)
+        if failed:
+            self.operation_errors[name] += 1
+
+    def timer(self, name: str) -> OperationTimer:
+        """
+        Time a block of code
+
+        Args:
+            name: Operation name, e.g. "openai.chat_completion"
+
+        Returns:
+            Context manager recording the block's duration under `name`
+        """
+        return OperationTimer(self, name)
+
+    def timed(self, name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+        """
+        Decorator timing every call of an async function
+
+        Args:
+            name: Operation name, e.g. "view_count_repository.increment"
+        """
+        def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                with OperationTimer(self, name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def state(self) -> Dict[str, Any]:
+        """Raw counts of this process, as written to snapshot files"""
+        return {
+            "pid": self.pid,
+            "requests": [[method, route, status, count] for (method, route, status), count in self.requests.items()],
+            "latency_ms": [
+                [method, route, histogram.counts, histogram.sum]
+                for (method, route), histogram in self.latency_ms.items()
+            ],
+            "in_flight": [[method, route, count] for (method, route), count in self.in_flight.items() if count],
+            "operations_ms": [[name, histogram.counts, histogram.sum] for name, histogram in self.operations_ms.items()],
+            "operation_errors": [[name, count] for name, count in self.operation_errors.items()],
+        }
+
+    def configure(self, directory: Optional[str]) -> None:
+        """
+        Share metrics with the other workers through a directory
+
+        Args:
+            directory: Directory every worker can write; None or empty keeps
+                metrics per process
+        """
+        self.pid = os.getpid()  # Workers are forked after import
+        self.directory = directory or None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def write_snapshot(self) -> None:
+        """Atomically replace this worker's snapshot file"""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"{self.pid}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.state(), f)
+        os.replace(temporary, path)
+
+    async def flush(self) -> None:
+        """PeriodicTask job: write the snapshot"""
+        self.write_snapshot()
+
+    def collect(self) -> "MergedMetrics":
+        """
+        Sum this process with every other worker's latest snapshot
+
+        Counters and histograms of workers that have exited are kept, so
+        totals never go backwards; their in-flight gauges are dropped.
+        Other workers' values are at most one snapshot interval old.
+        """
+        merged = MergedMetrics()
+        merged.add(self.state(), live=True)
+        for state in self._snapshots():
+            merged.add(state, live=_alive(state["pid"]))
+        return merged
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-route summary for the JSON metrics endpoint"""
+        return self.collect().summary()
+
+    def _snapshots(self) -> Iterable[Dict[str, Any]]:
+        """Snapshot files of the other workers"""
+        if not self.directory:
+            return
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name == f"{self.pid}.json":
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                # Removed or being replaced concurrently
+                continue
+
+
+def _alive(pid: int) -> bool:
+    """Whether a process with this pid exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MergedMetrics:
+    """Metrics summed over one or more process states"""
+
+    def __init__(self):
+        self.processes = 0
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.latency_ms: Dict[RouteKey, Histogram] = defaultdict(Histogram)
+        self.in_flight: Dict[RouteKey, int] = defaultdict(int)
+        self.operations_ms: Dict[str, Histogram] = defaultdict(Histogram)
+        self.operation_errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, state: Dict[str, Any], live: bool) -> None:
+        """Add one process state; gauges only count for live processes"""
+        self.processes += 1
+        for method, route, status, count in state["requests"]:
+            self.requests[method, route, status] += count
+        for method, route, counts, total in state["latency_ms"]:
+            _merge(self.latency_ms[method, route], counts, total)
+        if live:
+            for method, route, count in state["in_flight"]:
+                self.in_flight[method, route] += count
+        for name, counts, total in state["operations_ms"]:
+            _merge(self.operations_ms[name], counts, total)
+        for name, count in state["operation_errors"]:
+            self.operation_errors[name] += count
+
+    def summary(self) -> Dict[str, Any]:
+        """Request counts, 5xx counts and latency percentiles per route"""
+        routes: Dict[str, Dict[str, Any]] = {}
+        for (method, route), histogram in sorted(self.latency_ms.items()):
+            errors = sum(
+                count for (m, r, status), count in self.requests.items()
+                if m == method and r == route and status >= 500
+            )
+            routes[f"{method} {route}"] = {
+                "requests": histogram.count,
+                "errors": errors,
+                "in_flight": self.in_flight.get((method, route), 0),
+                "p50_ms": _round(histogram.quantile(0.5)),
+                "p99_ms": _round(histogram.quantile(0.99)),
+            }
+        operations = {
+            name: {
+                "calls": histogram.count,
+                "errors": self.operation_errors.get(name, 0),
+                "p50_ms": _round(histogram.quantile(0.5)),
+                "p99_ms": _round(histogram.quantile(0.99)),
+            }
+            for name, histogram in sorted(self.operations_ms.items())
+        }
+        return {"processes": self.processes, "routes": routes, "operations": operations}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+
+        lines.append("# HELP http_requests_total HTTP requests by method, route template and status code.")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines.append("# HELP http_request_duration_seconds HTTP request latency by method and route template.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), histogram in sorted(self.latency_ms.items()):
+            _render_histogram(lines, "http_request_duration_seconds", histogram, method=method, route=route)
+
+        lines.append("# HELP http_requests_in_flight HTTP requests being handled by method and route template.")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for (method, route), count in sorted(self.in_flight.items()):
+            lines.append(f"http_requests_in_flight{_labels(method=method, route=route)} {count}")
+
+        lines.append("# HELP app_operation_duration_seconds Duration of named operations (database queries, OpenAI calls).")
+        lines.append("# TYPE app_operation_duration_seconds histogram")
+        for name, histogram in sorted(self.operations_ms.items()):
+            _render_histogram(lines, "app_operation_duration_seconds", histogram, operation=name)
+
+        lines.append("# HELP app_operation_errors_total Named operations that raised an exception.")
+        lines.append("# TYPE app_operation_errors_total counter")
+        for name, histogram in sorted(self.operations_ms.items()):
+            lines.append(f"app_operation_errors_total{_labels(operation=name)} {self.operation_errors.get(name, 0)}")
+
+        lines.append("# HELP app_metrics_processes Worker processes whose metrics are included.")
+        lines.append("# TYPE app_metrics_processes gauge")
+        lines.append(f"app_metrics_processes {self.processes}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(histogram: Histogram, counts: List[int], total: float) -> None:
+    """Add raw bucket counts from a snapshot (same bucket bounds)"""
+    for index, count in enumerate(counts):
+        histogram.counts[index] += count
+    histogram.count += sum(counts)
+    histogram.sum += total
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value as the text format requires"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    """Render a label set"""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histogram(lines: List[str], name: str, histogram: Histogram, **labels: Any) -> None:
+    """Cumulative buckets in seconds, then _sum and _count"""
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=f'{bound / 1000:g}')} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum / 1000:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording every HTTP request
+
+    Requests are labelled with the route template (e.g.
+    /api/v1/views/{event_type}), not the raw path. The template is
+    resolved against the application's routes before the request runs, so
+    the in-flight gauge has it too, and cached per method and path.
+    """
+
+    def __init__(self, app: ASGIApp, instrumentation: Instrumentation):
+        self.app = app
+        self.instrumentation = instrumentation
+        self._routes: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._routes.get((method, scope["path"]))
+        if route is None:
+            route = self._resolve(scope)
+        key = (method, route)
+        in_flight = self.instrumentation.in_flight
+        in_flight[key] += 1
+        status = 500  # Unless the app starts a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight[key] -= 1
+            self.instrumentation.observe_request(method, route, status, (time.perf_counter() - started) * 1000)
+
+    def _resolve(self, scope: Scope) -> str:
+        """Route template of the first matching route (a method mismatch still names the route)"""
+        route = UNMATCHED_ROUTE
+        for candidate in scope["app"].router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate.path
+                break
+            if match == Match.PARTIAL and route == UNMATCHED_ROUTE:
+                route = candidate.path
+        if len(self._routes) < ROUTE_LABEL_CACHE_SIZE:
+            self._routes[scope["method"], scope["path"]] = route
+        return route
+
+
+# Metrics of this process
+instrumentation = Instrumentation()
+metrics_registry.register("http", instrumentation.metrics)
+
+# Snapshot job (started from the app lifespan when METRICS_MULTIPROCESS_DIR is set)
+metrics_snapshot = PeriodicTask(
+    "Metrics snapshot",
+    interval=settings.METRICS_SNAPSHOT_INTERVAL_SECONDS,
+    job=instrumentation.flush
+)
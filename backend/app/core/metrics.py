@@ -0,0 +1,103 @@
+"""
+Metrics Registry
+Named collectors whose snapshots are exposed by the metrics router
+"""
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Sequence
+
+Collector = Callable[[], Dict[str, Any]]
+
+# Default latency buckets in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation within its bucket
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, the largest finite bound if it falls in +Inf,
+            or None with no observations
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts keyed by upper bound, plus count and sum"""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"buckets": buckets, "count": self.count, "sum": round(self.sum, 3)}
+
+
+class MetricsRegistry:
+    """Registry of subsystem metric collectors"""
+
+    def __init__(self):
+        self._collectors: Dict[str, Collector] = {}
+
+    def register(self, name: str, collector: Collector) -> None:
+        """
+        Register a collector under a subsystem name
+
+        Args:
+            name: Subsystem name used as the snapshot key
+            collector: Callable returning the current metric values
+        """
+        self._collectors[name] = collector
+
+    def collect(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Collect current values from one subsystem
+
+        Args:
+            name: Registered subsystem name
+
+        Returns:
+            The subsystem's metric values, or None if it is not registered
+        """
+        collector = self._collectors.get(name)
+        return collector() if collector is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect current values from every registered subsystem
+
+        Returns:
+            Mapping of subsystem name to its metric values
+        """
+        return {name: collector() for name, collector in self._collectors.items()}
+
+
+# Registry instance
+metrics_registry = MetricsRegistry()
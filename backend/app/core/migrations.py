@@ -0,0 +1,121 @@
+"""
+Schema Migrations
+Bring the database to the latest Alembic revision from the application lifespan
+"""
+import fcntl
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+# Revision matching the baseline schema that Base.metadata.create_all used to build
+INITIAL_REVISION = "0001"
+INITIAL_VIEW_COUNT_COLUMNS = {"id", "event_type", "count", "updated_at", "created_at"}
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every worker
+_ADVISORY_LOCK_KEY = 7_202_401
+
+
+@contextmanager
+def _migration_lock(connection: Connection) -> Iterator[None]:
+    """
+    Let one process migrate at a time
+
+    Workers started together would otherwise all see an empty database
+    and race to create the same tables. PostgreSQL holds an advisory lock
+    until the surrounding transaction ends; a SQLite file is guarded by
+    a lock file next to it.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+        yield
+        return
+
+    database = connection.engine.url.database if connection.dialect.name == "sqlite" else None
+    if not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.migrate.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def has_table(connection: Connection, table: str) -> bool:
+    """Whether a table exists"""
+    return inspect(connection).has_table(table)
+
+
+def has_column(connection: Connection, table: str, column: str) -> bool:
+    """Whether a table has a column"""
+    return any(c["name"] == column for c in inspect(connection).get_columns(table))
+
+
+def has_unique(connection: Connection, table: str, columns: Sequence[str]) -> bool:
+    """Whether a unique constraint or unique index covers exactly these columns"""
+    inspector = inspect(connection)
+    wanted = list(columns)
+    return any(c["column_names"] == wanted for c in inspector.get_unique_constraints(table)) or any(
+        i["unique"] and i["column_names"] == wanted for i in inspector.get_indexes(table)
+    )
+
+
+def _unversioned_revision(connection: Connection) -> Optional[str]:
+    """
+    Revision to stamp a database that has tables but no alembic_version
+
+    Earlier releases built the schema with create_all, which adds missing
+    tables but never alters existing ones, so such a database can hold
+    any mix of later tables on top of the baseline view_counts. It is
+    stamped at the initial revision only if view_counts has the 0001
+    columns; every later revision checks what is already there.
+
+    Raises:
+        RuntimeError: If view_counts does not match revision 0001
+    """
+    if not has_table(connection, "view_counts"):
+        return None
+    columns = {c["name"] for c in inspect(connection).get_columns("view_counts")}
+    missing = INITIAL_VIEW_COUNT_COLUMNS - columns
+    if missing:
+        raise RuntimeError(
+            f"view_counts does not match revision {INITIAL_REVISION} (missing {', '.join(sorted(missing))}); "
+            "migrate it by hand, then run `alembic stamp`"
+        )
+    return INITIAL_REVISION
+
+
+def upgrade_database(connection: Connection) -> None:
+    """
+    Upgrade the schema to the head revision
+
+    A database created before migrations existed (tables present, no
+    alembic_version) is stamped at the initial revision first if its
+    view_counts matches it, and later revisions bring it up to date.
+    Alembic is imported here to keep it out of the import path when
+    DB_SCHEMA_MODE is 'none'.
+
+    Args:
+        connection: Synchronous connection (AsyncConnection.run_sync); the
+            caller's transaction commits the result
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    config.attributes["configure_logger"] = False
+
+    with _migration_lock(connection):
+        if not has_table(connection, "alembic_version"):
+            revision = _unversioned_revision(connection)
+            if revision is not None:
+                command.stamp(config, revision)
+        command.upgrade(config, "head")
@@ -0,0 +1,40 @@
+"""
+Periodic Background Tasks
+Run an async job on a fixed interval from the application event loop
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+class PeriodicTask:
+    """Runs an async job every `interval` seconds"""
+
+    def __init__(self, name: str, interval: float, job: Callable[[], Awaitable[Any]]):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Schedule the job on the running event loop"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the scheduled job"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Sleep, run, repeat; errors are logged and do not stop the loop"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.job()
+            except Exception as e:
+                print(f"{self.name} error: {str(e)}")
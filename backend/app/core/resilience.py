@@ -0,0 +1,165 @@
+"""
+Resilience Policies
+Circuit breaker, retry budget and backoff for calls to an unreliable upstream
+"""
+import random
+import time
+from typing import Any, Dict, Optional
+
+
+class UpstreamUnavailableError(Exception):
+    """The upstream is not being called right now (fail fast)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """The circuit breaker is open"""
+
+
+class DeadlineExceededError(Exception):
+    """The call did not finish before its deadline"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After `failure_threshold` failures in a row the breaker opens and
+    every call fails fast for `reset_timeout` seconds. Then one probe
+    call is let through (half-open): success closes the breaker, failure
+    opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> None:
+        """
+        Check whether a call may go ahead
+
+        Raises:
+            CircuitOpenError: While open, or while the half-open probe is running
+        """
+        if self.state == "open":
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open", retry_after=remaining)
+            self.state = "half_open"
+
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is half-open", retry_after=1.0)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Record a successful call"""
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call; opens the breaker at the threshold or on a failed probe"""
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Forget a call that ended without saying anything about upstream health"""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state"""
+        retry_after = 0.0
+        if self.state == "open":
+            retry_after = max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_seconds": round(retry_after, 1),
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of calls
+
+    Every call deposits `ratio` tokens and every retry spends one, so
+    retries stay near `ratio` of traffic however many callers fail at
+    once. `min_per_second` tokens are added over time so low traffic can
+    still retry.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, capacity: float):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self._refilled_at = time.monotonic()
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        """Credit one call"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """Spend one token for a retry; False if the budget is exhausted"""
+        self._refill()
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current budget state"""
+        self._refill()
+        return {
+            "tokens": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
+
+    def _refill(self) -> None:
+        """Add the time-based minimum"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry number
+        base: Delay ceiling for the first retry, in seconds
+        cap: Largest delay ceiling, in seconds
+
+    Returns:
+        Random delay in [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
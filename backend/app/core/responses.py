@@ -0,0 +1,38 @@
+"""
+JSON Responses
+Direct serialization of response models we built ourselves
+"""
+from typing import Mapping, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def model_response(
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Serialize a model that is already valid straight to a JSON response
+
+    Returning a model from a route makes FastAPI dump it, validate the dump
+    against response_model again and encode the result. A model built by
+    our own services is valid by construction, so this serializes it once
+    with pydantic's JSON serializer instead. Keep response_model on the
+    route for the OpenAPI schema.
+
+    Args:
+        model: Response model instance
+        status_code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        application/json response with the model's JSON body
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
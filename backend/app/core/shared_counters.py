@@ -0,0 +1,278 @@
+"""
+Shared Memory Counters
+Named counters in a memory-mapped file, shared by every worker process on a node
+"""
+import fcntl
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"LSCNTR01"
+HEADER = struct.Struct("<8sI")  # magic, slot count
+HEADER_SIZE = 128
+SLOT_SIZE = 128  # Two cache lines, so neighbouring slots never share one
+KEY = struct.Struct("<H")  # Key length; the UTF-8 key follows
+MAX_KEY_BYTES = 62
+VALUES = struct.Struct("<qqqdB")  # total, flushed, persisted, updated_at, loaded
+VALUES_OFFSET = 64
+
+# (key, total, flushed, persisted, updated_at, loaded)
+SlotState = Tuple[str, int, int, int, float, bool]
+
+
+class SharedCounterTable:
+    """
+    Fixed-size table of counters in a file mapped by every process
+
+    Each slot holds one key and four values:
+
+        total      increments added since the slot was created
+        flushed    part of total already written to the database
+        persisted  database count after the last flush or load
+        loaded     whether persisted has been read from the database
+
+    so the current count is persisted + (total - flushed).
+
+    An update takes a POSIX record lock on its slot's byte range
+    (fcntl.lockf). Holding it makes a read-modify-write of the slot
+    atomic across processes, and increments of different keys do not
+    contend. Python has no atomic add on mapped memory, and a lock
+    never waits on I/O, so this costs two uncontended system calls.
+    Claiming a free slot locks the header.
+
+    Record locks belong to the process and the mapping is shared, so
+    one open file per process serves the whole event loop, and a worker
+    forked after the file was opened can keep using it.
+    """
+
+    def __init__(self, path: str, slots: int = 64):
+        self.path = path
+        self.slots = slots
+        self.size = HEADER_SIZE + slots * SLOT_SIZE
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[str, int] = {}
+
+    def add(self, key: str, amount: int = 1) -> Tuple[int, float, bool]:
+        """
+        Add to a counter, claiming a slot for a new key
+
+        Args:
+            key: Counter name
+            amount: Number to add
+
+        Returns:
+            (count, updated_at, loaded) after the increment; count is only
+            complete when loaded is True
+        """
+        offset = self._slot_offset(key, create=True)
+        with self._locked(offset):
+            total, flushed, persisted, _, loaded = VALUES.unpack_from(self._map, offset + VALUES_OFFSET)
+            total += amount
+            updated_at = time.time()
+            VALUES.pack_into(self._map, offset + VALUES_OFFSET, total, flushed, persisted, updated_at, loaded)
+        return persisted + total - flushed, updated_at, bool(loaded)
+
+    def get(self, key: str) -> Optional[Tuple[int, float, bool]]:
+        """
+        Read a counter without claiming a slot
+
+        Args:
+            key: Counter name
+
+        Returns:
+            (count, updated_at, loaded), or None if the key has no slot
+        """
+        offset = self._slot_offset(key, create=False)
+        if offset is None:
+            return None
+        with self._locked(offset, exclusive=False):
+            total, flushed, persisted, updated_at, loaded = VALUES.unpack_from(self._map, offset + VALUES_OFFSET)
+        return persisted + total - flushed, updated_at, bool(loaded)
+
+    def load(self, key: str, persisted: int, updated_at: float) -> None:
+        """
+        Set the persisted count read from the database, unless already loaded
+
+        A flush that finished after the caller's read has written a newer
+        value, so the first writer wins.
+
+        Args:
+            key: Counter name
+            persisted: Count in the database
+            updated_at: Its last update as a Unix timestamp
+        """
+        offset = self._slot_offset(key, create=True)
+        with self._locked(offset):
+            total, flushed, _, current_updated_at, loaded = VALUES.unpack_from(self._map, offset + VALUES_OFFSET)
+            if not loaded:
+                VALUES.pack_into(
+                    self._map, offset + VALUES_OFFSET,
+                    total, flushed, persisted, max(current_updated_at, updated_at), 1
+                )
+
+    def pending(self, key: str) -> int:
+        """
+        Increments not yet written to the database
+
+        Args:
+            key: Counter name
+
+        Returns:
+            total - flushed, or 0 if the key has no slot
+        """
+        offset = self._slot_offset(key, create=False)
+        if offset is None:
+            return 0
+        with self._locked(offset, exclusive=False):
+            total, flushed, _, _, _ = VALUES.unpack_from(self._map, offset + VALUES_OFFSET)
+        return total - flushed
+
+    def mark_flushed(self, key: str, amount: int, persisted: int) -> None:
+        """
+        Record that `amount` increments were written and the database now holds `persisted`
+
+        Only the elected flusher calls this, so flushes never overlap.
+
+        Args:
+            key: Counter name
+            amount: Increments written (0 to refresh persisted only)
+            persisted: Database count after the write
+        """
+        offset = self._slot_offset(key, create=True)
+        with self._locked(offset):
+            total, flushed, _, updated_at, _ = VALUES.unpack_from(self._map, offset + VALUES_OFFSET)
+            VALUES.pack_into(self._map, offset + VALUES_OFFSET, total, flushed + amount, persisted, updated_at, 1)
+
+    def keys(self) -> List[str]:
+        """Keys of every claimed slot"""
+        self._open()
+        keys = []
+        for slot in range(self.slots):
+            key = self._read_key(HEADER_SIZE + slot * SLOT_SIZE)
+            if key is None:
+                break
+            keys.append(key)
+        return keys
+
+    def slot_states(self) -> List[SlotState]:
+        """Raw values of every claimed slot (for metrics)"""
+        states = []
+        for key in self.keys():
+            offset = self._slot_offset(key, create=False)
+            with self._locked(offset, exclusive=False):
+                total, flushed, persisted, updated_at, loaded = VALUES.unpack_from(self._map, offset + VALUES_OFFSET)
+            states.append((key, total, flushed, persisted, updated_at, bool(loaded)))
+        return states
+
+    def close(self) -> None:
+        """Unmap and close the file (the counters stay in it)"""
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+        self._fd = None
+        self._map = None
+        self._index = {}
+
+    def _open(self) -> None:
+        """Map the file on first use, creating and formatting it if needed"""
+        if self._map is not None:
+            return
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Serializes formatting between processes starting together
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, HEADER.pack(MAGIC, self.slots), 0)
+                magic, slots = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+                if magic != MAGIC or slots != self.slots or os.fstat(fd).st_size != self.size:
+                    raise RuntimeError(
+                        f"{self.path} is not a counter table with {self.slots} slots; "
+                        "remove it while no worker is running"
+                    )
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(fd, self.size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    @contextmanager
+    def _locked(self, offset: int, exclusive: bool = True) -> Iterator[None]:
+        """Hold the record lock on the SLOT_SIZE bytes at `offset`"""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, SLOT_SIZE, offset)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT_SIZE, offset)
+
+    def _read_key(self, offset: int) -> Optional[str]:
+        """Key stored at a slot, or None if the slot is free"""
+        (length,) = KEY.unpack_from(self._map, offset)
+        if length == 0:
+            return None
+        return self._map[offset + KEY.size:offset + KEY.size + length].decode()
+
+    def _slot_offset(self, key: str, create: bool) -> Optional[int]:
+        """
+        Byte offset of a key's slot
+
+        Slots are claimed in order and never released, so a scan can stop
+        at the first free one.
+
+        Args:
+            key: Counter name
+            create: Claim a free slot when the key has none
+
+        Returns:
+            Offset, or None if the key has no slot and create is False
+
+        Raises:
+            ValueError: If a slot is needed but the key is too long or every
+                slot is taken
+        """
+        self._open()
+        offset = self._index.get(key)
+        if offset is not None:
+            return offset
+
+        encoded = key.encode()
+        if len(encoded) > MAX_KEY_BYTES:
+            if not create:
+                return None
+            raise ValueError(f"Counter key is longer than {MAX_KEY_BYTES} bytes: {key!r}")
+
+        def scan() -> Optional[int]:
+            for slot in range(self.slots):
+                offset = HEADER_SIZE + slot * SLOT_SIZE
+                existing = self._read_key(offset)
+                if existing is None:
+                    return None
+                self._index[existing] = offset
+                if existing == key:
+                    return offset
+            return None
+
+        offset = scan()
+        if offset is not None or not create:
+            return offset
+
+        with self._locked(0):
+            offset = scan()  # Another process may have claimed it meanwhile
+            if offset is not None:
+                return offset
+            offset = HEADER_SIZE + len(self._index) * SLOT_SIZE
+            if len(self._index) >= self.slots:
+                raise ValueError(f"All {self.slots} counter slots in {self.path} are in use")
+            self._map[offset + KEY.size:offset + KEY.size + len(encoded)] = encoded
+            # Length last: the key becomes visible only once it is complete
+            KEY.pack_into(self._map, offset, len(encoded))
+        self._index[key] = offset
+        return offset
@@ -0,0 +1,60 @@
+"""
+Single-Flight
+Coalesce concurrent calls with the same key into one shared execution
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share its result
+
+    The shared call runs in its own task, so a caller that is cancelled
+    stops waiting without cancelling the call for everyone else. An
+    exception raised by the call is re-raised in every waiting caller.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `fn` unless a call for `key` is already in flight, then await the result
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument coroutine function starting the call
+
+        Returns:
+            (result of the shared call, True if another caller started it)
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+        else:
+            self.calls += 1
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current coalescing counters"""
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "shared": self.shared,  # Callers served by another caller's call
+            "errors": self.errors,
+        }
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget the finished call; mark its exception retrieved even if nobody waited"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
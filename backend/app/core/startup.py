@@ -0,0 +1,99 @@
+"""
+Startup Report
+Time spent importing the application and in each lifespan init and warmup step
+"""
+import asyncio
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.metrics import metrics_registry
+
+Warmup = Callable[[], Awaitable[Any]]
+
+
+class StartupReport:
+    """Records startup durations and runs warmup hooks"""
+
+    def __init__(self):
+        self.import_ms: Optional[float] = None
+        self.steps_ms: Dict[str, float] = {}
+        self.warmups_ms: Dict[str, float] = {}
+        self.warmup_errors: Dict[str, str] = {}
+        self.ready_ms: Optional[float] = None
+        self._started: Optional[float] = None
+        self._warmups: List[Tuple[str, Warmup]] = []
+
+    def imported(self, started: float) -> None:
+        """
+        Record how long importing the application took
+
+        Args:
+            started: time.perf_counter() taken at the top of the entry module
+        """
+        self.import_ms = (time.perf_counter() - started) * 1000
+
+    def begin(self) -> None:
+        """Mark the start of the lifespan"""
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time one init step (a with block; may contain awaits)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps_ms[name] = (time.perf_counter() - started) * 1000
+
+    def add_warmup(self, name: str, hook: Warmup) -> None:
+        """
+        Register a hook run concurrently by warm_up() before serving
+
+        Args:
+            name: Name reported in the startup metrics
+            hook: Coroutine function that prepares a resource (opens
+                connections, builds a client, fills a cache)
+        """
+        self._warmups.append((name, hook))
+
+    async def warm_up(self) -> None:
+        """Run every warmup hook; a failing hook is reported, not raised"""
+        async def run(name: str, hook: Warmup) -> None:
+            started = time.perf_counter()
+            try:
+                await hook()
+            except Exception as e:
+                self.warmup_errors[name] = str(e)
+                print(f"Warmup {name} failed: {str(e)}")
+            finally:
+                self.warmups_ms[name] = (time.perf_counter() - started) * 1000
+
+        with self.step("warmup"):
+            await asyncio.gather(*(run(name, hook) for name, hook in self._warmups))
+
+    def ready(self) -> None:
+        """Mark the end of startup, just before the first request is served"""
+        if self._started is not None:
+            self.ready_ms = (time.perf_counter() - self._started) * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Durations in milliseconds and the heavy modules already imported"""
+        def rounded(values: Dict[str, float]) -> Dict[str, float]:
+            return {name: round(ms, 1) for name, ms in values.items()}
+
+        return {
+            "import_ms": round(self.import_ms, 1) if self.import_ms is not None else None,
+            "lifespan_ms": round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            "steps_ms": rounded(self.steps_ms),
+            "warmups_ms": rounded(self.warmups_ms),
+            "warmup_errors": dict(self.warmup_errors),
+            # Deferred to first use; present once something needed them
+            "loaded": {module: module in sys.modules for module in ("openai", "numpy", "alembic", "asyncpg")},
+        }
+
+
+# Report instance
+startup_report = StartupReport()
+metrics_registry.register("startup", startup_report.snapshot)
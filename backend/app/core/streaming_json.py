@@ -0,0 +1,191 @@
+"""
+Streaming JSON Parser
+Incremental parsing of a top-level JSON object whose text arrives in chunks
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+# (kind, key, value): ("delta", key, text) for new characters of a string
+# field, ("field", key, value) once a field's value is complete
+StreamEvent = Tuple[str, str, Any]
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonObjectStreamParser:
+    """
+    Parses `{"key": value, ...}` as it streams in
+
+    String values are reported character by character as they arrive
+    (escapes decoded); every value is reported whole once it is complete.
+    Nested values are buffered and decoded with json.loads. Chunks may
+    split the text anywhere, including inside escape sequences.
+    """
+
+    def __init__(self):
+        self._state = "start"  # start, key, colon, value, string, nested, literal, after, done
+        self._raw = ""  # Text of the current key or value
+        self._key: Optional[str] = None
+        self._escaped = False
+        self._depth = 0
+        self._in_string = False
+        self._emitted = 0  # Raw characters of the current string already reported
+        self.fields: dict = {}
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing brace of the object has been seen"""
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        """
+        Consume the next piece of text
+
+        Args:
+            chunk: Next piece of the JSON text
+
+        Returns:
+            Events produced by this chunk, in order
+
+        Raises:
+            ValueError: If the text is not a JSON object
+        """
+        events: List[StreamEvent] = []
+        for char in chunk:
+            self._step(char, events)
+        if self._state == "string":
+            self._emit_string_delta(events)
+        return events
+
+    def _step(self, char: str, events: List[StreamEvent]) -> None:
+        """Advance the state machine by one character"""
+        state = self._state
+        if state == "start":
+            if char == "{":
+                self._state = "key"
+            elif char not in _WHITESPACE:
+                raise ValueError("Expected a JSON object")
+        elif state == "key":
+            if self._raw:
+                self._raw += char
+                if char == '"' and not self._escaped:
+                    self._key = json.loads(self._raw)
+                    self._raw = ""
+                    self._state = "colon"
+                self._escaped = char == "\\" and not self._escaped
+            elif char == '"':
+                self._raw = char
+                self._escaped = False
+            elif char == "}" and not self.fields:
+                self._state = "done"
+            elif char not in _WHITESPACE:
+                raise ValueError(f"Unexpected character {char!r} before key")
+        elif state == "colon":
+            if char == ":":
+                self._state = "value"
+            elif char not in _WHITESPACE:
+                raise ValueError(f"Expected ':' after key {self._key!r}")
+        elif state == "value":
+            if char in _WHITESPACE:
+                return
+            self._raw = char
+            self._escaped = False
+            if char == '"':
+                self._state = "string"
+                self._emitted = 1
+            elif char in "[{":
+                self._state = "nested"
+                self._depth = 1
+                self._in_string = False
+            else:
+                self._state = "literal"
+        elif state == "string":
+            self._raw += char
+            if char == '"' and not self._escaped:
+                self._emit_string_delta(events)
+                self._complete(events)
+                self._state = "after"
+            self._escaped = char == "\\" and not self._escaped
+        elif state == "nested":
+            self._raw += char
+            if self._in_string:
+                if char == '"' and not self._escaped:
+                    self._in_string = False
+                self._escaped = char == "\\" and not self._escaped
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(events)
+                    self._state = "after"
+        elif state == "literal":
+            if char in ",}" or char in _WHITESPACE:
+                self._complete(events)
+                self._state = "after"
+                self._step(char, events)
+            else:
+                self._raw += char
+        elif state == "after":
+            if char == ",":
+                self._state = "key"
+            elif char == "}":
+                self._state = "done"
+            elif char not in _WHITESPACE:
+                raise ValueError(f"Unexpected character {char!r} after value")
+        elif char not in _WHITESPACE:
+            raise ValueError("Unexpected text after the JSON object")
+
+    def _complete(self, events: List[StreamEvent]) -> None:
+        """Decode the buffered value and report the finished field"""
+        try:
+            value = json.loads(self._raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid value for {self._key!r}: {str(e)}")
+        self.fields[self._key] = value
+        events.append(("field", self._key, value))
+        self._raw = ""
+
+    def _emit_string_delta(self, events: List[StreamEvent]) -> None:
+        """Report the decodable characters of the current string not reported yet"""
+        end = _safe_end(self._raw, self._emitted)
+        if end > self._emitted:
+            text = json.loads('"' + self._raw[self._emitted:end] + '"')
+            events.append(("delta", self._key, text))
+            self._emitted = end
+
+
+def _safe_end(raw: str, start: int) -> int:
+    """
+    End of the longest prefix of raw[start:] that does not split an escape
+
+    The closing quote of a finished string is excluded too. A high
+    surrogate \\uD800-\\uDBFF waits for its low surrogate so the pair
+    decodes as one character.
+    """
+    i = start
+    end = start
+    while i < len(raw):
+        char = raw[i]
+        if char == "\\":
+            if i + 1 >= len(raw):
+                break
+            if raw[i + 1] == "u":
+                if i + 6 > len(raw):
+                    break
+                length = 6
+                if 0xD800 <= int(raw[i + 2:i + 6], 16) <= 0xDBFF:
+                    if i + 12 > len(raw):
+                        break
+                    length = 12
+                i += length
+            else:
+                i += 2
+        elif char == '"':
+            break
+        else:
+            i += 1
+        end = i
+    return end
@@ -2,22 +2,125 @@
 FastAPI Application Entry Point
 내 인생 통계 (My Life Stats) Backend
 """
-from fastapi import FastAPI
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.calendar_index import calendar_index
+from app.core.database import dispose_engine, get_engine, warm_pool
+from app.core.instrumentation import MetricsMiddleware, instrumentation, metrics_snapshot
+from app.core.migrations import upgrade_database
+from app.core.startup import startup_report
+from app.routers.metrics import require_metrics_token
+from app.services.compatibility_cache import compatibility_cache, compatibility_cache_eviction
+from app.services.compatibility_service import compatibility_service
+from app.services.unique_visitor_service import unique_visitor_counter, unique_visitor_flush
+from app.services.view_count_buffer import view_count_buffer
+from app.services.view_count_pipeline import view_count_pipeline
+from app.services.view_count_service import view_count_compaction
+from app.services.view_count_shared import shared_view_counts
+from app.services.view_count_timeseries_service import view_count_rollup
 
 # Import models to ensure they are registered with SQLAlchemy
-from app.models import view_count  # noqa: F401
+from app.models import (  # noqa: F401
+    view_count, view_count_bucket, unique_visitor_sketch, compatibility_cache_entry
+)
+
+
+# Run concurrently before the first request; each is timed in the startup report
+if settings.DB_POOL_WARMUP_CONNECTIONS > 0:
+    startup_report.add_warmup("db_pool", lambda: warm_pool(settings.DB_POOL_WARMUP_CONNECTIONS))
+startup_report.add_warmup("calendar_index", lambda: asyncio.to_thread(calendar_index))
+if settings.COMPATIBILITY_MODE != "local":
+    startup_report.add_warmup("openai_client", compatibility_service.warm_up)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Migrate the schema and warm up, then start and stop background workers"""
+    startup_report.begin()
+    if settings.DB_SCHEMA_MODE == "migrate":
+        with startup_report.step("migrations"):
+            async with get_engine().begin() as conn:
+                await conn.run_sync(upgrade_database)
+    await startup_report.warm_up()
+
+    buffered = settings.VIEW_COUNT_WRITE_MODE == "buffered"
+    sharing_counts = settings.VIEW_COUNT_WRITE_MODE == "shared_memory"
+    compacting = settings.VIEW_COUNT_COMPACTION_INTERVAL_SECONDS > 0
+    rolling_up = settings.VIEW_COUNT_TIMESERIES_ENABLED
+    counting_uniques = settings.UNIQUE_VISITORS_ENABLED
+    pipelined = settings.VIEW_COUNT_PIPELINE_ENABLED
+    evicting_cache = compatibility_cache.database is not None
+    sharing_metrics = settings.METRICS_ENABLED and bool(settings.METRICS_MULTIPROCESS_DIR)
+
+    if sharing_metrics:
+        instrumentation.configure(settings.METRICS_MULTIPROCESS_DIR)
+        metrics_snapshot.start()
+    if buffered:
+        view_count_buffer.start()
+    if sharing_counts:
+        shared_view_counts.start()
+    if pipelined:
+        view_count_pipeline.start()
+    if compacting:
+        view_count_compaction.start()
+    if rolling_up:
+        view_count_rollup.start()
+    if counting_uniques:
+        unique_visitor_flush.start()
+    if evicting_cache:
+        compatibility_cache_eviction.start()
+    startup_report.ready()
+
+    yield
+
+    if evicting_cache:
+        await compatibility_cache_eviction.stop()
+
+    if pipelined:
+        # Apply queued events before the buffer's final flush
+        await view_count_pipeline.stop()
+    if counting_uniques:
+        await unique_visitor_flush.stop()
+        await unique_visitor_counter.flush()
+    if rolling_up:
+        await view_count_rollup.stop()
+    if compacting:
+        await view_count_compaction.stop()
+    if buffered:
+        # Flush remaining increments before the process exits
+        await view_count_buffer.stop()
+    if sharing_counts:
+        # Flushes if this worker is or can become the leader
+        await shared_view_counts.stop()
+
+    await compatibility_service.close()
+
+    if sharing_metrics:
+        await metrics_snapshot.stop()
+        # Keep this worker's final counts in the shared totals
+        instrumentation.write_snapshot()
+
+    await dispose_engine()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="My Life Stats API",
     description="생년월일 기반 인생 통계 계산 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Responses built from dicts and validated models are encoded with orjson
+    default_response_class=ORJSONResponse
 )
 
 # CORS 설정
@@ -29,6 +132,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # Outermost, so the recorded latency includes every other middleware
+    app.add_middleware(MetricsMiddleware, instrumentation=instrumentation)
+
 
 @app.get("/")
 async def root() -> dict[str, str]:
@@ -46,8 +153,25 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_metrics_token)]
+)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Request and operation metrics of all workers in Prometheus text format (not proxied by nginx)"""
+    return PlainTextResponse(
+        instrumentation.collect().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Router 등록
-from app.routers import stats, view_count, compatibility
+from app.routers import stats, view_count, compatibility, metrics
 app.include_router(stats.router, prefix="/api/v1/stats", tags=["stats"])
 app.include_router(view_count.router, prefix="/api/v1/views", tags=["views"])
 app.include_router(compatibility.router, prefix="/api/v1/compatibility", tags=["compatibility"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
+
+startup_report.imported(_import_started)
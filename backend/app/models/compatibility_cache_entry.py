@@ -0,0 +1,22 @@
+"""
+Compatibility Cache Entry Model
+SQLAlchemy model for cached compatibility analysis results shared across workers
+"""
+from sqlalchemy import Column, String, Text, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class CompatibilityCacheEntry(Base):
+    """Cached analysis result for one normalized pair of people and language"""
+
+    __tablename__ = "compatibility_cache"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of the normalized request
+    result = Column(Text, nullable=False)  # CompatibilityResponse as JSON
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CompatibilityCacheEntry(key='{self.key}', expires_at={self.expires_at})>"
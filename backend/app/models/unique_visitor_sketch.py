@@ -0,0 +1,26 @@
+"""
+Unique Visitor Sketch Model
+SQLAlchemy model for per-day HyperLogLog sketches of unique visitors
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, LargeBinary, UniqueConstraint
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class UniqueVisitorSketch(Base):
+    """HyperLogLog sketch of the visitors seen for one event type on one day"""
+
+    __tablename__ = "unique_visitor_sketches"
+    __table_args__ = (
+        UniqueConstraint("event_type", "day", name="uq_unique_visitor_sketches_event_day"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String, nullable=False)
+    day = Column(Date, nullable=False)  # UTC day
+    sketch = Column(LargeBinary, nullable=False)  # HyperLogLog.to_bytes()
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<UniqueVisitorSketch(event_type='{self.event_type}', day={self.day})>"
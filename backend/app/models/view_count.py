@@ -2,7 +2,7 @@
 View Count Model
 SQLAlchemy model for tracking service view counts
 """
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
 from datetime import datetime
 
 from app.core.database import Base
@@ -12,12 +12,16 @@ class ViewCount(Base):
     """View count tracking model"""
 
     __tablename__ = "view_counts"
+    __table_args__ = (
+        UniqueConstraint("event_type", "shard", name="uq_view_counts_event_type_shard"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     event_type = Column(String, index=True, nullable=False)  # 'page_view', 'stats_calculated', etc.
+    shard = Column(Integer, default=0, server_default="0", nullable=False)  # Sub-row index, see VIEW_COUNT_SHARDS
     count = Column(Integer, default=0, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self) -> str:
-        return f"<ViewCount(event_type='{self.event_type}', count={self.count})>"
+        return f"<ViewCount(event_type='{self.event_type}', shard={self.shard}, count={self.count})>"
@@ -0,0 +1,43 @@
+"""
+View Count Bucket Models
+Time-bucketed event counts: raw minutes rolled up into hours and days
+"""
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+
+from app.core.database import Base
+
+
+class _BucketColumns:
+    """Columns shared by every bucket granularity"""
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # UTC, truncated to the granularity
+    count = Column(Integer, default=0, nullable=False)
+
+
+class ViewCountMinute(_BucketColumns, Base):
+    """Per-minute event counts, written on every increment"""
+
+    __tablename__ = "view_count_minutes"
+    __table_args__ = (
+        UniqueConstraint("event_type", "bucket_start", name="uq_view_count_minutes_event_bucket"),
+    )
+
+
+class ViewCountHour(_BucketColumns, Base):
+    """Hourly event counts, rolled up from minutes"""
+
+    __tablename__ = "view_count_hours"
+    __table_args__ = (
+        UniqueConstraint("event_type", "bucket_start", name="uq_view_count_hours_event_bucket"),
+    )
+
+
+class ViewCountDay(_BucketColumns, Base):
+    """Daily event counts, rolled up from hours"""
+
+    __tablename__ = "view_count_days"
+    __table_args__ = (
+        UniqueConstraint("event_type", "bucket_start", name="uq_view_count_days_event_bucket"),
+    )
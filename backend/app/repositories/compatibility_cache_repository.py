@@ -0,0 +1,97 @@
+"""
+Compatibility Cache Repository
+Data access layer for cached compatibility analysis results
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert_dialect
+from app.models.compatibility_cache_entry import CompatibilityCacheEntry
+
+
+class CompatibilityCacheRepository:
+    """Repository for compatibility cache entry operations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, key: str, now: datetime) -> Optional[str]:
+        """
+        Get an unexpired cached result
+
+        Args:
+            key: Cache key
+            now: Current UTC time
+
+        Returns:
+            Result JSON, or None if missing or expired
+        """
+        result = await self.db.execute(
+            select(CompatibilityCacheEntry.result).where(
+                CompatibilityCacheEntry.key == key,
+                CompatibilityCacheEntry.expires_at > now
+            )
+        )
+        return result.scalars().first()
+
+    async def set(self, key: str, result: str, now: datetime, expires_at: datetime) -> None:
+        """
+        Insert or replace a cached result
+
+        Args:
+            key: Cache key
+            result: Result JSON
+            now: Current UTC time
+            expires_at: UTC time the entry stops being served
+        """
+        values = {"key": key, "result": result, "created_at": now, "expires_at": expires_at}
+        dialect = upsert_dialect(self.db)
+        if dialect is not None:
+            stmt = dialect.insert(CompatibilityCacheEntry).values(**values)
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[CompatibilityCacheEntry.key],
+                set_={"result": result, "created_at": now, "expires_at": expires_at}
+            ))
+            await self.db.commit()
+            return
+
+        try:
+            await self.db.merge(CompatibilityCacheEntry(**values))
+            await self.db.commit()
+        except IntegrityError:
+            # Another worker stored the same key first; theirs is as good
+            await self.db.rollback()
+
+    async def evict(self, now: datetime, max_entries: int) -> int:
+        """
+        Delete expired entries, then the oldest entries beyond `max_entries`
+
+        Args:
+            now: Current UTC time
+            max_entries: Number of entries to keep
+
+        Returns:
+            Number of rows deleted
+        """
+        expired = await self.db.execute(
+            delete(CompatibilityCacheEntry).where(CompatibilityCacheEntry.expires_at <= now)
+        )
+        deleted = expired.rowcount
+
+        total = (await self.db.execute(select(func.count()).select_from(CompatibilityCacheEntry))).scalar_one()
+        if total > max_entries:
+            oldest = (
+                select(CompatibilityCacheEntry.key)
+                .order_by(CompatibilityCacheEntry.expires_at)
+                .limit(total - max_entries)
+            )
+            trimmed = await self.db.execute(
+                delete(CompatibilityCacheEntry).where(CompatibilityCacheEntry.key.in_(oldest))
+            )
+            deleted += trimmed.rowcount
+
+        await self.db.commit()
+        return deleted
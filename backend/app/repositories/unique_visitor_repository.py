@@ -0,0 +1,79 @@
+"""
+Unique Visitor Repository
+Data access layer for HyperLogLog visitor sketches
+"""
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.hyperloglog import HyperLogLog
+from app.models.unique_visitor_sketch import UniqueVisitorSketch
+
+
+class UniqueVisitorRepository:
+    """Repository for unique visitor sketch operations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def merge(self, event_type: str, day: date, sketch: HyperLogLog) -> None:
+        """
+        Merge a sketch into the stored sketch for (event_type, day)
+
+        The stored row is locked while merging, so concurrent workers
+        never overwrite each other's registers. If the precisions differ
+        (UNIQUE_VISITORS_PRECISION changed), both are folded to the lower one.
+
+        Args:
+            event_type: Type of event
+            day: UTC day the visits belong to
+            sketch: Sketch to merge
+        """
+        for attempt in range(2):
+            result = await self.db.execute(
+                select(UniqueVisitorSketch).where(
+                    UniqueVisitorSketch.event_type == event_type,
+                    UniqueVisitorSketch.day == day
+                ).with_for_update()
+            )
+            row = result.scalars().first()
+
+            if row is None:
+                self.db.add(UniqueVisitorSketch(event_type=event_type, day=day, sketch=sketch.to_bytes()))
+            else:
+                stored = HyperLogLog.from_bytes(row.sketch)
+                precision = min(stored.precision, sketch.precision)
+                stored = stored.folded(precision)
+                stored.merge(sketch.folded(precision))
+                row.sketch = stored.to_bytes()
+
+            try:
+                await self.db.commit()
+                return
+            except IntegrityError:
+                # Another worker inserted the row first; merge into theirs
+                await self.db.rollback()
+                if attempt:
+                    raise
+
+    async def get_range(self, event_type: str, start: date, end: date) -> list[UniqueVisitorSketch]:
+        """
+        Get stored sketches for an inclusive day range
+
+        Args:
+            event_type: Type of event
+            start: First day
+            end: Last day
+
+        Returns:
+            List of UniqueVisitorSketch rows
+        """
+        result = await self.db.execute(
+            select(UniqueVisitorSketch).where(
+                UniqueVisitorSketch.event_type == event_type,
+                UniqueVisitorSketch.day >= start,
+                UniqueVisitorSketch.day <= end
+            )
+        )
+        return result.scalars().all()
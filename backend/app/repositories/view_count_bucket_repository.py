@@ -0,0 +1,186 @@
+"""
+View Count Bucket Repository
+Data access layer for time-bucketed view counts and their rollups
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Tuple, Type
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert_dialect
+from app.models.view_count_bucket import ViewCountMinute, ViewCountHour, ViewCountDay
+
+BucketModel = Type[ViewCountMinute] | Type[ViewCountHour] | Type[ViewCountDay]
+
+# Granularity name -> (model, bucket width)
+GRANULARITIES: Dict[str, Tuple[BucketModel, timedelta]] = {
+    "minute": (ViewCountMinute, timedelta(minutes=1)),
+    "hour": (ViewCountHour, timedelta(hours=1)),
+    "day": (ViewCountDay, timedelta(days=1)),
+}
+
+
+def truncate(at: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket"""
+    if granularity == "minute":
+        return at.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class ViewCountBucketRepository:
+    """Repository for time-bucketed view count operations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, event_type: str, amount: int, at: datetime) -> None:
+        """
+        Add to the minute bucket containing `at` (caller commits)
+
+        Args:
+            event_type: Type of event to record
+            amount: Number of events
+            at: UTC timestamp of the events
+        """
+        await self._add(ViewCountMinute, event_type, truncate(at, "minute"), amount)
+
+    async def get_range(
+        self,
+        event_type: str,
+        granularity: str,
+        start: datetime,
+        end: datetime
+    ) -> list[ViewCountMinute | ViewCountHour | ViewCountDay]:
+        """
+        Get buckets in [start, end) for one event type
+
+        Served by the (event_type, bucket_start) unique index of the
+        table for the requested granularity.
+
+        Args:
+            event_type: Type of event
+            granularity: 'minute', 'hour' or 'day'
+            start: Inclusive UTC start
+            end: Exclusive UTC end
+
+        Returns:
+            Non-empty buckets ordered by bucket_start
+        """
+        model, _ = GRANULARITIES[granularity]
+        result = await self.db.execute(
+            select(model).where(
+                model.event_type == event_type,
+                model.bucket_start >= start,
+                model.bucket_start < end
+            ).order_by(model.bucket_start)
+        )
+        return result.scalars().all()
+
+    async def rollup(self, since: datetime) -> int:
+        """
+        Recompute hour buckets from minutes and day buckets from hours
+
+        Every bucket touched since `since` is rewritten with the sum of its
+        source rows, so running the rollup twice (or from several workers)
+        gives the same result.
+
+        Args:
+            since: UTC timestamp; hours and days from its bucket onwards are rebuilt
+
+        Returns:
+            Number of hour and day buckets written
+        """
+        written = await self._rollup_into(ViewCountMinute, ViewCountHour, "hour", truncate(since, "hour"))
+        written += await self._rollup_into(ViewCountHour, ViewCountDay, "day", truncate(since, "day"))
+        await self.db.commit()
+        return written
+
+    async def purge(self, minutes_before: datetime, hours_before: datetime) -> int:
+        """
+        Delete raw buckets that have aged out of retention
+
+        Args:
+            minutes_before: Minute buckets older than this are deleted
+            hours_before: Hour buckets older than this are deleted
+
+        Returns:
+            Number of rows deleted
+        """
+        minutes = await self.db.execute(
+            delete(ViewCountMinute).where(ViewCountMinute.bucket_start < minutes_before)
+        )
+        hours = await self.db.execute(
+            delete(ViewCountHour).where(ViewCountHour.bucket_start < hours_before)
+        )
+        await self.db.commit()
+        return minutes.rowcount + hours.rowcount
+
+    async def _rollup_into(
+        self,
+        source: BucketModel,
+        target: BucketModel,
+        granularity: str,
+        since: datetime
+    ) -> int:
+        """Sum source buckets from `since` into target buckets"""
+        result = await self.db.execute(
+            select(source.event_type, source.bucket_start, source.count).where(
+                source.bucket_start >= since
+            )
+        )
+        rows = result.all()
+
+        totals: Dict[Tuple[str, datetime], int] = defaultdict(int)
+        for row in rows:
+            totals[(row.event_type, truncate(row.bucket_start, granularity))] += row.count
+
+        for (event_type, bucket_start), count in totals.items():
+            await self._set(target, event_type, bucket_start, count)
+        return len(totals)
+
+    async def _add(self, model: BucketModel, event_type: str, bucket_start: datetime, amount: int) -> None:
+        """Upsert a bucket, adding `amount` to its count"""
+        dialect = upsert_dialect(self.db)
+        if dialect is not None:
+            stmt = dialect.insert(model).values(event_type=event_type, bucket_start=bucket_start, count=amount)
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[model.event_type, model.bucket_start],
+                set_={"count": model.count + amount}
+            ))
+            return
+
+        bucket = await self._get(model, event_type, bucket_start)
+        if bucket is None:
+            self.db.add(model(event_type=event_type, bucket_start=bucket_start, count=amount))
+        else:
+            bucket.count += amount
+
+    async def _set(self, model: BucketModel, event_type: str, bucket_start: datetime, count: int) -> None:
+        """Upsert a bucket, replacing its count"""
+        dialect = upsert_dialect(self.db)
+        if dialect is not None:
+            stmt = dialect.insert(model).values(event_type=event_type, bucket_start=bucket_start, count=count)
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[model.event_type, model.bucket_start],
+                set_={"count": count}
+            ))
+            return
+
+        bucket = await self._get(model, event_type, bucket_start)
+        if bucket is None:
+            self.db.add(model(event_type=event_type, bucket_start=bucket_start, count=count))
+        else:
+            bucket.count = count
+
+    async def _get(self, model: BucketModel, event_type: str, bucket_start: datetime):
+        """Get a single bucket row"""
+        result = await self.db.execute(
+            select(model).where(
+                model.event_type == event_type,
+                model.bucket_start == bucket_start
+            )
+        )
+        return result.scalars().first()
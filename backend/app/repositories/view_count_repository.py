@@ -2,21 +2,41 @@
 View Count Repository
 Data access layer for view count operations
 """
+import os
+import random
+from datetime import datetime
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.config import settings
+from app.core.database import upsert_dialect
+from app.core.instrumentation import instrumentation
 from app.models.view_count import ViewCount
+from app.repositories.view_count_bucket_repository import ViewCountBucketRepository
 
 
 class ViewCountRepository:
     """Repository for view count database operations"""
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: AsyncSession,
+        increment_mode: Optional[str] = None,
+        shards: Optional[int] = None
+    ):
         self.db = db
+        self.increment_mode = increment_mode or settings.VIEW_COUNT_INCREMENT_MODE
+        self.shards = max(1, shards or settings.VIEW_COUNT_SHARDS)
+        self.buckets: Optional[ViewCountBucketRepository] = (
+            ViewCountBucketRepository(db) if settings.VIEW_COUNT_TIMESERIES_ENABLED else None
+        )
 
-    def get_by_event_type(self, event_type: str) -> Optional[ViewCount]:
+    @instrumentation.timed("view_count_repository.get_by_event_type")
+    async def get_by_event_type(self, event_type: str) -> Optional[ViewCount]:
         """
-        Get view count by event type
+        Get view count by event type, summed over all shards
 
         Args:
             event_type: Type of event to get count for
@@ -24,39 +44,187 @@ class ViewCountRepository:
         Returns:
             ViewCount object or None if not found
         """
-        return self.db.query(ViewCount).filter(
-            ViewCount.event_type == event_type
-        ).first()
+        result = await self.db.execute(
+            select(
+                func.sum(ViewCount.count).label("count"),
+                func.max(ViewCount.updated_at).label("updated_at")
+            ).where(ViewCount.event_type == event_type)
+        )
+        row = result.one()
 
-    def increment(self, event_type: str) -> ViewCount:
+        if row.count is None:
+            return None
+        return ViewCount(event_type=event_type, count=int(row.count), updated_at=row.updated_at)
+
+    @instrumentation.timed("view_count_repository.increment")
+    async def increment(self, event_type: str, amount: int = 1) -> ViewCount:
         """
         Increment view count for an event type
 
         Args:
             event_type: Type of event to increment
+            amount: Number to add to the count
 
         Returns:
-            Updated ViewCount object
+            Updated ViewCount object (total over all shards)
         """
-        view_count = self.get_by_event_type(event_type)
+        shard = self._pick_shard()
+
+        if self.buckets is not None:
+            # Committed together with the counter below
+            await self.buckets.record(event_type, amount, datetime.utcnow())
+
+        if self.increment_mode == "atomic" and upsert_dialect(self.db) is not None:
+            return await self._increment_atomic(event_type, shard, amount)
+
+        if self.shards > 1:
+            # Read every shard at once so the total needs no second query
+            rows = await self._get_shards(event_type)
+            view_count = next((row for row in rows if row.shard == shard), None)
+            others = sum(row.count for row in rows if row.shard != shard)
+        else:
+            view_count = await self._get_shard(event_type, shard)
+            others = 0
 
         if view_count is None:
             # Create new entry if it doesn't exist
-            view_count = ViewCount(event_type=event_type, count=1)
+            view_count = ViewCount(event_type=event_type, shard=shard, count=amount)
             self.db.add(view_count)
         else:
             # Increment existing count
-            view_count.count += 1
+            view_count.count += amount
+
+        await self.db.commit()
+        await self.db.refresh(view_count)
 
-        self.db.commit()
-        self.db.refresh(view_count)
+        if others:
+            # The written row only holds one shard's share of the total
+            return ViewCount(event_type=event_type, count=view_count.count + others, updated_at=view_count.updated_at)
         return view_count
 
-    def get_all_counts(self) -> list[ViewCount]:
+    @instrumentation.timed("view_count_repository.get_all_counts")
+    async def get_all_counts(self) -> list[ViewCount]:
         """
-        Get all view counts
+        Get all view counts, one summed entry per event type
 
         Returns:
             List of all ViewCount objects
         """
-        return self.db.query(ViewCount).all()
+        result = await self.db.execute(
+            select(
+                ViewCount.event_type,
+                func.sum(ViewCount.count).label("count"),
+                func.max(ViewCount.updated_at).label("updated_at")
+            ).group_by(ViewCount.event_type)
+        )
+        rows = result.all()
+
+        return [
+            ViewCount(event_type=row.event_type, count=int(row.count), updated_at=row.updated_at)
+            for row in rows
+        ]
+
+    @instrumentation.timed("view_count_repository.compact")
+    async def compact(self) -> int:
+        """
+        Fold every shard into shard 0
+
+        Shard rows are deleted once folded, including zero-count rows left
+        over from a larger VIEW_COUNT_SHARDS; the next increment to a
+        shard inserts its row again.
+
+        Returns:
+            Number of shard rows folded
+        """
+        result = await self.db.execute(
+            select(ViewCount.event_type).where(ViewCount.shard != 0).distinct()
+        )
+        event_types = result.scalars().all()
+
+        folded = 0
+        for event_type in event_types:
+            # Lock in shard order so concurrent compactions cannot deadlock
+            result = await self.db.execute(
+                select(ViewCount).where(
+                    ViewCount.event_type == event_type
+                ).order_by(ViewCount.shard).with_for_update()
+            )
+            rows = result.scalars().all()
+
+            base = rows[0] if rows and rows[0].shard == 0 else None
+            if base is None:
+                base = ViewCount(event_type=event_type, shard=0, count=0)
+                self.db.add(base)
+
+            shard_rows = [row for row in rows if row.shard != 0]
+            base.count += sum(row.count for row in shard_rows)
+            await self.db.execute(
+                delete(ViewCount).where(
+                    ViewCount.id.in_([row.id for row in shard_rows])
+                )
+            )
+            folded += len(shard_rows)
+
+            await self.db.commit()
+
+        return folded
+
+    async def _get_shard(self, event_type: str, shard: int) -> Optional[ViewCount]:
+        """Get the row for one shard of an event type"""
+        result = await self.db.execute(
+            select(ViewCount).where(
+                ViewCount.event_type == event_type,
+                ViewCount.shard == shard
+            )
+        )
+        return result.scalars().first()
+
+    async def _get_shards(self, event_type: str) -> list[ViewCount]:
+        """Get the rows for every shard of an event type"""
+        result = await self.db.execute(
+            select(ViewCount).where(ViewCount.event_type == event_type)
+        )
+        return list(result.scalars().all())
+
+    def _pick_shard(self) -> int:
+        """Choose the shard row this increment goes to"""
+        if self.shards == 1:
+            return 0
+        if settings.VIEW_COUNT_SHARD_STRATEGY == "worker":
+            return os.getpid() % self.shards
+        return random.randrange(self.shards)
+
+    async def _increment_atomic(self, event_type: str, shard: int, amount: int) -> ViewCount:
+        """
+        Insert or increment in a single INSERT ... ON CONFLICT statement
+
+        Relies on the unique constraint on (event_type, shard), so concurrent
+        workers neither lose updates nor create duplicate rows. With several
+        shards the other shards' counts are added in the RETURNING clause,
+        so the total comes back from the same statement.
+        """
+        now = datetime.utcnow()
+        stmt = upsert_dialect(self.db).insert(ViewCount).values(
+            event_type=event_type,
+            shard=shard,
+            count=amount,
+            created_at=now,
+            updated_at=now
+        )
+        count = ViewCount.count
+        if self.shards > 1:
+            other = aliased(ViewCount)
+            count = count + select(func.coalesce(func.sum(other.count), 0)).where(
+                other.event_type == event_type, other.shard != shard
+            ).scalar_subquery()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ViewCount.event_type, ViewCount.shard],
+            set_={"count": ViewCount.count + amount, "updated_at": now}
+        ).returning(ViewCount.event_type, count.label("count"), ViewCount.updated_at)
+
+        result = await self.db.execute(stmt)
+        row = result.one()
+        await self.db.commit()
+
+        # Detached snapshot, so reading it does not trigger a refresh query
+        return ViewCount(event_type=row.event_type, count=row.count, updated_at=row.updated_at)
@@ -2,11 +2,18 @@
 Compatibility Router
 사주 궁합 분석 API 엔드포인트
 """
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
+import json
+import math
+from typing import Any, AsyncIterator
 
-from app.schemas.compatibility import CompatibilityRequest, CompatibilityResponse
-from app.services.compatibility_service import compatibility_service
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.schemas.compatibility import CompatibilityBatchRequest, CompatibilityRequest, CompatibilityResponse
+from app.core.config import settings
+from app.core.responses import model_response
+from app.core.resilience import DeadlineExceededError, UpstreamUnavailableError
+from app.services.compatibility_service import compatibility_service, failure_detail
 
 router = APIRouter()
 
@@ -43,12 +50,14 @@ router = APIRouter()
             }
         },
         400: {"description": "잘못된 요청 (유효하지 않은 날짜 등)"},
-        500: {"description": "서버 오류 (OpenAI API 오류 등)"}
+        500: {"description": "서버 오류 (OpenAI API 오류 등)"},
+        503: {"description": "OpenAI 일시 중단 (서킷 브레이커 열림 등), Retry-After 헤더 포함"},
+        504: {"description": "OpenAI 호출 데드라인 초과"}
     }
 )
 async def analyze_compatibility(
     request: CompatibilityRequest
-) -> CompatibilityResponse:
+) -> Response:
     """
     사주 궁합 분석 엔드포인트
 
@@ -74,16 +83,27 @@ async def analyze_compatibility(
     Raises:
         HTTPException 400: 유효하지 않은 날짜
         HTTPException 500: OpenAI API 오류
+        HTTPException 503: OpenAI 일시 중단 (서킷 브레이커 열림, 동시 호출 한도)
+        HTTPException 504: OpenAI 호출 데드라인 초과
     """
     try:
         result = await compatibility_service.analyze_compatibility(request)
-        return result
+        return model_response(result)
 
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except UpstreamUnavailableError as e:
+        print(f"Compatibility analysis unavailable: {str(e)}")
+        status_code, detail = failure_detail(e)
+        headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=status_code, detail=detail, headers=headers)
+    except DeadlineExceededError as e:
+        print(f"Compatibility analysis timed out: {str(e)}")
+        status_code, detail = failure_detail(e)
+        raise HTTPException(status_code=status_code, detail=detail)
     except Exception as e:
         # 프로덕션에서는 상세 에러 메시지를 로그에만 남기고
         # 사용자에게는 일반적인 메시지 반환
@@ -94,21 +114,141 @@ async def analyze_compatibility(
         )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post(
+    "/analyze/stream",
+    status_code=status.HTTP_200_OK,
+    summary="사주 궁합 분석 (스트리밍)",
+    description="분석 결과를 생성되는 대로 Server-Sent Events로 전송합니다.",
+    responses={
+        200: {
+            "description": "text/event-stream. delta/field 이벤트 후 result 또는 error 이벤트로 종료",
+            "content": {"text/event-stream": {}}
+        },
+        400: {"description": "잘못된 요청 (유효하지 않은 날짜 등)"}
+    }
+)
+async def analyze_compatibility_stream(request: CompatibilityRequest) -> StreamingResponse:
+    """
+    사주 궁합 분석 스트리밍 엔드포인트
+
+    이벤트 종류:
+        - delta: {"field", "text"} 문자열 필드에 새로 생성된 글자
+        - field: {"field", "value"} 완성된 필드 값
+        - result: 검증이 끝난 CompatibilityResponse (마지막 이벤트)
+        - error: {"detail"} 분석 실패 (마지막 이벤트)
+
+    Args:
+        request: 궁합 분석 요청 데이터
+
+    Returns:
+        StreamingResponse: text/event-stream 응답
+
+    Raises:
+        HTTPException 400: 유효하지 않은 날짜
+    """
+    # 스트림 시작 후에는 상태 코드를 바꿀 수 없으므로 먼저 검증
+    try:
+        compatibility_service.validate_request(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    async def events() -> AsyncIterator[str]:
+        async for event, data in compatibility_service.stream_compatibility(request):
+            yield _sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # nginx 버퍼링 비활성화
+        }
+    )
+
+
+@router.post(
+    "/analyze/batch",
+    status_code=status.HTTP_200_OK,
+    summary="배치 궁합 분석",
+    description="기준 인물 한 명과 여러 후보의 궁합을 병렬로 분석하여 완료되는 순서대로 NDJSON으로 전송합니다.",
+    responses={
+        200: {
+            "description": "application/x-ndjson. 후보별 item 줄(완료 순) 후 summary 줄로 종료",
+            "content": {"application/x-ndjson": {}}
+        },
+        400: {"description": "잘못된 요청 (기준 인물의 날짜 오류 등)"}
+    }
+)
+async def analyze_compatibility_batch(request: CompatibilityBatchRequest) -> StreamingResponse:
+    """
+    배치 궁합 분석 엔드포인트
+
+    각 줄은 JSON 객체이며, 후보별 결과는 CompatibilityBatchItem(type=item),
+    마지막 줄은 CompatibilityBatchSummary(type=summary)입니다. 후보 중 일부가
+    실패해도 나머지 결과는 그대로 전달되며 실패는 status=error로 보고됩니다.
+
+    Args:
+        request: 배치 분석 요청 데이터
+            - anchor: 기준 인물 정보
+            - candidates: 후보 목록 (최대 500명)
+            - language: 응답 언어 (ko/en)
+
+    Returns:
+        StreamingResponse: application/x-ndjson 응답
+
+    Raises:
+        HTTPException 400: 기준 인물의 날짜 오류 또는 설정 오류
+    """
+    try:
+        compatibility_service.validate_batch(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    async def lines() -> AsyncIterator[str]:
+        async for line in compatibility_service.analyze_batch(request):
+            yield line.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
 @router.get(
     "/health",
     status_code=status.HTTP_200_OK,
     summary="헬스 체크",
     description="궁합 분석 기능의 상태를 확인합니다."
 )
-async def health_check() -> dict[str, str]:
+async def health_check() -> dict[str, Any]:
     """
     헬스 체크 엔드포인트
 
+    서킷 브레이커가 닫혀 있지 않으면 degraded를 반환합니다.
+    (local 모드는 OpenAI를 쓰지 않으므로 항상 healthy)
+
     Returns:
-        dict: 상태 정보
+        dict: 상태 정보 (서킷 브레이커, 재시도 예산 포함)
     """
+    breaker = compatibility_service.breaker.snapshot()
+    healthy = settings.COMPATIBILITY_MODE == "local" or breaker["state"] == "closed"
     return {
-        "status": "healthy",
+        "status": "healthy" if healthy else "degraded",
         "service": "compatibility_analysis",
-        "model": "gpt-4o-mini"
+        "model": compatibility_service.model,
+        "mode": settings.COMPATIBILITY_MODE,
+        "circuit_breaker": breaker,
+        "retry_budget": compatibility_service.retry_budget.snapshot()
     }
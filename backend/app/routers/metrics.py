@@ -0,0 +1,60 @@
+"""
+Metrics Router
+API endpoint exposing subsystem metrics
+"""
+import secrets
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Check the bearer token when METRICS_TOKEN is set
+
+    Raises:
+        HTTPException: If the token is missing or wrong
+    """
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Metrics token required",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("")
+async def get_metrics() -> dict[str, dict[str, Any]]:
+    """
+    Get metrics from every registered subsystem
+
+    Returns:
+        Mapping of subsystem name to its current metric values
+    """
+    return metrics_registry.snapshot()
+
+
+@router.get("/{subsystem}")
+async def get_subsystem_metrics(subsystem: str) -> dict[str, Any]:
+    """
+    Get metrics for one subsystem (e.g. db_pool, view_count_pipeline)
+
+    Args:
+        subsystem: Registered subsystem name
+
+    Returns:
+        Current metric values for the subsystem
+    """
+    metrics = metrics_registry.collect(subsystem)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail=f"Unknown metrics subsystem: {subsystem}")
+    return metrics
@@ -2,23 +2,91 @@
 Statistics Router
 API endpoints for life statistics calculations
 """
-from fastapi import APIRouter, HTTPException, Depends
-from datetime import date
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.schemas.stats import BirthdateRequest, LifeStatsResponse
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.stats import (
+    BirthdateRequest,
+    BulkBirthdateRequest,
+    BulkLifeStatsResponse,
+    LifeStatsResponse
+)
+from app.services.stats_response_cache import etag_matches, stats_response_cache
 from app.services.stats_service import stats_service
+from app.services.view_count_pipeline import view_count_pipeline
 from app.services.view_count_service import ViewCountService
+from app.core.calendar_index import CalendarIndex, calendar_index
+from app.core.config import settings
 from app.core.database import get_db
 
 router = APIRouter()
 
 
+async def _record_stats_calculated(db: AsyncSession) -> None:
+    """Increment stats calculated count"""
+    if settings.VIEW_COUNT_PIPELINE_ENABLED:
+        # Applied by the background consumer; the response does not wait on the database
+        await view_count_pipeline.publish(ViewCountService.STATS_CALCULATED)
+    else:
+        view_count_service = ViewCountService(db)
+        await view_count_service.increment_stats_calculated()
+
+
+def birthdate_query(
+    year: int = Query(..., description="Birth year (1900 or later)"),
+    month: int = Query(..., description="Birth month (1-12)"),
+    day: int = Query(..., description="Birth day (1-31)")
+) -> BirthdateRequest:
+    """Birthdate from query parameters, validated like the request body"""
+    try:
+        return BirthdateRequest(year=year, month=month, day=day)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("query", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+def _validated_index(birthdate: BirthdateRequest) -> CalendarIndex:
+    """
+    Today's calendar index, after checking the birthdate against it
+
+    Raises:
+        HTTPException: If birthdate is in the future
+        ValueError: If the date does not exist
+    """
+    index = calendar_index()
+    if index.days_since(birthdate.year, birthdate.month, birthdate.day) < 0:
+        raise HTTPException(
+            status_code=400,
+            detail="생년월일은 미래 날짜일 수 없습니다."
+        )
+    return index
+
+
+def _life_stats_body(index: CalendarIndex, birthdate: BirthdateRequest) -> bytes:
+    """Serialized LifeStatsResponse, from today's response cache when possible"""
+    key = (birthdate.year, birthdate.month, birthdate.day)
+    if settings.STATS_RESPONSE_CACHE_ENABLED:
+        body = stats_response_cache.get(index, key)
+        if body is not None:
+            return body
+
+    body = stats_service.calculate_life_stats(birthdate).model_dump_json().encode()
+    if settings.STATS_RESPONSE_CACHE_ENABLED:
+        stats_response_cache.set(index, key, body)
+    return body
+
+
 @router.post("/calculate", response_model=LifeStatsResponse)
 async def calculate_stats(
     birthdate: BirthdateRequest,
-    db: Session = Depends(get_db)
-) -> LifeStatsResponse:
+    db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     Calculate life statistics based on birthdate
 
@@ -32,25 +100,70 @@ async def calculate_stats(
         HTTPException: If birthdate is invalid or in the future
     """
     try:
-        # Validate that the date is valid
-        birthdate_obj = birthdate.to_date()
+        index = _validated_index(birthdate)
+        body = _life_stats_body(index, birthdate)
+        await _record_stats_calculated(db)
+        return Response(content=body, media_type="application/json")
 
-        # Check if birthdate is in the future
-        if birthdate_obj > date.today():
-            raise HTTPException(
-                status_code=400,
-                detail="생년월일은 미래 날짜일 수 없습니다."
-            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"유효하지 않은 날짜입니다: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"통계 계산 중 오류가 발생했습니다: {str(e)}"
+        )
 
-        # Calculate statistics
-        stats = stats_service.calculate_life_stats(birthdate)
 
-        # Increment stats calculated count
-        view_count_service = ViewCountService(db)
-        view_count_service.increment_stats_calculated()
+@router.get(
+    "/calculate",
+    response_model=LifeStatsResponse,
+    responses={304: {"description": "Not modified since the ETag in If-None-Match"}}
+)
+async def get_stats(
+    birthdate: BirthdateRequest = Depends(birthdate_query),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Calculate life statistics based on birthdate, cacheable until local midnight
 
-        return stats
+    The result only changes when the day changes, so the response carries a
+    strong ETag derived from the birthdate and today's date, and
+    Cache-Control that expires at local midnight. A matching If-None-Match
+    is answered with 304 without calculating anything, and is not added to
+    the stats-calculated counter (the client already has the result).
 
+    Args:
+        birthdate: Birth date information (year, month, day) as query parameters
+        if_none_match: ETag from an earlier response
+
+    Returns:
+        Comprehensive life statistics, or 304 Not Modified
+
+    Raises:
+        HTTPException: If birthdate is invalid or in the future
+    """
+    try:
+        index = _validated_index(birthdate)
+        headers = {
+            "ETag": stats_response_cache.etag(index, (birthdate.year, birthdate.month, birthdate.day)),
+            "Cache-Control": f"public, max-age={stats_response_cache.max_age(index)}",
+        }
+        if etag_matches(if_none_match, headers["ETag"]):
+            stats_response_cache.record_not_modified()
+            return Response(status_code=304, headers=headers)
+
+        body = _life_stats_body(index, birthdate)
+        await _record_stats_calculated(db)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=400,
@@ -63,6 +176,45 @@ async def calculate_stats(
         )
 
 
+@router.post("/calculate/bulk", response_model=BulkLifeStatsResponse)
+def calculate_stats_bulk(request: BulkBirthdateRequest) -> ORJSONResponse:
+    """
+    Calculate life statistics for many birthdates
+
+    Columnar in and out: parallel year/month/day arrays in, one array per
+    statistic out, in the same row order. Runs in the threadpool so large
+    cohorts do not block the event loop. Bulk calculations are not added to
+    the stats-calculated counter.
+
+    Args:
+        request: Birth years, months and days
+
+    Returns:
+        Columnar life statistics
+
+    Raises:
+        HTTPException: If there are too many rows, or any date is invalid or in the future
+    """
+    count = len(request.year)
+    if count > settings.STATS_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {settings.STATS_BULK_MAX_ROWS}개까지 계산할 수 있습니다."
+        )
+
+    try:
+        columns = stats_service.calculate_bulk_life_stats(request.year, request.month, request.day)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"유효하지 않은 날짜입니다: {str(e)}"
+        )
+
+    # The columns are built from validated integers; skip re-validating them through the response
+    # model and let orjson serialize the NumPy arrays directly
+    return ORJSONResponse(content={"count": count, **columns})
+
+
 @router.get("/test")
 async def test_endpoint() -> dict[str, str]:
     """Test endpoint to verify router is working"""
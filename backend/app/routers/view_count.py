@@ -2,18 +2,38 @@
 View Count Router
 API endpoints for view count tracking
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.view_count import ViewCountResponse, AllViewCountsResponse
+from app.core.responses import model_response
+from app.schemas.view_count import (
+    ViewCountResponse,
+    AllViewCountsResponse,
+    TimeSeriesResponse,
+    UniqueVisitorsResponse
+)
+from app.services.unique_visitor_service import UniqueVisitorService, unique_visitor_counter
 from app.services.view_count_service import ViewCountService
+from app.services.view_count_timeseries_service import ViewCountTimeSeriesService
 
 router = APIRouter()
 
 
+def _visitor_id(request: Request) -> str:
+    """Identify a visitor by explicit ID, or by client address and user agent"""
+    visitor_id = request.headers.get("X-Visitor-Id")
+    if visitor_id:
+        return visitor_id
+    client_ip = request.headers.get("X-Real-IP") or (request.client.host if request.client else "")
+    return f"{client_ip}|{request.headers.get('User-Agent', '')}"
+
+
 @router.post("/page-view", response_model=ViewCountResponse)
-async def increment_page_view(db: Session = Depends(get_db)) -> ViewCountResponse:
+async def increment_page_view(request: Request, db: AsyncSession = Depends(get_db)) -> Response:
     """
     Increment page view count
 
@@ -21,11 +41,13 @@ async def increment_page_view(db: Session = Depends(get_db)) -> ViewCountRespons
         Updated page view count
     """
     service = ViewCountService(db)
-    return service.increment_page_view()
+    if settings.UNIQUE_VISITORS_ENABLED:
+        unique_visitor_counter.add(service.PAGE_VIEW, _visitor_id(request))
+    return model_response(await service.increment_page_view())
 
 
 @router.post("/stats-calculated", response_model=ViewCountResponse)
-async def increment_stats_calculated(db: Session = Depends(get_db)) -> ViewCountResponse:
+async def increment_stats_calculated(db: AsyncSession = Depends(get_db)) -> Response:
     """
     Increment stats calculated count
 
@@ -33,11 +55,11 @@ async def increment_stats_calculated(db: Session = Depends(get_db)) -> ViewCount
         Updated stats calculated count
     """
     service = ViewCountService(db)
-    return service.increment_stats_calculated()
+    return model_response(await service.increment_stats_calculated())
 
 
 @router.get("/all", response_model=AllViewCountsResponse)
-async def get_all_counts(db: Session = Depends(get_db)) -> AllViewCountsResponse:
+async def get_all_counts(db: AsyncSession = Depends(get_db)) -> Response:
     """
     Get all view counts
 
@@ -45,14 +67,70 @@ async def get_all_counts(db: Session = Depends(get_db)) -> AllViewCountsResponse
         All view counts
     """
     service = ViewCountService(db)
-    return service.get_all_counts()
+    return model_response(await service.get_all_counts())
+
+
+@router.get("/timeseries/{event_type}", response_model=TimeSeriesResponse)
+async def get_time_series(
+    event_type: str,
+    granularity: str = Query("hour", description="Bucket size: minute, hour or day"),
+    start: Optional[datetime] = Query(None, description="Inclusive start (UTC unless an offset is given)"),
+    end: Optional[datetime] = Query(None, description="Exclusive end (UTC unless an offset is given)"),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Get counts per time bucket for an event type
+
+    Buckets are only recorded while VIEW_COUNT_TIMESERIES_ENABLED is set.
+    Hour and day buckets come from the rollup tables and lag by up to
+    VIEW_COUNT_ROLLUP_INTERVAL_SECONDS; minute buckets are live.
+
+    Args:
+        event_type: Type of event (page_view, stats_calculated)
+        granularity: Bucket size
+        start: Range start
+        end: Range end
+
+    Returns:
+        Counts per bucket in the requested range
+    """
+    service = ViewCountTimeSeriesService(db)
+    try:
+        return model_response(await service.get_series(event_type, granularity, start, end))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/uniques/{event_type}", response_model=UniqueVisitorsResponse)
+async def get_unique_visitors(
+    event_type: str,
+    start: Optional[date] = Query(None, description="First UTC day (default: end)"),
+    end: Optional[date] = Query(None, description="Last UTC day (default: today)"),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Get the estimated number of unique visitors
+
+    Args:
+        event_type: Type of event (page_view)
+        start: First day of the range
+        end: Last day of the range
+
+    Returns:
+        HyperLogLog estimate with its standard error and ~95% interval
+    """
+    service = UniqueVisitorService(db)
+    try:
+        return model_response(await service.get_unique_visitors(event_type, start, end))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{event_type}", response_model=ViewCountResponse)
 async def get_count_by_type(
     event_type: str,
-    db: Session = Depends(get_db)
-) -> ViewCountResponse:
+    db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     Get count for specific event type
 
@@ -63,4 +141,4 @@ async def get_count_by_type(
         Count for the specified event type
     """
     service = ViewCountService(db)
-    return service.get_count_by_type(event_type)
+    return model_response(await service.get_count_by_type(event_type))
@@ -2,8 +2,8 @@
 Compatibility Analysis Schemas
 사주 궁합 분석 요청/응답 스키마
 """
-from typing import Optional, List
-from pydantic import BaseModel, Field, field_validator
+from typing import Dict, Optional, List
+from pydantic import BaseModel, Field, computed_field, field_validator
 from datetime import datetime
 
 
@@ -79,3 +79,55 @@ class CompatibilityResponse(BaseModel):
                 "advice": "서로를 존중하고 이해하는 마음으로..."
             }
         }
+
+
+class CompatibilityBatchRequest(BaseModel):
+    """배치 궁합 분석 요청 스키마 (기준 인물 한 명과 여러 후보)"""
+    anchor: PersonInfo = Field(..., description="기준 인물 정보")
+    candidates: List[PersonInfo] = Field(..., min_length=1, max_length=500, description="후보 목록 (1-500명)")
+    language: str = Field(default="ko", description="응답 언어 (ko/en)")
+
+    @field_validator('language')
+    @classmethod
+    def validate_language(cls, v: str) -> str:
+        """언어 코드 검증"""
+        if v not in ['ko', 'en']:
+            raise ValueError('language must be either "ko" or "en"')
+        return v
+
+
+class TokenUsage(BaseModel):
+    """OpenAI 토큰 사용량 스키마"""
+    prompt_tokens: int = Field(default=0, description="입력 토큰 수")
+    completion_tokens: int = Field(default=0, description="출력 토큰 수")
+
+    @computed_field
+    @property
+    def total_tokens(self) -> int:
+        """전체 토큰 수"""
+        return self.prompt_tokens + self.completion_tokens
+
+
+class CompatibilityBatchItem(BaseModel):
+    """배치 분석 후보별 결과 스키마 (NDJSON 한 줄)"""
+    type: str = Field(default="item", description="줄 종류 (item)")
+    index: int = Field(..., description="candidates 목록에서의 위치")
+    status: str = Field(..., description="ok 또는 error")
+    source: Optional[str] = Field(None, description="결과 출처 (local/cache/llm/coalesced/fallback)")
+    result: Optional[CompatibilityResponse] = Field(None, description="분석 결과 (성공 시)")
+    error: Optional[str] = Field(None, description="오류 메시지 (실패 시)")
+    latency_ms: float = Field(..., description="후보별 처리 시간 (ms)")
+    usage: TokenUsage = Field(default_factory=TokenUsage, description="이 항목이 사용한 토큰")
+    cost_usd: float = Field(default=0.0, description="이 항목의 예상 OpenAI 비용 (USD)")
+
+
+class CompatibilityBatchSummary(BaseModel):
+    """배치 분석 요약 스키마 (NDJSON 마지막 줄)"""
+    type: str = Field(default="summary", description="줄 종류 (summary)")
+    total: int = Field(..., description="후보 수")
+    succeeded: int = Field(default=0, description="성공 수")
+    failed: int = Field(default=0, description="실패 수")
+    sources: Dict[str, int] = Field(default_factory=dict, description="출처별 결과 수")
+    latency_ms: float = Field(default=0.0, description="전체 처리 시간 (ms)")
+    usage: TokenUsage = Field(default_factory=TokenUsage, description="전체 토큰 사용량")
+    cost_usd: float = Field(default=0.0, description="전체 예상 OpenAI 비용 (USD)")
@@ -3,7 +3,9 @@ Statistics Schemas
 Pydantic models for request/response validation
 """
 from datetime import date
-from pydantic import BaseModel, Field, field_validator
+from typing import List
+
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class BirthdateRequest(BaseModel):
@@ -58,3 +60,43 @@ class LifeStatsResponse(BaseModel):
                 "age_years": 27
             }
         }
+
+
+class BulkBirthdateRequest(BaseModel):
+    """Request schema for many birthdates, as parallel year/month/day columns"""
+    year: List[int] = Field(..., min_length=1, description="Birth years")
+    month: List[int] = Field(..., min_length=1, description="Birth months (1-12)")
+    day: List[int] = Field(..., min_length=1, description="Birth days (1-31)")
+
+    @model_validator(mode='after')
+    def validate_columns(self) -> 'BulkBirthdateRequest':
+        """Validate the columns have the same length"""
+        if not len(self.year) == len(self.month) == len(self.day):
+            raise ValueError("year, month and day must have the same length")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "year": [1990, 2000],
+                "month": [5, 2],
+                "day": [17, 29]
+            }
+        }
+
+
+class BulkLifeStatsResponse(BaseModel):
+    """Response schema for bulk life statistics: one column per LifeStatsResponse field, in request order"""
+    count: int = Field(..., description="Number of rows")
+    total_days: List[int]
+    total_hours: List[int]
+    total_minutes: List[int]
+    total_seconds: List[int]
+    heartbeats: List[int]
+    breaths: List[int]
+    sleep_hours: List[int]
+    meals_eaten: List[int]
+    days_until_next_birthday: List[int]
+    days_until_next_milestone: List[int]
+    next_milestone: List[int]
+    age_years: List[int]
@@ -2,7 +2,7 @@
 View Count Schemas
 Pydantic models for view count request/response validation
 """
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 
@@ -35,3 +35,61 @@ class AllViewCountsResponse(BaseModel):
                 "total_stats_calculated": 1234
             }
         }
+
+
+class TimeSeriesPoint(BaseModel):
+    """Single bucket of a view count time series"""
+    bucket_start: datetime = Field(..., description="Bucket start (UTC)")
+    count: int = Field(..., description="Events in the bucket")
+
+    class Config:
+        from_attributes = True
+
+
+class TimeSeriesResponse(BaseModel):
+    """Response schema for a view count time series"""
+    event_type: str = Field(..., description="Type of event")
+    granularity: str = Field(..., description="Bucket size (minute, hour, day)")
+    start: datetime = Field(..., description="Inclusive range start (UTC)")
+    end: datetime = Field(..., description="Exclusive range end (UTC)")
+    total: int = Field(..., description="Sum of counts in the range")
+    points: list[TimeSeriesPoint] = Field(..., description="Non-empty buckets, oldest first")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "event_type": "page_view",
+                "granularity": "hour",
+                "start": "2024-01-12T00:00:00",
+                "end": "2024-01-13T00:00:00",
+                "total": 42,
+                "points": [
+                    {"bucket_start": "2024-01-12T09:00:00", "count": 30},
+                    {"bucket_start": "2024-01-12T10:00:00", "count": 12}
+                ]
+            }
+        }
+
+
+class UniqueVisitorsResponse(BaseModel):
+    """Response schema for estimated unique visitors"""
+    event_type: str = Field(..., description="Type of event")
+    start: date = Field(..., description="First day (UTC, inclusive)")
+    end: date = Field(..., description="Last day (UTC, inclusive)")
+    unique_visitors: int = Field(..., description="Estimated distinct visitors")
+    standard_error: float = Field(..., description="Relative standard error of the estimate")
+    lower_bound: int = Field(..., description="Lower end of the ~95% confidence interval")
+    upper_bound: int = Field(..., description="Upper end of the ~95% confidence interval")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "event_type": "page_view",
+                "start": "2024-01-12",
+                "end": "2024-01-12",
+                "unique_visitors": 1000,
+                "standard_error": 0.0081,
+                "lower_bound": 984,
+                "upper_bound": 1016
+            }
+        }
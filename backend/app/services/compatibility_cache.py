@@ -0,0 +1,275 @@
+"""
+Compatibility Cache
+궁합 분석 결과 캐시 (정규화된 입력 기반 키, 메모리 LRU / DB 공유 백엔드)
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics_registry
+from app.core.periodic import PeriodicTask
+from app.repositories.compatibility_cache_repository import CompatibilityCacheRepository
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo
+
+# 키 형식이나 프롬프트가 바뀌면 올려서 이전 캐시를 무효화
+CACHE_KEY_VERSION = 1
+
+
+def _normalize_person(person: PersonInfo) -> Dict[str, Any]:
+    """결과에 영향을 주는 필드만 정규화 (이름은 공백 제거, 빈 이름은 None)"""
+    name = person.name.strip() if person.name else None
+    return {
+        "birth_year": person.birth_year,
+        "birth_month": person.birth_month,
+        "birth_day": person.birth_day,
+        "birth_hour": person.birth_hour,
+        "gender": person.gender,
+        "name": name or None,
+    }
+
+
+def cache_key(request: CompatibilityRequest, model: str, prompt_variant: str = "full") -> str:
+    """
+    정규화된 요청의 SHA-256 키 생성
+
+    두 사람은 정렬 후 해싱하므로 A+B와 B+A는 같은 키를 가진다.
+
+    Args:
+        request: 궁합 분석 요청 데이터
+        model: 분석에 사용하는 모델 이름
+        prompt_variant: 프롬프트 변형 (full이 아니면 키에 포함)
+
+    Returns:
+        16진수 키 문자열
+    """
+    people = sorted(
+        json.dumps(_normalize_person(p), sort_keys=True)
+        for p in (request.person1, request.person2)
+    )
+    fields = {"v": CACHE_KEY_VERSION, "model": model, "language": request.language, "people": people}
+    if prompt_variant != "full":
+        # 기존 full 프롬프트 결과의 키는 그대로 유지
+        fields["prompt"] = prompt_variant
+    canonical = json.dumps(
+        fields,
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU 캐시 (TTL, 최대 개수 제한)"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (만료 시각(monotonic), 결과)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회 (만료된 항목은 삭제)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """캐시 저장 (초과 시 가장 오래 사용하지 않은 항목부터 제거)"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def size(self) -> int:
+        """저장된 항목 수"""
+        return len(self._entries)
+
+
+class DatabaseCacheBackend:
+    """DB 공유 캐시 (워커 간 캐시 공유, 주기적으로 만료/초과 항목 정리)"""
+
+    name = "database"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_entries: int,
+        ttl_seconds: float
+    ):
+        self._session_factory = session_factory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회"""
+        async with self._session_factory() as db:
+            result = await CompatibilityCacheRepository(db).get(key, datetime.utcnow())
+        return json.loads(result) if result is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """캐시 저장"""
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            await CompatibilityCacheRepository(db).set(
+                key,
+                json.dumps(value, ensure_ascii=False),
+                now,
+                now + timedelta(seconds=self.ttl_seconds)
+            )
+
+    async def evict(self) -> int:
+        """만료 항목과 최대 개수를 넘는 오래된 항목 삭제"""
+        async with self._session_factory() as db:
+            deleted = await CompatibilityCacheRepository(db).evict(datetime.utcnow(), self.max_entries)
+        self.evictions += deleted
+        return deleted
+
+
+class CompatibilityCache:
+    """
+    궁합 분석 결과 캐시
+
+    메모리 백엔드를 앞에 두고 DB 백엔드를 뒤에 두는 2단 구성도 가능하다.
+    캐시 오류는 미스로 취급하여 분석 요청은 실패하지 않는다.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[MemoryCacheBackend] = None,
+        database: Optional[DatabaseCacheBackend] = None
+    ):
+        self.memory = memory
+        self.database = database
+        self.hits = 0
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        """백엔드가 하나라도 있는지 여부"""
+        return self.memory is not None or self.database is not None
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        캐시 조회
+
+        Args:
+            key: cache_key()로 만든 키
+
+        Returns:
+            저장된 CompatibilityResponse 데이터, 없으면 None
+        """
+        if self.memory is not None:
+            value = await self.memory.get(key)
+            if value is not None:
+                self.hits += 1
+                self.memory_hits += 1
+                return value
+
+        if self.database is not None:
+            try:
+                value = await self.database.get(key)
+            except Exception as e:
+                self.errors += 1
+                print(f"Compatibility cache read error: {str(e)}")
+                value = None
+            if value is not None:
+                self.hits += 1
+                self.database_hits += 1
+                if self.memory is not None:
+                    await self.memory.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        캐시 저장
+
+        Args:
+            key: cache_key()로 만든 키
+            value: CompatibilityResponse 데이터
+        """
+        self.sets += 1
+        if self.memory is not None:
+            await self.memory.set(key, value)
+        if self.database is not None:
+            try:
+                await self.database.set(key, value)
+            except Exception as e:
+                self.errors += 1
+                print(f"Compatibility cache write error: {str(e)}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """현재 캐시 지표"""
+        lookups = self.hits + self.misses
+        return {
+            "backends": [b.name for b in (self.memory, self.database) if b is not None],
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "database_hits": self.database_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "errors": self.errors,
+            "memory_size": self.memory.size() if self.memory is not None else 0,
+            "memory_evictions": self.memory.evictions if self.memory is not None else 0,
+            "memory_expirations": self.memory.expirations if self.memory is not None else 0,
+            "database_evictions": self.database.evictions if self.database is not None else 0,
+        }
+
+
+def _build_cache() -> CompatibilityCache:
+    """설정(COMPATIBILITY_CACHE_BACKEND)에 따라 캐시 구성"""
+    backend = settings.COMPATIBILITY_CACHE_BACKEND
+    if backend not in ("none", "memory", "database", "tiered"):
+        raise ValueError("COMPATIBILITY_CACHE_BACKEND must be 'none', 'memory', 'database' or 'tiered'")
+
+    ttl = settings.COMPATIBILITY_CACHE_TTL_SECONDS
+    memory = None
+    database = None
+    if backend in ("memory", "tiered"):
+        memory = MemoryCacheBackend(settings.COMPATIBILITY_CACHE_MAX_ENTRIES, ttl)
+    if backend in ("database", "tiered"):
+        database = DatabaseCacheBackend(SessionLocal, settings.COMPATIBILITY_CACHE_DB_MAX_ENTRIES, ttl)
+    return CompatibilityCache(memory=memory, database=database)
+
+
+async def evict_compatibility_cache() -> None:
+    """DB 캐시 정리 작업"""
+    if compatibility_cache.database is not None:
+        await compatibility_cache.database.evict()
+
+
+# 싱글톤 인스턴스
+compatibility_cache = _build_cache()
+compatibility_cache_eviction = PeriodicTask(
+    "Compatibility cache eviction",
+    settings.COMPATIBILITY_CACHE_EVICTION_INTERVAL_SECONDS,
+    evict_compatibility_cache
+)
+metrics_registry.register("compatibility_cache", compatibility_cache.metrics)
@@ -0,0 +1,266 @@
+"""
+Compatibility Prompts
+궁합 분석 프롬프트 템플릿 (import 시 한 번 컴파일), 토큰 수 계산 및 사용량 집계
+
+토큰 수는 tiktoken이 설치되어 있으면 실제 토크나이저로, 없으면 문자 수 기반
+추정치로 계산한다 (tiktoken은 선택 의존성).
+"""
+import math
+from string import Formatter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo, TokenUsage
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# 연도 -> (띠, 오행)
+YearInfo = Dict[int, Tuple[Dict[str, str], Dict[str, str]]]
+
+VARIANTS = ("full", "compact")
+
+
+class PromptTemplate:
+    """리터럴 조각과 필드 이름으로 미리 분해해 둔 str.format 템플릿"""
+
+    def __init__(self, text: str):
+        self.parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(text)
+        ]
+        self.fields = {field for _, field in self.parts if field}
+
+    def render(self, values: Dict[str, str]) -> str:
+        """필드 값을 채운 문자열"""
+        return "".join(literal + (values[field] if field else "") for literal, field in self.parts)
+
+
+# 기존 프롬프트와 동일한 전체 버전
+_FULL_SYSTEM = "You are a professional Saju fortune teller. Always respond in valid JSON format."
+
+_FULL_USER = {
+    "ko": PromptTemplate("""당신은 전문 사주 명리학자입니다. 두 사람의 사주 궁합을 분석해주세요.
+
+**{name1}의 정보:**
+- 생년월일: {date1}
+- 생시: {hour1}
+- 성별: {gender1}
+- 띠: {zodiac1}띠
+- 오행: {element1}
+
+**{name2}의 정보:**
+- 생년월일: {date2}
+- 생시: {hour2}
+- 성별: {gender2}
+- 띠: {zodiac2}띠
+- 오행: {element2}
+
+아래 JSON 형식으로 정확히 응답해주세요:
+
+{{
+  "score": 0-100 사이의 궁합 점수 (정수),
+  "summary": "전체적인 궁합에 대한 2-3문장 요약",
+  "strengths": ["강점 1", "강점 2", "강점 3"],
+  "cautions": ["주의할 점 1", "주의할 점 2", "주의할 점 3"],
+  "elements_analysis": "오행 관점에서의 상생상극 분석 (2-3문장)",
+  "zodiac_compatibility": "띠 궁합 분석 (2-3문장)",
+  "advice": "두 사람을 위한 조언 및 팁 (2-3문장)"
+}}
+
+**중요 지침:**
+1. 반드시 유효한 JSON 형식으로만 응답하세요.
+2. strengths와 cautions는 정확히 3개의 항목을 포함해야 합니다.
+3. score는 0-100 사이의 정수여야 합니다.
+4. 모든 텍스트는 한국어로 작성하세요.
+5. 긍정적이면서도 현실적인 조언을 제공하세요."""),
+    "en": PromptTemplate("""You are a professional Saju (Four Pillars of Destiny) fortune teller. Please analyze the compatibility between two people.
+
+**{name1}'s Information:**
+- Birth Date: {date1}
+- Birth Hour: {hour1}
+- Gender: {gender1}
+- Zodiac: {zodiac1}
+- Element: {element1}
+
+**{name2}'s Information:**
+- Birth Date: {date2}
+- Birth Hour: {hour2}
+- Gender: {gender2}
+- Zodiac: {zodiac2}
+- Element: {element2}
+
+Please respond in exactly this JSON format:
+
+{{
+  "score": compatibility score between 0-100 (integer),
+  "summary": "Overall compatibility summary in 2-3 sentences",
+  "strengths": ["Strength 1", "Strength 2", "Strength 3"],
+  "cautions": ["Caution 1", "Caution 2", "Caution 3"],
+  "elements_analysis": "Analysis from Five Elements perspective (2-3 sentences)",
+  "zodiac_compatibility": "Chinese zodiac compatibility analysis (2-3 sentences)",
+  "advice": "Advice and tips for the couple (2-3 sentences)"
+}}
+
+**Important Guidelines:**
+1. Respond ONLY in valid JSON format.
+2. strengths and cautions must contain exactly 3 items each.
+3. score must be an integer between 0-100.
+4. All text should be in English.
+5. Provide positive yet realistic advice."""),
+}
+
+# 간결한 버전: 고정 지침과 출력 스키마는 system 메시지에 한 번만, user 메시지는 두 사람 정보만
+_COMPACT_SYSTEM = {
+    "ko": (
+        "사주 명리학자로서 두 사람의 궁합을 분석해 한국어 JSON으로만 답하세요. "
+        '형식: {"score": 0-100 정수, "summary": "요약 2-3문장", "strengths": [강점 정확히 3개], '
+        '"cautions": [주의점 정확히 3개], "elements_analysis": "오행 상생상극 2-3문장", '
+        '"zodiac_compatibility": "띠 궁합 2-3문장", "advice": "조언 2-3문장"}. 긍정적이되 현실적으로.'
+    ),
+    "en": (
+        "As a Saju fortune teller, analyze two people's compatibility and reply only with JSON in English. "
+        'Format: {"score": integer 0-100, "summary": "2-3 sentences", "strengths": [exactly 3], '
+        '"cautions": [exactly 3], "elements_analysis": "Five Elements, 2-3 sentences", '
+        '"zodiac_compatibility": "zodiac, 2-3 sentences", "advice": "2-3 sentences"}. Positive yet realistic.'
+    ),
+}
+
+_COMPACT_USER = {
+    "ko": PromptTemplate(
+        "{name1}: {date1}, 생시 {hour1}, 성별 {gender1}, {zodiac1}띠, {element1}\n"
+        "{name2}: {date2}, 생시 {hour2}, 성별 {gender2}, {zodiac2}띠, {element2}"
+    ),
+    "en": PromptTemplate(
+        "{name1}: born {date1}, hour {hour1}, gender {gender1}, {zodiac1}, {element1}\n"
+        "{name2}: born {date2}, hour {hour2}, gender {gender2}, {zodiac2}, {element2}"
+    ),
+}
+
+
+def _person_values(person: PersonInfo, index: int, lang: str, zodiac: Dict[str, str], element: Dict[str, str]) -> Dict[str, str]:
+    """한 사람의 템플릿 필드 값"""
+    if lang == "ko":
+        default_name = "첫 번째 사람" if index == 1 else "두 번째 사람"
+        date = f"{person.birth_year}년 {person.birth_month}월 {person.birth_day}일"
+        hour = f"{person.birth_hour}시" if person.birth_hour is not None else "미제공"
+        gender = person.gender if person.gender else "미제공"
+    else:
+        default_name = f"Person {index}"
+        date = f"{person.birth_month}/{person.birth_day}/{person.birth_year}"
+        hour = f"{person.birth_hour}:00" if person.birth_hour is not None else "Not provided"
+        gender = person.gender if person.gender else "Not provided"
+    return {
+        f"name{index}": person.name if person.name else default_name,
+        f"date{index}": date,
+        f"hour{index}": hour,
+        f"gender{index}": gender,
+        f"zodiac{index}": zodiac[lang],
+        f"element{index}": element[lang],
+    }
+
+
+def build_messages(
+    request: CompatibilityRequest,
+    variant: str,
+    year_lookup: Callable[[int], Tuple[Dict[str, str], Dict[str, str]]],
+    year_info: Optional[YearInfo] = None
+) -> List[Dict[str, str]]:
+    """
+    Chat Completions 메시지 생성
+
+    Args:
+        request: 궁합 분석 요청 데이터
+        variant: 'full' (기존 프롬프트) 또는 'compact'
+        year_lookup: 연도 -> (띠, 오행)
+        year_info: 미리 계산한 연도별 띠/오행 (배치용)
+
+    Returns:
+        system, user 메시지 목록
+    """
+    lang = request.language
+    p1, p2 = request.person1, request.person2
+    zodiac1, element1 = year_info[p1.birth_year] if year_info else year_lookup(p1.birth_year)
+    zodiac2, element2 = year_info[p2.birth_year] if year_info else year_lookup(p2.birth_year)
+    values = {
+        **_person_values(p1, 1, lang, zodiac1, element1),
+        **_person_values(p2, 2, lang, zodiac2, element2),
+    }
+
+    if variant == "compact":
+        system, user = _COMPACT_SYSTEM[lang], _COMPACT_USER[lang]
+    else:
+        system, user = _FULL_SYSTEM, _FULL_USER[lang]
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user.render(values)},
+    ]
+
+
+# gpt-4o 계열 토크나이저
+_encoding = tiktoken.get_encoding("o200k_base") if tiktoken is not None else None
+TOKEN_COUNTER = "tiktoken" if _encoding is not None else "heuristic"
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수
+
+    tiktoken이 없으면 ASCII 4자당 1토큰, 그 밖의 문자(한글 등)는 1자당
+    1토큰으로 추정한다.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    ascii_chars = sum(1 for char in text if char.isascii())
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """메시지 목록의 입력 토큰 수 (메시지당 3, 응답 준비 3 토큰 포함)"""
+    return sum(3 + count_tokens(message["content"]) for message in messages) + 3
+
+
+class PromptStats:
+    """프롬프트 변형별 예상/실제 토큰 사용량 집계"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record_prompt(self, variant: str, estimated_tokens: int) -> None:
+        """프롬프트 생성 기록"""
+        stats = self._variant(variant)
+        stats["prompts"] += 1
+        stats["estimated_prompt_tokens"] += estimated_tokens
+
+    def record_usage(self, variant: str, usage: TokenUsage) -> None:
+        """OpenAI가 보고한 실제 사용량 기록"""
+        stats = self._variant(variant)
+        stats["responses"] += 1
+        stats["prompt_tokens"] += usage.prompt_tokens
+        stats["completion_tokens"] += usage.completion_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        """변형별 누적 사용량과 평균"""
+        variants = {}
+        for variant, stats in self._stats.items():
+            responses = stats["responses"]
+            variants[variant] = {
+                **stats,
+                "avg_estimated_prompt_tokens": round(stats["estimated_prompt_tokens"] / stats["prompts"], 1)
+                if stats["prompts"] else 0.0,
+                "avg_prompt_tokens": round(stats["prompt_tokens"] / responses, 1) if responses else 0.0,
+                "avg_completion_tokens": round(stats["completion_tokens"] / responses, 1) if responses else 0.0,
+            }
+        return {"token_counter": TOKEN_COUNTER, "variants": variants}
+
+    def _variant(self, variant: str) -> Dict[str, int]:
+        """변형별 집계 dict"""
+        if variant not in self._stats:
+            self._stats[variant] = {
+                "prompts": 0,
+                "estimated_prompt_tokens": 0,
+                "responses": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            }
+        return self._stats[variant]
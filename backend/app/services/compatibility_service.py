@@ -2,27 +2,146 @@
 Compatibility Service
 사주 궁합 분석 비즈니스 로직 및 OpenAI API 통합
 """
-from typing import Dict, Any
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, List, Optional, Tuple
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime
+import asyncio
 import json
-from openai import OpenAI
+import time
 
 from app.schemas.compatibility import (
     PersonInfo,
     CompatibilityRequest,
-    CompatibilityResponse
+    CompatibilityResponse,
+    CompatibilityBatchRequest,
+    CompatibilityBatchItem,
+    CompatibilityBatchSummary,
+    TokenUsage
 )
 from app.core.config import settings
+from app.core.instrumentation import instrumentation
+from app.core.metrics import Histogram, metrics_registry
+from app.core.resilience import (
+    CircuitBreaker,
+    DeadlineExceededError,
+    RetryBudget,
+    UpstreamUnavailableError,
+    backoff_delay
+)
+from app.core.single_flight import SingleFlight
+from app.core.streaming_json import JsonObjectStreamParser
+from app.services.compatibility_cache import cache_key, compatibility_cache
+from app.services.compatibility_prompts import PromptStats, YearInfo, build_messages, count_message_tokens
+from app.services.saju_engine import ELEMENTS, ZODIACS, element_index, saju_engine, zodiac_index
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+# OpenAI 호출 지연 시간 버킷 (ms)
+LLM_LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000)
+
+
+def retryable_errors() -> Tuple[type, ...]:
+    """
+    재시도할 수 있는 OpenAI 오류 (연결/타임아웃, 429, 5xx)
+
+    openai 패키지는 import 비용이 커서 (~0.2초) 첫 호출 때 불러온다.
+    """
+    import openai
+    return (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+def failure_detail(error: Exception) -> Tuple[int, str]:
+    """
+    분석 실패 -> (HTTP 상태 코드, 사용자용 메시지)
+
+    Args:
+        error: 분석 중 발생한 예외
+
+    Returns:
+        503 (업스트림 일시 중단), 504 (데드라인 초과) 또는 500
+    """
+    if isinstance(error, UpstreamUnavailableError):
+        return 503, "Compatibility analysis is temporarily unavailable. Please try again later."
+    if isinstance(error, DeadlineExceededError):
+        return 504, "Compatibility analysis timed out. Please try again later."
+    return 500, "Failed to analyze compatibility. Please try again later."
 
 
 class CompatibilityService:
     """사주 궁합 분석 서비스"""
 
     def __init__(self):
-        """OpenAI 클라이언트 초기화"""
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        """서비스 상태 초기화 (OpenAI 클라이언트는 첫 사용 시 생성)"""
+        self._client: Optional["AsyncOpenAI"] = None
         self.model = "gpt-4o-mini"
 
+        # 프로세스당 동시 OpenAI 호출 수 제한
+        self._semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.latency_ms = Histogram(LLM_LATENCY_BUCKETS_MS)
+        self.first_token_ms = Histogram(LLM_LATENCY_BUCKETS_MS)  # 스트리밍 호출만
+
+        # 프롬프트 변형별 토큰 사용량
+        self.prompt_stats = PromptStats()
+
+        # 동일한 분석이 진행 중이면 그 결과를 함께 기다림
+        self.flights = SingleFlight()
+
+        # 장애 대응 정책
+        self.breaker = CircuitBreaker(
+            "OpenAI",
+            failure_threshold=settings.OPENAI_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.OPENAI_BREAKER_RESET_SECONDS
+        )
+        self.retry_budget = RetryBudget(
+            ratio=settings.OPENAI_RETRY_BUDGET_RATIO,
+            min_per_second=settings.OPENAI_RETRY_BUDGET_MIN_PER_SECOND,
+            capacity=settings.OPENAI_RETRY_BUDGET_CAPACITY
+        )
+        self.deadline_exceeded = 0
+
+        # 로컬 엔진 사용 횟수
+        self.local_results = 0
+        self.fallbacks = 0
+
+        # 배치 분석 횟수
+        self.batches = 0
+        self.batch_items = 0
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        """OpenAI 비동기 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None:
+            import httpx
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL or None,
+                timeout=httpx.Timeout(
+                    settings.OPENAI_TIMEOUT_SECONDS,
+                    connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS
+                ),
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
+        return self._client
+
+    async def warm_up(self) -> None:
+        """클라이언트를 미리 생성 (openai import 비용을 첫 요청에서 빼기 위해, 스레드에서 실행)"""
+        await asyncio.to_thread(lambda: self.client)
+
+    async def close(self) -> None:
+        """OpenAI 클라이언트 연결 종료 (생성된 적이 있을 때만)"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
     def _validate_date(self, person: PersonInfo) -> bool:
         """날짜 유효성 검증"""
         try:
@@ -31,119 +150,270 @@ class CompatibilityService:
         except ValueError:
             return False
 
-    def _calculate_zodiac(self, year: int) -> str:
+    def _calculate_zodiac(self, year: int) -> Dict[str, str]:
         """띠 계산 (12지신)"""
-        zodiacs = ["원숭이", "닭", "개", "돼지", "쥐", "소", "호랑이", "토끼", "용", "뱀", "말", "양"]
-        zodiacs_en = ["Monkey", "Rooster", "Dog", "Pig", "Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake", "Horse", "Goat"]
-        index = year % 12
-        return {"ko": zodiacs[index], "en": zodiacs_en[index]}
+        return ZODIACS[zodiac_index(year)]
 
-    def _calculate_elements(self, year: int) -> str:
+    def _calculate_elements(self, year: int) -> Dict[str, str]:
         """오행 계산 (木火土金水)"""
-        elements = {
-            0: {"ko": "금(金)", "en": "Metal"},
-            1: {"ko": "금(金)", "en": "Metal"},
-            2: {"ko": "수(水)", "en": "Water"},
-            3: {"ko": "수(水)", "en": "Water"},
-            4: {"ko": "목(木)", "en": "Wood"},
-            5: {"ko": "목(木)", "en": "Wood"},
-            6: {"ko": "화(火)", "en": "Fire"},
-            7: {"ko": "화(火)", "en": "Fire"},
-            8: {"ko": "토(土)", "en": "Earth"},
-            9: {"ko": "토(土)", "en": "Earth"},
+        return ELEMENTS[element_index(year)]
+
+    def _year_info(self, year: int) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """출생 연도의 띠와 오행"""
+        return self._calculate_zodiac(year), self._calculate_elements(year)
+
+    def _build_messages(
+        self,
+        request: CompatibilityRequest,
+        year_info: Optional[YearInfo] = None
+    ) -> List[Dict[str, str]]:
+        """GPT 메시지 생성 (year_info가 있으면 미리 계산한 띠/오행 사용)"""
+        variant = settings.COMPATIBILITY_PROMPT_VARIANT
+        messages = build_messages(request, variant, self._year_info, year_info)
+        self.prompt_stats.record_prompt(variant, count_message_tokens(messages))
+        return messages
+
+    @asynccontextmanager
+    async def _upstream_slot(self) -> AsyncIterator[None]:
+        """
+        동시 호출 수 제한 슬롯 확보 및 호출 지표 기록
+
+        Raises:
+            UpstreamUnavailableError: 대기 시간 초과
+        """
+        self.waiting += 1
+        try:
+            # wait_for는 획득과 같은 순간에 온 취소를 삼켜 취소된 요청이 OpenAI를 호출하게 됨
+            async with asyncio.timeout(settings.OPENAI_CONCURRENCY_WAIT_SECONDS):
+                await self._semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise UpstreamUnavailableError("OpenAI concurrency limit reached", retry_after=1.0)
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        self.calls += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            import openai
+            if isinstance(e, openai.APITimeoutError):
+                self.timeouts += 1
+            else:
+                self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.latency_ms.observe((time.perf_counter() - started) * 1000)
+            self._semaphore.release()
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> Tuple[str, TokenUsage]:
+        """
+        재시도, 서킷 브레이커, 데드라인 정책을 적용한 OpenAI 호출
+
+        재시도할 수 있는 오류는 지수 백오프(full jitter)로 최대
+        OPENAI_RETRY_ATTEMPTS번 재시도하되, 프로세스 공용 재시도 예산이
+        남아 있고 데드라인 전에 끝날 수 있을 때만 재시도한다.
+
+        Args:
+            messages: Chat Completions 메시지
+
+        Returns:
+            (모델 응답 본문 (JSON 문자열), 토큰 사용량)
+
+        Raises:
+            CircuitOpenError: 서킷 브레이커가 열려 있음
+            UpstreamUnavailableError: 동시 호출 슬롯 대기 시간 초과
+            DeadlineExceededError: OPENAI_DEADLINE_SECONDS 초과
+            Exception: 재시도 후에도 실패한 API 오류
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.OPENAI_DEADLINE_SECONDS
+        self.retry_budget.deposit()
+        attempt = 0
+
+        while True:
+            self.breaker.allow()
+            try:
+                result = await asyncio.wait_for(self._complete_once(messages), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                self.deadline_exceeded += 1
+                raise DeadlineExceededError(
+                    f"OpenAI call exceeded the {settings.OPENAI_DEADLINE_SECONDS:g}s deadline"
+                )
+            except Exception as e:
+                if not isinstance(e, retryable_errors()):
+                    # 요청 자체의 문제(4xx)나 슬롯 부족은 업스트림 상태와 무관
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                delay = backoff_delay(
+                    attempt,
+                    settings.OPENAI_RETRY_BASE_DELAY_SECONDS,
+                    settings.OPENAI_RETRY_MAX_DELAY_SECONDS
+                )
+                if (
+                    attempt >= settings.OPENAI_RETRY_ATTEMPTS
+                    or loop.time() + delay >= deadline
+                    or not self.retry_budget.try_withdraw()
+                ):
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # 호출자 취소 등: 반열림 시험 호출을 쥔 채로 끝나지 않도록 반납
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    async def _complete_once(self, messages: List[Dict[str, str]]) -> Tuple[str, TokenUsage]:
+        """
+        동시 호출 수 제한 안에서 OpenAI Chat Completions 1회 호출
+
+        Args:
+            messages: Chat Completions 메시지
+
+        Returns:
+            (모델 응답 본문 (JSON 문자열), 토큰 사용량)
+        """
+        async with self._upstream_slot():
+            with instrumentation.timer("openai.chat_completion"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1500,
+                    response_format={"type": "json_object"}
+                )
+            return response.choices[0].message.content, self._record_usage(response.usage)
+
+    def _record_usage(self, usage: Any) -> TokenUsage:
+        """OpenAI가 보고한 토큰 사용량 기록 (보고가 없으면 0)"""
+        if usage is None:
+            return TokenUsage()
+        token_usage = TokenUsage(
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens
+        )
+        self.prompt_stats.record_usage(settings.COMPATIBILITY_PROMPT_VARIANT, token_usage)
+        return token_usage
+
+    async def _complete_stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        OpenAI Chat Completions 스트리밍 호출
+
+        Args:
+            messages: Chat Completions 메시지
+
+        Yields:
+            str: 모델이 생성한 응답 조각
+
+        Raises:
+            CircuitOpenError: 서킷 브레이커가 열려 있음
+            UpstreamUnavailableError: 동시 호출 슬롯 대기 시간 초과
+            Exception: 타임아웃 또는 API 오류 (이미 일부를 보냈으므로 재시도하지 않음)
+        """
+        self.breaker.allow()
+        healthy = None
+        try:
+            async with self._upstream_slot():
+                started = time.perf_counter()
+                first = True
+                # 스트림 끝까지의 전체 시간
+                with instrumentation.timer("openai.chat_completion_stream"):
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=1500,
+                        response_format={"type": "json_object"},
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    )
+                    async with stream:
+                        async for chunk in stream:
+                            if chunk.usage is not None:
+                                # 마지막 청크 (choices 없음)
+                                self._record_usage(chunk.usage)
+                            if not chunk.choices or not chunk.choices[0].delta.content:
+                                continue
+                            if first:
+                                self.first_token_ms.observe((time.perf_counter() - started) * 1000)
+                                first = False
+                            yield chunk.choices[0].delta.content
+            healthy = True
+        except Exception as e:
+            if isinstance(e, retryable_errors()):
+                healthy = False
+            raise
+        finally:
+            if healthy is True:
+                self.breaker.record_success()
+            elif healthy is False:
+                self.breaker.record_failure()
+            else:
+                # 클라이언트 연결 종료 등 업스트림 상태와 무관한 종료
+                self.breaker.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """OpenAI 호출 지표"""
+        return {
+            "mode": settings.COMPATIBILITY_MODE,
+            "local_results": self.local_results,
+            "fallbacks": self.fallbacks,
+            "batches": self.batches,
+            "batch_items": self.batch_items,
+            "max_concurrency": settings.OPENAI_MAX_CONCURRENCY,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "deadline_exceeded": self.deadline_exceeded,
+            "circuit_breaker": self.breaker.snapshot(),
+            "retry_budget": self.retry_budget.snapshot(),
+            "latency_ms": self.latency_ms.snapshot(),
+            "first_token_ms": self.first_token_ms.snapshot(),
         }
-        last_digit = year % 10
-        return elements[last_digit]
-
-    def _build_prompt(self, request: CompatibilityRequest) -> str:
-        """GPT 프롬프트 생성"""
-        p1 = request.person1
-        p2 = request.person2
-        lang = request.language
-
-        # 띠와 오행 계산
-        zodiac1 = self._calculate_zodiac(p1.birth_year)
-        zodiac2 = self._calculate_zodiac(p2.birth_year)
-        element1 = self._calculate_elements(p1.birth_year)
-        element2 = self._calculate_elements(p2.birth_year)
-
-        # 이름 설정
-        name1 = p1.name if p1.name else ("첫 번째 사람" if lang == "ko" else "Person 1")
-        name2 = p2.name if p2.name else ("두 번째 사람" if lang == "ko" else "Person 2")
-
-        if lang == "ko":
-            prompt = f"""당신은 전문 사주 명리학자입니다. 두 사람의 사주 궁합을 분석해주세요.
-
-**{name1}의 정보:**
-- 생년월일: {p1.birth_year}년 {p1.birth_month}월 {p1.birth_day}일
-- 생시: {f'{p1.birth_hour}시' if p1.birth_hour is not None else '미제공'}
-- 성별: {p1.gender if p1.gender else '미제공'}
-- 띠: {zodiac1['ko']}띠
-- 오행: {element1['ko']}
-
-**{name2}의 정보:**
-- 생년월일: {p2.birth_year}년 {p2.birth_month}월 {p2.birth_day}일
-- 생시: {f'{p2.birth_hour}시' if p2.birth_hour is not None else '미제공'}
-- 성별: {p2.gender if p2.gender else '미제공'}
-- 띠: {zodiac2['ko']}띠
-- 오행: {element2['ko']}
-
-아래 JSON 형식으로 정확히 응답해주세요:
-
-{{
-  "score": 0-100 사이의 궁합 점수 (정수),
-  "summary": "전체적인 궁합에 대한 2-3문장 요약",
-  "strengths": ["강점 1", "강점 2", "강점 3"],
-  "cautions": ["주의할 점 1", "주의할 점 2", "주의할 점 3"],
-  "elements_analysis": "오행 관점에서의 상생상극 분석 (2-3문장)",
-  "zodiac_compatibility": "띠 궁합 분석 (2-3문장)",
-  "advice": "두 사람을 위한 조언 및 팁 (2-3문장)"
-}}
-
-**중요 지침:**
-1. 반드시 유효한 JSON 형식으로만 응답하세요.
-2. strengths와 cautions는 정확히 3개의 항목을 포함해야 합니다.
-3. score는 0-100 사이의 정수여야 합니다.
-4. 모든 텍스트는 한국어로 작성하세요.
-5. 긍정적이면서도 현실적인 조언을 제공하세요."""
-
-        else:  # English
-            prompt = f"""You are a professional Saju (Four Pillars of Destiny) fortune teller. Please analyze the compatibility between two people.
-
-**{name1}'s Information:**
-- Birth Date: {p1.birth_month}/{p1.birth_day}/{p1.birth_year}
-- Birth Hour: {f'{p1.birth_hour}:00' if p1.birth_hour is not None else 'Not provided'}
-- Gender: {p1.gender if p1.gender else 'Not provided'}
-- Zodiac: {zodiac1['en']}
-- Element: {element1['en']}
-
-**{name2}'s Information:**
-- Birth Date: {p2.birth_month}/{p2.birth_day}/{p2.birth_year}
-- Birth Hour: {f'{p2.birth_hour}:00' if p2.birth_hour is not None else 'Not provided'}
-- Gender: {p2.gender if p2.gender else 'Not provided'}
-- Zodiac: {zodiac2['en']}
-- Element: {element2['en']}
-
-Please respond in exactly this JSON format:
-
-{{
-  "score": compatibility score between 0-100 (integer),
-  "summary": "Overall compatibility summary in 2-3 sentences",
-  "strengths": ["Strength 1", "Strength 2", "Strength 3"],
-  "cautions": ["Caution 1", "Caution 2", "Caution 3"],
-  "elements_analysis": "Analysis from Five Elements perspective (2-3 sentences)",
-  "zodiac_compatibility": "Chinese zodiac compatibility analysis (2-3 sentences)",
-  "advice": "Advice and tips for the couple (2-3 sentences)"
-}}
-
-**Important Guidelines:**
-1. Respond ONLY in valid JSON format.
-2. strengths and cautions must contain exactly 3 items each.
-3. score must be an integer between 0-100.
-4. All text should be in English.
-5. Provide positive yet realistic advice."""
-
-        return prompt
+
+    def validate_request(self, request: CompatibilityRequest) -> None:
+        """
+        분석 전 요청 검증
+
+        Args:
+            request: 궁합 분석 요청 데이터
+
+        Raises:
+            ValueError: 유효하지 않은 날짜 또는 API 키 미설정
+        """
+        # 날짜 유효성 검증
+        if not self._validate_date(request.person1):
+            raise ValueError("Invalid date for person 1")
+        if not self._validate_date(request.person2):
+            raise ValueError("Invalid date for person 2")
+
+        # OpenAI API 키 확인 (llm 모드만 필수, fallback 모드는 로컬 엔진으로 대체)
+        if settings.COMPATIBILITY_MODE == "llm" and not settings.OPENAI_API_KEY:
+            raise ValueError("OpenAI API key is not configured")
+
+    def _use_local(self) -> bool:
+        """OpenAI 없이 로컬 엔진으로 바로 계산할지 여부"""
+        mode = settings.COMPATIBILITY_MODE
+        return mode == "local" or (mode == "fallback" and not settings.OPENAI_API_KEY)
+
+    def _analyze_local(self, request: CompatibilityRequest, fallback: bool = False) -> CompatibilityResponse:
+        """로컬 엔진으로 궁합 분석 (결과는 LLM 캐시에 넣지 않음)"""
+        self.local_results += 1
+        if fallback:
+            self.fallbacks += 1
+        return saju_engine.analyze(request)
 
     async def analyze_compatibility(
         self,
@@ -162,52 +432,271 @@ Please respond in exactly this JSON format:
             ValueError: 유효하지 않은 날짜
             Exception: OpenAI API 호출 실패
         """
-        # 날짜 유효성 검증
-        if not self._validate_date(request.person1):
-            raise ValueError("Invalid date for person 1")
-        if not self._validate_date(request.person2):
-            raise ValueError("Invalid date for person 2")
+        result, _, _ = await self._analyze(request)
+        return result
 
-        # OpenAI API 키 확인
-        if not settings.OPENAI_API_KEY:
-            raise ValueError("OpenAI API key is not configured")
+    async def _analyze(
+        self,
+        request: CompatibilityRequest,
+        year_info: Optional[YearInfo] = None
+    ) -> Tuple[CompatibilityResponse, str, TokenUsage]:
+        """
+        궁합 분석 후 결과 출처와 이 요청이 사용한 토큰을 함께 반환
 
+        Args:
+            request: 궁합 분석 요청 데이터
+            year_info: 미리 계산한 연도별 띠/오행 (배치용)
+
+        Returns:
+            (결과, 출처, 토큰 사용량). 출처는 local, cache, llm,
+            coalesced(진행 중인 같은 분석을 공유), fallback 중 하나이며
+            llm이 아니면 토큰 사용량은 0이다.
+        """
+        self.validate_request(request)
+        if self._use_local():
+            return self._analyze_local(request), "local", TokenUsage()
+
+        # 캐시 조회 (두 사람 순서와 무관한 키)
+        key = cache_key(request, self.model, settings.COMPATIBILITY_PROMPT_VARIANT)
+        if compatibility_cache.enabled:
+            cached = await compatibility_cache.get(key)
+            if cached is not None:
+                return CompatibilityResponse(**cached), "cache", TokenUsage()
+
+        try:
+            if settings.OPENAI_SINGLE_FLIGHT_ENABLED:
+                (result, usage), shared = await self.flights.do(
+                    key, lambda: self._analyze_uncached(request, key, year_info)
+                )
+                if shared:
+                    return result, "coalesced", TokenUsage()
+                return result, "llm", usage
+            result, usage = await self._analyze_uncached(request, key, year_info)
+            return result, "llm", usage
+        except Exception as e:
+            if settings.COMPATIBILITY_MODE != "fallback":
+                raise
+            print(f"Compatibility analysis falling back to local engine: {str(e)}")
+            return self._analyze_local(request, fallback=True), "fallback", TokenUsage()
+
+    async def _analyze_uncached(
+        self,
+        request: CompatibilityRequest,
+        key: str,
+        year_info: Optional[YearInfo] = None
+    ) -> Tuple[CompatibilityResponse, TokenUsage]:
+        """
+        OpenAI 호출 후 결과 검증 및 캐시 저장
+
+        Args:
+            request: 궁합 분석 요청 데이터
+            key: 캐시 키
+            year_info: 미리 계산한 연도별 띠/오행
+
+        Returns:
+            (궁합 분석 결과, 토큰 사용량)
+        """
         # 프롬프트 생성
-        prompt = self._build_prompt(request)
+        messages = self._build_messages(request, year_info)
 
         try:
             # GPT-4o-mini 호출
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional Saju fortune teller. Always respond in valid JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
-            )
+            content, usage = await self._complete(messages)
 
             # 응답 파싱
-            content = response.choices[0].message.content
             result_data = json.loads(content)
 
             # Pydantic 모델로 변환 (유효성 검증)
             compatibility_result = CompatibilityResponse(**result_data)
 
-            return compatibility_result
-
         except json.JSONDecodeError as e:
             raise Exception(f"Failed to parse GPT response: {str(e)}")
+        except (UpstreamUnavailableError, DeadlineExceededError):
+            # 라우터가 503/504로 구분하도록 그대로 전달
+            raise
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
 
+        # 유효성 검증을 통과한 결과만 캐시
+        if compatibility_cache.enabled:
+            await compatibility_cache.set(key, compatibility_result.model_dump())
+
+        return compatibility_result, usage
+
+    def validate_batch(self, request: CompatibilityBatchRequest) -> None:
+        """
+        배치 분석 전 기준 인물과 설정 검증 (후보 오류는 항목별로 보고)
+
+        Args:
+            request: 배치 분석 요청 데이터
+
+        Raises:
+            ValueError: 기준 인물의 날짜가 유효하지 않거나 API 키 미설정
+        """
+        if not self._validate_date(request.anchor):
+            raise ValueError("Invalid date for anchor")
+        if settings.COMPATIBILITY_MODE == "llm" and not settings.OPENAI_API_KEY:
+            raise ValueError("OpenAI API key is not configured")
+
+    def _cost(self, usage: TokenUsage) -> float:
+        """토큰 사용량 -> 예상 비용 (USD)"""
+        return (
+            usage.prompt_tokens * settings.OPENAI_INPUT_COST_PER_1M_TOKENS
+            + usage.completion_tokens * settings.OPENAI_OUTPUT_COST_PER_1M_TOKENS
+        ) / 1_000_000
+
+    async def analyze_batch(
+        self,
+        request: CompatibilityBatchRequest
+    ) -> AsyncIterator[CompatibilityBatchItem | CompatibilityBatchSummary]:
+        """
+        기준 인물 한 명과 여러 후보의 궁합을 병렬 분석
+
+        COMPATIBILITY_BATCH_CONCURRENCY개까지 동시에 분석하고(OpenAI 전체
+        동시 호출 제한도 함께 적용), 끝나는 순서대로 결과를 전달한다.
+        캐시와 진행 중인 동일 분석은 그대로 재사용하며, 띠/오행은 서로
+        다른 출생 연도마다 한 번만 계산한다. validate_batch()는 호출자가
+        먼저 실행한다.
+
+        Args:
+            request: 배치 분석 요청 데이터
+
+        Yields:
+            후보별 CompatibilityBatchItem (완료 순), 마지막에 CompatibilityBatchSummary
+        """
+        self.batches += 1
+        started = time.perf_counter()
+        anchor = request.anchor
+        candidates = request.candidates
+
+        # 띠/오행은 출생 연도별로 한 번만 계산
+        years = {anchor.birth_year, *(candidate.birth_year for candidate in candidates)}
+        year_info: YearInfo = {year: self._year_info(year) for year in years}
+        semaphore = asyncio.Semaphore(settings.COMPATIBILITY_BATCH_CONCURRENCY)
+
+        async def run(index: int, candidate: PersonInfo) -> CompatibilityBatchItem:
+            async with semaphore:
+                item_started = time.perf_counter()
+                pair = CompatibilityRequest(person1=anchor, person2=candidate, language=request.language)
+                result, source, usage, error = None, None, TokenUsage(), None
+                try:
+                    if not self._validate_date(candidate):
+                        raise ValueError("Invalid date for candidate")
+                    result, source, usage = await self._analyze(pair, year_info)
+                except ValueError as e:
+                    error = str(e)
+                except Exception as e:
+                    print(f"Compatibility batch item error: {str(e)}")
+                    error = failure_detail(e)[1]
+                return CompatibilityBatchItem(
+                    index=index,
+                    status="ok" if error is None else "error",
+                    source=source,
+                    result=result,
+                    error=error,
+                    latency_ms=round((time.perf_counter() - item_started) * 1000, 1),
+                    usage=usage,
+                    cost_usd=round(self._cost(usage), 6)
+                )
+
+        summary = CompatibilityBatchSummary(total=len(candidates))
+        tasks = [asyncio.create_task(run(index, candidate)) for index, candidate in enumerate(candidates)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                self.batch_items += 1
+                if item.status == "ok":
+                    summary.succeeded += 1
+                else:
+                    summary.failed += 1
+                if item.source is not None:
+                    summary.sources[item.source] = summary.sources.get(item.source, 0) + 1
+                summary.usage.prompt_tokens += item.usage.prompt_tokens
+                summary.usage.completion_tokens += item.usage.completion_tokens
+                summary.cost_usd += item.cost_usd
+                yield item
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 분석 취소
+            for task in tasks:
+                task.cancel()
+
+        summary.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        summary.cost_usd = round(summary.cost_usd, 6)
+        yield summary
+
+    async def stream_compatibility(
+        self,
+        request: CompatibilityRequest
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        사주 궁합 분석 스트리밍 실행
+
+        모델이 생성하는 JSON을 점진적으로 파싱하여 문자열 필드는 글자 단위
+        (delta), 완성된 필드는 값 단위(field)로 전달하고, 스트림이 끝나면
+        전체 결과를 Pydantic으로 검증하여 result 이벤트로 보낸다.
+        validate_request()는 응답 시작 전에 호출자가 먼저 실행한다.
+
+        Args:
+            request: 궁합 분석 요청 데이터
+
+        Yields:
+            (이벤트 이름, 데이터) 튜플
+                - ("delta", {"field", "text"}): 문자열 필드의 새 글자
+                - ("field", {"field", "value"}): 완성된 필드
+                - ("result", CompatibilityResponse 데이터): 검증된 최종 결과
+                - ("error", {"status", "detail"}): 분석 실패 (status는 503/504/500)
+            local 모드는 result 이벤트만 보내고, fallback 모드는 실패 시
+            error 대신 로컬 엔진 결과를 result로 보낸다.
+        """
+        if self._use_local():
+            yield "result", self._analyze_local(request).model_dump()
+            return
+
+        # 캐시에 있으면 바로 최종 결과 전달
+        key = cache_key(request, self.model, settings.COMPATIBILITY_PROMPT_VARIANT)
+        if compatibility_cache.enabled:
+            cached = await compatibility_cache.get(key)
+            if cached is not None:
+                yield "result", CompatibilityResponse(**cached).model_dump()
+                return
+
+        messages = self._build_messages(request)
+        parser = JsonObjectStreamParser()
+        content: List[str] = []
+
+        try:
+            # 클라이언트 연결이 끊겨도 OpenAI 스트림과 동시 호출 슬롯이 즉시 정리되도록 aclosing 사용
+            async with aclosing(self._complete_stream(messages)) as chunks:
+                async for text in chunks:
+                    content.append(text)
+                    for kind, field, value in parser.feed(text):
+                        if kind == "delta":
+                            yield "delta", {"field": field, "text": value}
+                        else:
+                            yield "field", {"field": field, "value": value}
+
+            # Pydantic 모델로 변환 (유효성 검증)
+            compatibility_result = CompatibilityResponse(**json.loads("".join(content)))
+
+        except Exception as e:
+            print(f"Compatibility stream error: {str(e)}")
+            if settings.COMPATIBILITY_MODE == "fallback":
+                # 이미 보낸 delta/field는 result 이벤트가 대체
+                yield "result", self._analyze_local(request, fallback=True).model_dump()
+            else:
+                status_code, detail = failure_detail(e)
+                yield "error", {"status": status_code, "detail": detail}
+            return
+
+        # 유효성 검증을 통과한 결과만 캐시
+        if compatibility_cache.enabled:
+            await compatibility_cache.set(key, compatibility_result.model_dump())
+
+        yield "result", compatibility_result.model_dump()
+
 
 # 싱글톤 인스턴스
 compatibility_service = CompatibilityService()
+metrics_registry.register("openai", compatibility_service.metrics)
+metrics_registry.register("compatibility_single_flight", compatibility_service.flights.metrics)
+metrics_registry.register("compatibility_prompts", compatibility_service.prompt_stats.snapshot)
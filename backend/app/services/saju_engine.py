@@ -0,0 +1,291 @@
+"""
+Saju Engine
+LLM 없이 띠/오행/시주 관계표로 궁합을 계산하는 결정적 로컬 엔진
+"""
+from typing import Dict, List, Optional, Tuple
+
+from app.schemas.compatibility import CompatibilityRequest, CompatibilityResponse, PersonInfo
+
+# 띠 (year % 12 순서, CompatibilityService._calculate_zodiac과 동일)
+ZODIACS: Tuple[Dict[str, str], ...] = tuple(
+    {"ko": ko, "en": en}
+    for ko, en in zip(
+        ["원숭이", "닭", "개", "돼지", "쥐", "소", "호랑이", "토끼", "용", "뱀", "말", "양"],
+        ["Monkey", "Rooster", "Dog", "Pig", "Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake", "Horse", "Goat"]
+    )
+)
+
+# 오행 (0=목, 1=화, 2=토, 3=금, 4=수; 상생 순서)
+ELEMENTS: Tuple[Dict[str, str], ...] = (
+    {"ko": "목(木)", "en": "Wood"},
+    {"ko": "화(火)", "en": "Fire"},
+    {"ko": "토(土)", "en": "Earth"},
+    {"ko": "금(金)", "en": "Metal"},
+    {"ko": "수(水)", "en": "Water"},
+)
+
+# 연도 끝자리(천간) -> 오행 인덱스 (0,1 金 / 2,3 水 / 4,5 木 / 6,7 火 / 8,9 土)
+STEM_ELEMENT: Tuple[int, ...] = (3, 3, 4, 4, 0, 0, 1, 1, 2, 2)
+
+# 관계별 점수 가감
+ZODIAC_SCORES = {"six_harmony": 15, "trine": 12, "same": 5, "neutral": 0, "harm": -8, "clash": -15}
+ELEMENT_SCORES = {"generating": 10, "same": 5, "overcoming": -10}
+HOUR_SCORES = {"six_harmony": 5, "trine": 4, "same": 2, "neutral": 0, "harm": -3, "clash": -5}
+BASE_SCORE = 70
+
+
+def zodiac_index(year: int) -> int:
+    """연도 -> ZODIACS 인덱스"""
+    return year % 12
+
+
+def branch_of_year(year: int) -> int:
+    """연도 -> 지지 인덱스 (0=자(쥐) ... 11=해(돼지))"""
+    return (year - 4) % 12
+
+
+def branch_of_hour(hour: int) -> int:
+    """출생 시각 -> 시주 지지 인덱스 (23-01시 자시 ... 21-23시 해시)"""
+    return ((hour + 1) // 2) % 12
+
+
+def element_index(year: int) -> int:
+    """연도 -> ELEMENTS 인덱스"""
+    return STEM_ELEMENT[year % 10]
+
+
+def _branch_relation(a: int, b: int) -> str:
+    """지지 두 개의 관계 (육합, 삼합, 같은 띠, 충, 해, 무관)"""
+    if a == b:
+        return "same"
+    if (a + b) % 12 == 1:
+        return "six_harmony"  # 자축, 인해, 묘술, 진유, 사신, 오미
+    if (a - b) % 12 in (4, 8):
+        return "trine"  # 신자진, 사유축, 인오술, 해묘미
+    if (a - b) % 12 == 6:
+        return "clash"  # 자오, 축미, 인신, 묘유, 진술, 사해
+    if (a + b) % 12 == 7:
+        return "harm"  # 자미, 축오, 인사, 묘진, 신해, 유술
+    return "neutral"
+
+
+def _element_relation(a: int, b: int) -> str:
+    """오행 두 개의 관계 (같음, 상생, 상극)"""
+    if a == b:
+        return "same"
+    if (b - a) % 5 in (1, 4):
+        return "generating"  # 목생화, 화생토, 토생금, 금생수, 수생목 (양방향)
+    return "overcoming"  # 목극토, 토극수, 수극화, 화극금, 금극목 (양방향)
+
+
+# 미리 계산한 관계표
+BRANCH_RELATIONS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(_branch_relation(a, b) for b in range(12)) for a in range(12)
+)
+ELEMENT_RELATIONS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(_element_relation(a, b) for b in range(5)) for a in range(5)
+)
+
+# 관계별 설명 문구
+_ZODIAC_TEXT = {
+    "six_harmony": {
+        "ko": "{z1}띠와 {z2}띠는 육합(六合)으로, 서로 끌어당기며 자연스럽게 조화를 이루는 관계입니다. 함께할수록 안정감이 커집니다.",
+        "en": "The {z1} and the {z2} form a Six Harmony pair, drawn to each other and naturally in tune. Time together tends to deepen their sense of security.",
+    },
+    "trine": {
+        "ko": "{z1}띠와 {z2}띠는 삼합(三合)으로, 같은 방향을 바라보며 힘을 모으는 관계입니다. 공동의 목표가 있을 때 특히 빛납니다.",
+        "en": "The {z1} and the {z2} belong to the same Trine, looking in the same direction and pooling their strengths. They shine most with a shared goal.",
+    },
+    "same": {
+        "ko": "두 분 모두 {z1}띠로, 성향과 속도가 비슷해 이해가 빠릅니다. 다만 단점도 닮아 서로를 비추는 거울이 되기도 합니다.",
+        "en": "Both are {z1}s, with similar temperaments and pace, so understanding comes quickly. Shared weaknesses can also mirror each other.",
+    },
+    "neutral": {
+        "ko": "{z1}띠와 {z2}띠는 특별한 합이나 충이 없는 무난한 관계입니다. 관계의 색깔은 두 분이 함께 만들어 가기 나름입니다.",
+        "en": "The {z1} and the {z2} have neither a special harmony nor a clash. The character of this relationship is theirs to shape.",
+    },
+    "harm": {
+        "ko": "{z1}띠와 {z2}띠는 해(害)의 관계로, 사소한 오해가 쌓이기 쉽습니다. 작은 서운함을 그때그때 풀어 주는 것이 중요합니다.",
+        "en": "The {z1} and the {z2} form a Harm pair, where small misunderstandings pile up easily. Clearing up minor grievances early matters.",
+    },
+    "clash": {
+        "ko": "{z1}띠와 {z2}띠는 충(沖)의 관계로, 기질이 정반대라 부딪히기 쉽지만 그만큼 서로에게 없는 것을 채워 줄 수 있습니다.",
+        "en": "The {z1} and the {z2} are a Clash pair with opposite temperaments. They collide easily, but each can supply what the other lacks.",
+    },
+}
+
+_ELEMENT_TEXT = {
+    "generating": {
+        "ko": "{e1}과(와) {e2}은(는) 상생(相生) 관계로, 한쪽이 다른 쪽을 북돋우며 함께 성장하는 흐름입니다.",
+        "en": "{e1} and {e2} are in a generating cycle: one nourishes the other, so the two grow together.",
+    },
+    "same": {
+        "ko": "두 분 모두 {e1}의 기운을 지녀 가치관이 비슷하고 편안합니다. 다만 같은 기운이 과해지지 않도록 균형이 필요합니다.",
+        "en": "Both carry {e1} energy, so their values feel familiar and comfortable. Balance keeps the shared element from becoming excessive.",
+    },
+    "overcoming": {
+        "ko": "{e1}과(와) {e2}은(는) 상극(相剋) 관계로, 한쪽이 다른 쪽을 누르기 쉬운 긴장이 있습니다. 역할을 나누면 긴장이 추진력이 됩니다.",
+        "en": "{e1} and {e2} are in an overcoming cycle, with a tension where one can restrain the other. Clear roles turn that tension into drive.",
+    },
+}
+
+_STRENGTHS = {
+    "six_harmony": {"ko": "서로에게 자연스럽게 끌리는 깊은 유대감", "en": "A deep, natural bond of attraction"},
+    "trine": {"ko": "공동의 목표를 향해 힘을 합치는 팀워크", "en": "Strong teamwork toward shared goals"},
+    "same": {"ko": "말하지 않아도 통하는 비슷한 성향", "en": "Similar temperaments that need few words"},
+    "neutral": {"ko": "선입견 없이 관계를 만들어 갈 수 있는 자유로움", "en": "Freedom to shape the relationship without preset patterns"},
+    "harm": {"ko": "갈등을 통해 대화하는 법을 배우는 관계", "en": "A relationship that teaches honest communication"},
+    "clash": {"ko": "서로의 부족한 부분을 채워 주는 보완성", "en": "Complementary strengths that fill each other's gaps"},
+    "generating": {"ko": "서로를 북돋우며 함께 성장하는 흐름", "en": "Mutual encouragement and growth"},
+    "element_same": {"ko": "비슷한 가치관에서 오는 편안함", "en": "Comfort from shared values"},
+    "overcoming": {"ko": "긴장을 추진력으로 바꾸는 역동성", "en": "Dynamism that turns tension into momentum"},
+    "hour_good": {"ko": "일상의 리듬이 잘 맞는 생활 궁합", "en": "Daily rhythms that fit well together"},
+    "default": {"ko": "서로를 존중하려는 성숙한 태도", "en": "A mature willingness to respect each other"},
+}
+
+_CAUTIONS = {
+    "six_harmony": {"ko": "편안함에 익숙해져 노력을 소홀히 할 수 있음", "en": "Comfort may lead to taking each other for granted"},
+    "trine": {"ko": "목표에 몰두해 감정 표현이 부족해질 수 있음", "en": "Focus on goals can crowd out emotional expression"},
+    "same": {"ko": "같은 단점이 겹쳐 커질 수 있음", "en": "Shared weaknesses can amplify each other"},
+    "neutral": {"ko": "관계의 방향을 함께 정하지 않으면 흐지부지될 수 있음", "en": "Without a shared direction the relationship may drift"},
+    "harm": {"ko": "사소한 오해와 서운함이 쌓이기 쉬움", "en": "Small misunderstandings accumulate easily"},
+    "clash": {"ko": "기질 차이로 인한 잦은 충돌", "en": "Frequent clashes from opposite temperaments"},
+    "generating": {"ko": "한쪽만 일방적으로 베푸는 관계가 되지 않도록 주의", "en": "Keep the giving from becoming one-sided"},
+    "element_same": {"ko": "같은 기운이 과해 균형을 잃기 쉬움", "en": "An excess of the same element can upset balance"},
+    "overcoming": {"ko": "주도권 다툼으로 번지기 쉬운 긴장", "en": "Tension that can turn into power struggles"},
+    "hour_bad": {"ko": "생활 습관과 리듬의 차이", "en": "Differences in daily habits and rhythm"},
+    "default": {"ko": "재정과 미래 계획에 대한 의견 차이", "en": "Differing views on money and future plans"},
+}
+
+_ADVICE = {
+    "high": {
+        "ko": "{n1}님과 {n2}님은 타고난 궁합이 좋은 편입니다. 좋은 흐름에 안주하기보다 감사와 애정을 자주 표현해 주세요.",
+        "en": "{n1} and {n2} start from a strong match. Rather than coasting, keep expressing appreciation and affection often.",
+    },
+    "middle": {
+        "ko": "{n1}님과 {n2}님은 노력에 따라 얼마든지 좋아질 수 있는 궁합입니다. 서로의 속도를 존중하고 대화를 꾸준히 이어 가세요.",
+        "en": "{n1} and {n2} have a match that grows with effort. Respect each other's pace and keep the conversation going.",
+    },
+    "low": {
+        "ko": "{n1}님과 {n2}님은 차이가 큰 만큼 배울 점도 많은 궁합입니다. 부딪힐 때는 잠시 멈추고 상대의 입장을 먼저 들어 주세요.",
+        "en": "{n1} and {n2} differ a lot, which also means a lot to learn. When you clash, pause and hear the other side first.",
+    },
+}
+
+_SUMMARY = {
+    "ko": "{n1}님({z1}띠, {e1})과 {n2}님({z2}띠, {e2})의 궁합 점수는 {score}점입니다. {zodiac_note} {element_note}",
+    "en": "{n1} ({z1}, {e1}) and {n2} ({z2}, {e2}) score {score} out of 100. {zodiac_note} {element_note}",
+}
+
+_SUMMARY_NOTES = {
+    "zodiac": {
+        "six_harmony": {"ko": "띠는 서로 끌어당기는 육합이고,", "en": "Their signs form a Six Harmony,"},
+        "trine": {"ko": "띠는 뜻을 모으는 삼합이고,", "en": "Their signs share a Trine,"},
+        "same": {"ko": "같은 띠로 성향이 닮았고,", "en": "They share the same sign,"},
+        "neutral": {"ko": "띠는 무난한 관계이며,", "en": "Their signs are neutral to each other,"},
+        "harm": {"ko": "띠는 오해가 쌓이기 쉬운 해(害)의 관계이며,", "en": "Their signs form a Harm pair,"},
+        "clash": {"ko": "띠는 정반대 기질의 충(沖)이며,", "en": "Their signs Clash,"},
+    },
+    "element": {
+        "generating": {"ko": "오행은 서로를 살리는 상생입니다.", "en": "and their elements nourish each other."},
+        "same": {"ko": "오행은 같은 기운입니다.", "en": "and they share the same element."},
+        "overcoming": {"ko": "오행은 긴장이 있는 상극입니다.", "en": "and their elements restrain each other."},
+    },
+}
+
+
+class SajuEngine:
+    """관계표 기반 결정적 궁합 계산기"""
+
+    def relations(self, p1: PersonInfo, p2: PersonInfo) -> Dict[str, Optional[str]]:
+        """
+        두 사람의 띠/오행/시주 관계
+
+        Args:
+            p1: 첫 번째 사람 정보
+            p2: 두 번째 사람 정보
+
+        Returns:
+            dict: zodiac, element, hour(생시가 없으면 None) 관계 이름
+        """
+        hour = None
+        if p1.birth_hour is not None and p2.birth_hour is not None:
+            hour = BRANCH_RELATIONS[branch_of_hour(p1.birth_hour)][branch_of_hour(p2.birth_hour)]
+        return {
+            "zodiac": BRANCH_RELATIONS[branch_of_year(p1.birth_year)][branch_of_year(p2.birth_year)],
+            "element": ELEMENT_RELATIONS[element_index(p1.birth_year)][element_index(p2.birth_year)],
+            "hour": hour,
+        }
+
+    def score(self, relations: Dict[str, Optional[str]]) -> int:
+        """관계 -> 0-100 점수"""
+        score = BASE_SCORE + ZODIAC_SCORES[relations["zodiac"]] + ELEMENT_SCORES[relations["element"]]
+        if relations["hour"] is not None:
+            score += HOUR_SCORES[relations["hour"]]
+        return max(0, min(100, score))
+
+    def analyze(self, request: CompatibilityRequest) -> CompatibilityResponse:
+        """
+        궁합 분석 결과 생성
+
+        같은 입력에는 항상 같은 결과를 반환하며 두 사람의 순서를 바꿔도
+        점수와 관계 분석은 같다.
+
+        Args:
+            request: 궁합 분석 요청 데이터
+
+        Returns:
+            CompatibilityResponse: 궁합 분석 결과
+        """
+        p1, p2 = request.person1, request.person2
+        lang = request.language
+        relations = self.relations(p1, p2)
+        score = self.score(relations)
+
+        names = {
+            "n1": p1.name or ("첫 번째 사람" if lang == "ko" else "Person 1"),
+            "n2": p2.name or ("두 번째 사람" if lang == "ko" else "Person 2"),
+            "z1": ZODIACS[zodiac_index(p1.birth_year)][lang],
+            "z2": ZODIACS[zodiac_index(p2.birth_year)][lang],
+            "e1": ELEMENTS[element_index(p1.birth_year)][lang],
+            "e2": ELEMENTS[element_index(p2.birth_year)][lang],
+        }
+        band = "high" if score >= 80 else "middle" if score >= 60 else "low"
+
+        return CompatibilityResponse(
+            score=score,
+            summary=_SUMMARY[lang].format(
+                score=score,
+                zodiac_note=_SUMMARY_NOTES["zodiac"][relations["zodiac"]][lang],
+                element_note=_SUMMARY_NOTES["element"][relations["element"]][lang],
+                **names
+            ),
+            strengths=self._pick(_STRENGTHS, self._strength_keys(relations), lang),
+            cautions=self._pick(_CAUTIONS, self._caution_keys(relations), lang),
+            elements_analysis=_ELEMENT_TEXT[relations["element"]][lang].format(**names),
+            zodiac_compatibility=_ZODIAC_TEXT[relations["zodiac"]][lang].format(**names),
+            advice=_ADVICE[band][lang].format(**names),
+        )
+
+    def _strength_keys(self, relations: Dict[str, Optional[str]]) -> List[str]:
+        """강점 문구 키 (관계 순서대로)"""
+        keys = [relations["zodiac"], "element_same" if relations["element"] == "same" else relations["element"]]
+        if relations["hour"] in ("six_harmony", "trine", "same"):
+            keys.append("hour_good")
+        return keys
+
+    def _caution_keys(self, relations: Dict[str, Optional[str]]) -> List[str]:
+        """주의점 문구 키 (관계 순서대로)"""
+        keys = [relations["zodiac"], "element_same" if relations["element"] == "same" else relations["element"]]
+        if relations["hour"] in ("harm", "clash"):
+            keys.append("hour_bad")
+        return keys
+
+    def _pick(self, texts: Dict[str, Dict[str, str]], keys: List[str], lang: str) -> List[str]:
+        """문구 3개 선택 (부족하면 기본 문구로 채움)"""
+        keys = keys[:3] + ["default"] * (3 - len(keys))
+        return [texts[key][lang] for key in keys]
+
+
+# 싱글톤 인스턴스
+saju_engine = SajuEngine()
@@ -0,0 +1,111 @@
+"""
+Stats Response Cache
+Serialized life-stats responses for the current local day, with their ETags
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.calendar_index import CalendarIndex
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+
+# Bump when the response body for the same birthdate and day changes
+RESPONSE_VERSION = 1
+
+Birthdate = Tuple[int, int, int]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class StatsResponseCache:
+    """
+    LRU cache of /stats/calculate response bodies for one day
+
+    A life-stats response depends only on the birthdate and today's date,
+    so the ETag is derived from those two values and can be checked
+    without computing anything. Entries are dropped when the calendar
+    index rolls over to a new day.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._day: Optional[date] = None
+        self._entries: "OrderedDict[Birthdate, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.day_resets = 0
+
+    def etag(self, index: CalendarIndex, birthdate: Birthdate) -> str:
+        """Strong ETag of the response for a birthdate on the index's day"""
+        year, month, day = birthdate
+        key = f"{RESPONSE_VERSION}:{index.today.isoformat()}:{year}-{month}-{day}"
+        return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+    def max_age(self, index: CalendarIndex) -> int:
+        """Seconds until the response expires at local midnight"""
+        return max(0, math.ceil(index.expires_at - time.time()))
+
+    def get(self, index: CalendarIndex, birthdate: Birthdate) -> Optional[bytes]:
+        """Cached body for the index's day, counting a hit or a miss"""
+        if self._day != index.today:
+            if self._entries:
+                self.day_resets += 1
+            self._entries.clear()
+            self._day = index.today
+        body = self._entries.get(birthdate)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(birthdate)
+        self.hits += 1
+        return body
+
+    def set(self, index: CalendarIndex, birthdate: Birthdate, body: bytes) -> None:
+        """Store a body computed for the index's day"""
+        if self._day != index.today:
+            return
+        self._entries[birthdate] = body
+        self._entries.move_to_end(birthdate)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_not_modified(self) -> None:
+        """Count a request answered with 304 before any lookup"""
+        self.not_modified += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit ratio counts both cache hits and 304 responses"""
+        served = self.hits + self.not_modified
+        total = served + self.misses
+        return {
+            "day": self._day.isoformat() if self._day else None,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(served / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "day_resets": self.day_resets,
+        }
+
+
+# Service instance
+stats_response_cache = StatsResponseCache(settings.STATS_RESPONSE_CACHE_MAX_ENTRIES)
+metrics_registry.register("stats_response_cache", stats_response_cache.metrics)
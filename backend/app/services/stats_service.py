@@ -2,11 +2,14 @@
 Statistics Service
 Business logic for calculating life statistics
 """
-from datetime import date, datetime, timedelta
-from typing import Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
+from app.core.calendar_index import FIRST_YEAR, calendar_index
 from app.schemas.stats import BirthdateRequest, LifeStatsResponse
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class StatsService:
     """Service for calculating life statistics"""
@@ -27,12 +30,16 @@ class StatsService:
 
         Returns:
             LifeStatsResponse with all calculated statistics
+
+        Raises:
+            ValueError: If the date does not exist
         """
-        birthdate = birthdate_req.to_date()
-        today = date.today()
+        # Day-based values are table reads from today's calendar index
+        index = calendar_index()
+        year, month, day = birthdate_req.year, birthdate_req.month, birthdate_req.day
 
         # Calculate total days lived
-        total_days = (today - birthdate).days
+        total_days = index.days_since(year, month, day)
 
         # Calculate time units
         total_hours = total_days * 24
@@ -45,14 +52,14 @@ class StatsService:
         sleep_hours = total_days * self.SLEEP_HOURS_PER_DAY
         meals_eaten = total_days * self.MEALS_PER_DAY
 
-        # Calculate days until next birthday
-        days_until_next_birthday = self._calculate_days_until_next_birthday(birthdate, today)
+        # Calculate days until next birthday (Feb 29 is observed on Feb 28 in common years)
+        days_until_next_birthday = index.days_until_birthday(month, day)
 
         # Calculate milestone information
         days_until_next_milestone, next_milestone = self._calculate_milestone_info(total_days)
 
         # Calculate age in years
-        age_years = self._calculate_age_in_years(birthdate, today)
+        age_years = index.age(year, month, day)
 
         return LifeStatsResponse(
             total_days=total_days,
@@ -69,18 +76,88 @@ class StatsService:
             age_years=age_years
         )
 
-    def _calculate_days_until_next_birthday(self, birthdate: date, today: date) -> int:
-        """Calculate days until next birthday"""
-        # Get this year's birthday
-        this_year_birthday = date(today.year, birthdate.month, birthdate.day)
+    def calculate_bulk_life_stats(
+        self,
+        years: List[int],
+        months: List[int],
+        days: List[int]
+    ) -> Dict[str, "np.ndarray"]:
+        """
+        Calculate life statistics for many birthdates at once
+
+        Every LifeStatsResponse field is computed with NumPy array operations
+        over the whole column, using the same calendar index as
+        calculate_life_stats(), so each row matches the single-date result.
+
+        Args:
+            years: Birth years
+            months: Birth months, same length as years
+            days: Birth days, same length as years
+
+        Returns:
+            Dict of LifeStatsResponse field name to int64 array, in input order
+
+        Raises:
+            ValueError: If any date does not exist, is before 1900 or is in the future
+        """
+        # Imported here: only the bulk endpoint needs NumPy (~40 ms to import)
+        import numpy as np
+
+        index = calendar_index()
+        try:
+            year = np.asarray(years, dtype=np.int64)
+            month = np.asarray(months, dtype=np.int64)
+            day = np.asarray(days, dtype=np.int64)
+        except OverflowError:
+            raise ValueError("Date values are out of range")
+
+        self._reject_rows((year < FIRST_YEAR) | (month < 1) | (month > 12) | (day < 1) | (day > 31), "Invalid date")
+        self._reject_rows(year > index.today.year, "Birthdate in the future")
 
-        # If birthday hasn't occurred this year yet
-        if today <= this_year_birthday:
-            return (this_year_birthday - today).days
+        # datetime64 arithmetic: year -> month -> day; a day past the end of the month spills into the next one
+        month_start = (year - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (month - 1)
+        birthdate = month_start.astype("datetime64[D]") + (day - 1)
+        self._reject_rows(birthdate.astype("datetime64[M]") != month_start, "Invalid date")
 
-        # Otherwise, calculate for next year
-        next_year_birthday = date(today.year + 1, birthdate.month, birthdate.day)
-        return (next_year_birthday - today).days
+        # Calculate total days lived
+        total_days = (np.datetime64(index.today, "D") - birthdate).astype(np.int64)
+        self._reject_rows(total_days < 0, "Birthdate in the future")
+
+        # Calculate time units
+        total_hours = total_days * 24
+        total_minutes = total_hours * 60
+        total_seconds = total_minutes * 60
+
+        # Birthday countdown and age are lookups into today's [month][day] tables
+        days_until_birthday, birthday_reached = index.birthday_tables()
+        days_until_next_birthday = np.asarray(days_until_birthday, dtype=np.int64)[month, day]
+        age_years = index.today.year - year - (~np.asarray(birthday_reached, dtype=bool)[month, day])
+
+        # Calculate milestone information
+        next_milestone = (total_days // self.MILESTONE_DAYS + 1) * self.MILESTONE_DAYS
+
+        return {
+            "total_days": total_days,
+            "total_hours": total_hours,
+            "total_minutes": total_minutes,
+            "total_seconds": total_seconds,
+            "heartbeats": total_minutes * self.HEART_RATE_PER_MINUTE,
+            "breaths": total_minutes * self.BREATHS_PER_MINUTE,
+            "sleep_hours": total_days * self.SLEEP_HOURS_PER_DAY,
+            "meals_eaten": total_days * self.MEALS_PER_DAY,
+            "days_until_next_birthday": days_until_next_birthday,
+            "days_until_next_milestone": next_milestone - total_days,
+            "next_milestone": next_milestone,
+            "age_years": age_years.astype(np.int64)
+        }
+
+    def _reject_rows(self, mask: "np.ndarray", reason: str) -> None:
+        """Raise ValueError naming the first rows where mask is set"""
+        rows = mask.nonzero()[0]
+        if rows.size:
+            shown = ", ".join(str(row) for row in rows[:10])
+            more = f" and {rows.size - 10} more" if rows.size > 10 else ""
+            raise ValueError(f"{reason} at rows {shown}{more}")
 
     def _calculate_milestone_info(self, total_days: int) -> Tuple[int, int]:
         """
@@ -95,16 +172,6 @@ class StatsService:
 
         return days_until_next_milestone, next_milestone
 
-    def _calculate_age_in_years(self, birthdate: date, today: date) -> int:
-        """Calculate age in years"""
-        age = today.year - birthdate.year
-
-        # Adjust if birthday hasn't occurred this year yet
-        if (today.month, today.day) < (birthdate.month, birthdate.day):
-            age -= 1
-
-        return age
-
 
 # Service instance
 stats_service = StatsService()
@@ -0,0 +1,149 @@
+"""
+Unique Visitor Service
+Approximate unique-visitor counting with per-day HyperLogLog sketches
+"""
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.hyperloglog import HyperLogLog
+from app.core.periodic import PeriodicTask
+from app.repositories.unique_visitor_repository import UniqueVisitorRepository
+from app.schemas.view_count import UniqueVisitorsResponse
+
+
+class UniqueVisitorCounter:
+    """
+    Per-process sketches of visitors not yet merged into the database
+
+    Visitors are added in memory and merged into the stored per-day
+    sketch by `flush()`; sketches are idempotent under merge, so a
+    visitor seen by several workers is still counted once.
+    """
+
+    def __init__(self, precision: int):
+        self.precision = precision
+        self._pending: Dict[Tuple[str, date], HyperLogLog] = {}
+
+    def add(self, event_type: str, visitor_id: str) -> None:
+        """
+        Record a visitor for today's sketch
+
+        Args:
+            event_type: Type of event
+            visitor_id: Stable identifier of the visitor
+        """
+        key = (event_type, datetime.utcnow().date())
+        sketch = self._pending.get(key)
+        if sketch is None:
+            sketch = self._pending[key] = HyperLogLog(self.precision)
+        sketch.add(visitor_id)
+
+    def pending(self, event_type: str, start: date, end: date) -> list[HyperLogLog]:
+        """Unflushed sketches for an inclusive day range"""
+        return [
+            HyperLogLog(sketch.precision, bytearray(sketch.registers))
+            for (pending_type, day), sketch in self._pending.items()
+            if pending_type == event_type and start <= day <= end
+        ]
+
+    async def flush(self) -> int:
+        """
+        Merge pending sketches into the database
+
+        Returns:
+            Number of sketches merged
+        """
+        batch, self._pending = self._pending, {}
+
+        if not batch:
+            return 0
+
+        merged = 0
+        try:
+            async with SessionLocal() as db:
+                repository = UniqueVisitorRepository(db)
+                for (event_type, day), sketch in list(batch.items()):
+                    await repository.merge(event_type, day, sketch)
+                    del batch[(event_type, day)]
+                    merged += 1
+        finally:
+            # Keep unmerged sketches for the next flush
+            for key, sketch in batch.items():
+                if key in self._pending:
+                    sketch.merge(self._pending[key])
+                self._pending[key] = sketch
+
+        return merged
+
+
+class UniqueVisitorService:
+    """Service for unique visitor estimates"""
+
+    # z-score for a ~95% confidence interval
+    CONFIDENCE_Z = 1.96
+
+    def __init__(self, db: AsyncSession, counter: Optional[UniqueVisitorCounter] = None):
+        self.repository = UniqueVisitorRepository(db)
+        self.counter = counter or unique_visitor_counter
+
+    async def get_unique_visitors(
+        self,
+        event_type: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> UniqueVisitorsResponse:
+        """
+        Estimate distinct visitors over an inclusive day range
+
+        Args:
+            event_type: Type of event
+            start: First UTC day (default: end)
+            end: Last UTC day (default: today)
+
+        Returns:
+            UniqueVisitorsResponse with the estimate and its error bound
+
+        Raises:
+            ValueError: start is after end
+        """
+        end = end or datetime.utcnow().date()
+        start = start or end
+        if start > end:
+            raise ValueError("start must not be after end")
+
+        rows = await self.repository.get_range(event_type, start, end)
+        sketches = [HyperLogLog.from_bytes(row.sketch) for row in rows]
+        sketches += self.counter.pending(event_type, start, end)
+
+        # Sketches stored under an earlier UNIQUE_VISITORS_PRECISION are folded to the lowest one present
+        precision = min([self.counter.precision] + [sketch.precision for sketch in sketches])
+        merged = HyperLogLog(precision)
+        for sketch in sketches:
+            merged.merge(sketch.folded(precision))
+
+        estimate = merged.estimate()
+        margin = round(estimate * merged.standard_error * self.CONFIDENCE_Z)
+
+        return UniqueVisitorsResponse(
+            event_type=event_type,
+            start=start,
+            end=end,
+            unique_visitors=estimate,
+            standard_error=round(merged.standard_error, 4),
+            lower_bound=max(0, estimate - margin),
+            upper_bound=estimate + margin
+        )
+
+
+# Counter instance
+unique_visitor_counter = UniqueVisitorCounter(settings.UNIQUE_VISITORS_PRECISION)
+
+# Sketch flush job (started from the app lifespan when enabled)
+unique_visitor_flush = PeriodicTask(
+    "Unique visitor flush",
+    interval=settings.UNIQUE_VISITORS_FLUSH_INTERVAL_SECONDS,
+    job=unique_visitor_counter.flush
+)
@@ -0,0 +1,209 @@
+"""
+View Count Buffer
+Write-behind aggregation of view count increments in process memory
+"""
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.view_count import ViewCount
+from app.repositories.view_count_repository import ViewCountRepository
+
+
+class ViewCountBuffer:
+    """
+    Accumulates increments in memory and flushes the deltas in batches
+
+    A flush happens every `flush_interval` seconds, or as soon as
+    `max_pending` increments are waiting, whichever comes first.
+    At most `max_pending` increments can be lost if the process dies.
+
+    All state is touched from the event loop only. Flushes are serialized
+    by a lock, since a threshold-triggered inline flush can start while
+    another one is still awaiting its database write.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        flush_interval: float,
+        max_pending: int
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: Dict[str, int] = {}
+        self._pending_total = 0
+        # Deltas taken by a flush that has not committed yet
+        self._in_flight: Dict[str, int] = {}
+        # Last known persisted (count, updated_at) per event type
+        self._persisted: Dict[str, Tuple[int, datetime]] = {}
+        self._flush_lock = asyncio.Lock()
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def add(self, event_type: str, repository: ViewCountRepository, amount: int = 1) -> ViewCount:
+        """
+        Record an increment without touching the database
+
+        Args:
+            event_type: Type of event to increment
+            repository: Repository used to load the persisted count once
+            amount: Number to add to the count
+
+        Returns:
+            Transient ViewCount with the persisted count plus unflushed deltas
+        """
+        if event_type not in self._persisted:
+            await self._load_persisted(event_type, repository)
+
+        self._pending[event_type] = self._pending.get(event_type, 0) + amount
+        self._pending_total += amount
+        view_count = self._merged(event_type)
+
+        if self._pending_total >= self.max_pending:
+            await self._request_flush()
+
+        return view_count
+
+    def merge(self, view_count: Optional[ViewCount], event_type: str) -> Optional[ViewCount]:
+        """
+        Merge a persisted row with the unflushed delta for its event type
+
+        Args:
+            view_count: Row read from the database, or None
+            event_type: Type of event the row belongs to
+
+        Returns:
+            Transient ViewCount with the merged count, or None if nothing is known
+        """
+        delta = self._unflushed(event_type)
+
+        if view_count is None:
+            if delta == 0:
+                return None
+            return ViewCount(event_type=event_type, count=delta, updated_at=datetime.utcnow())
+
+        return ViewCount(
+            event_type=view_count.event_type,
+            count=view_count.count + delta,
+            updated_at=view_count.updated_at
+        )
+
+    async def flush(self) -> int:
+        """
+        Write all pending deltas to the database
+
+        Returns:
+            Number of increments flushed
+        """
+        async with self._flush_lock:
+            return await self._flush()
+
+    async def _flush(self) -> int:
+        """Move pending deltas in flight and write them; callers hold the flush lock"""
+        for event_type, amount in self._pending.items():
+            self._in_flight[event_type] = self._in_flight.get(event_type, 0) + amount
+        self._pending = {}
+        self._pending_total = 0
+        batch = dict(self._in_flight)
+
+        if not batch:
+            return 0
+
+        flushed = 0
+        async with self._session_factory() as db:
+            try:
+                repository = ViewCountRepository(db)
+                for event_type, amount in batch.items():
+                    view_count = await repository.increment(event_type, amount)
+                    self._persisted[event_type] = (view_count.count, view_count.updated_at)
+                    del self._in_flight[event_type]
+                    flushed += amount
+            except Exception:
+                await db.rollback()
+                # Return whatever was not committed to the pending set for the next flush
+                for event_type, amount in self._in_flight.items():
+                    self._pending[event_type] = self._pending.get(event_type, 0) + amount
+                    self._pending_total += amount
+                self._in_flight = {}
+                raise
+
+        return flushed
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop"""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the flush task and flush whatever is still pending
+
+        The task is asked to exit rather than cancelled: a cancel could
+        land between the commit and the bookkeeping after it, and the
+        final flush would then write the committed deltas a second time.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        self._wakeup = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush on a timer or when woken up by a full buffer, until stopped"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"View count flush error: {str(e)}")
+
+    async def _request_flush(self) -> None:
+        """Wake up the flush task, or flush inline when it is not running"""
+        if self._wakeup is None:
+            await self.flush()
+            return
+        self._wakeup.set()
+
+    async def _load_persisted(self, event_type: str, repository: ViewCountRepository) -> None:
+        """Cache the persisted count for an event type"""
+        view_count = await repository.get_by_event_type(event_type)
+        persisted = (0, datetime.utcnow()) if view_count is None else (view_count.count, view_count.updated_at)
+        self._persisted.setdefault(event_type, persisted)
+
+    def _unflushed(self, event_type: str) -> int:
+        """Pending plus in-flight delta"""
+        return self._pending.get(event_type, 0) + self._in_flight.get(event_type, 0)
+
+    def _merged(self, event_type: str) -> ViewCount:
+        """Build a transient ViewCount from cached state"""
+        count, updated_at = self._persisted[event_type]
+        return ViewCount(
+            event_type=event_type,
+            count=count + self._unflushed(event_type),
+            updated_at=updated_at
+        )
+
+
+# Buffer instance
+view_count_buffer = ViewCountBuffer(
+    SessionLocal,
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.VIEW_COUNT_FLUSH_MAX_PENDING
+)
@@ -0,0 +1,140 @@
+"""
+View Count Event Pipeline
+Fire-and-forget counter updates applied by a background consumer
+"""
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics_registry
+from app.services.view_count_service import ViewCountService
+
+
+class ViewCountEventPipeline:
+    """
+    Bounded queue of counter events drained by a background task
+
+    Publishers only enqueue, so request handlers never wait on the
+    database. When the queue is full, the 'block' policy makes
+    publishers wait for space (backpressure) and the 'drop' policy
+    discards the event and counts it as dropped.
+    """
+
+    def __init__(self, max_size: int, overflow_policy: str, batch_size: int):
+        if overflow_policy not in ("block", "drop"):
+            raise ValueError("overflow_policy must be either 'block' or 'drop'")
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.batch_size = batch_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.published = 0
+        self.dropped = 0
+        self.applied = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_batch_ms = 0.0
+
+    async def publish(self, event_type: str) -> bool:
+        """
+        Enqueue one increment for an event type
+
+        Applied inline when the consumer is not running, e.g. outside
+        the app lifespan.
+
+        Args:
+            event_type: Type of event to increment
+
+        Returns:
+            False if the event was dropped because the queue was full
+        """
+        if self._queue is None:
+            await self._apply(Counter({event_type: 1}))
+            return True
+
+        if self.overflow_policy == "drop":
+            try:
+                self._queue.put_nowait(event_type)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return False
+        else:
+            await self._queue.put(event_type)
+
+        self.published += 1
+        return True
+
+    def start(self) -> None:
+        """Create the queue and start the consumer on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Stop accepting events, apply everything still queued, then stop the consumer"""
+        if self._queue is None:
+            return
+        queue, self._queue = self._queue, None
+        await queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current pipeline counters"""
+        return {
+            "running": self._task is not None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_size,
+            "overflow_policy": self.overflow_policy,
+            "published": self.published,
+            "dropped": self.dropped,
+            "applied": self.applied,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_batch_ms": round(self.last_batch_ms, 3),
+        }
+
+    async def _consume(self) -> None:
+        """Drain the queue in batches, collapsing events per type"""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            started = time.perf_counter()
+            try:
+                await self._apply(Counter(batch))
+                self.applied += len(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"View count pipeline error: {str(e)}")
+            finally:
+                self.batches += 1
+                self.last_batch_ms = (time.perf_counter() - started) * 1000
+                for _ in batch:
+                    queue.task_done()
+
+    async def _apply(self, counts: Counter) -> None:
+        """Apply collapsed increments with a fresh session"""
+        async with SessionLocal() as db:
+            service = ViewCountService(db)
+            for event_type, amount in counts.items():
+                await service.increment(event_type, amount)
+
+
+# Pipeline instance
+view_count_pipeline = ViewCountEventPipeline(
+    max_size=settings.VIEW_COUNT_PIPELINE_MAX_SIZE,
+    overflow_policy=settings.VIEW_COUNT_PIPELINE_OVERFLOW_POLICY,
+    batch_size=settings.VIEW_COUNT_PIPELINE_BATCH_SIZE
+)
+metrics_registry.register("view_count_pipeline", view_count_pipeline.metrics)
@@ -2,10 +2,17 @@
 View Count Service
 Business logic for view count operations
 """
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.periodic import PeriodicTask
+from app.models.view_count import ViewCount
 from app.repositories.view_count_repository import ViewCountRepository
 from app.schemas.view_count import ViewCountResponse, AllViewCountsResponse
+from app.services.view_count_buffer import ViewCountBuffer, view_count_buffer
+from app.services.view_count_shared import SharedViewCounts, shared_view_counts
 
 
 class ViewCountService:
@@ -15,37 +22,79 @@ class ViewCountService:
     PAGE_VIEW = "page_view"
     STATS_CALCULATED = "stats_calculated"
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.repository = ViewCountRepository(db)
+        self.buffer: Optional[ViewCountBuffer] = (
+            view_count_buffer if settings.VIEW_COUNT_WRITE_MODE == "buffered" else None
+        )
+        self.shared: Optional[SharedViewCounts] = (
+            shared_view_counts if settings.VIEW_COUNT_WRITE_MODE == "shared_memory" else None
+        )
+
+    async def increment(self, event_type: str, amount: int = 1) -> ViewCount:
+        """
+        Increment a count directly, through the write-behind buffer or in shared memory
+
+        Args:
+            event_type: Type of event to increment
+            amount: Number to add to the count
+
+        Returns:
+            Updated ViewCount object
+        """
+        if self.buffer is not None:
+            return await self.buffer.add(event_type, self.repository, amount)
+        if self.shared is not None:
+            return await self.shared.add(event_type, self.repository, amount)
+        return await self.repository.increment(event_type, amount)
 
-    def increment_page_view(self) -> ViewCountResponse:
+    async def increment_page_view(self) -> ViewCountResponse:
         """
         Increment page view count
 
         Returns:
             ViewCountResponse with updated count
         """
-        view_count = self.repository.increment(self.PAGE_VIEW)
+        view_count = await self.increment(self.PAGE_VIEW)
         return ViewCountResponse.model_validate(view_count)
 
-    def increment_stats_calculated(self) -> ViewCountResponse:
+    async def increment_stats_calculated(self) -> ViewCountResponse:
         """
         Increment stats calculated count
 
         Returns:
             ViewCountResponse with updated count
         """
-        view_count = self.repository.increment(self.STATS_CALCULATED)
+        view_count = await self.increment(self.STATS_CALCULATED)
         return ViewCountResponse.model_validate(view_count)
 
-    def get_all_counts(self) -> AllViewCountsResponse:
+    async def get_all_counts(self) -> AllViewCountsResponse:
         """
         Get all view counts
 
         Returns:
             AllViewCountsResponse with all counts
         """
-        all_counts = self.repository.get_all_counts()
+        if self.shared is not None:
+            # Straight from the mapped file once both counts are loaded
+            counts = await self.shared.get_counts((self.PAGE_VIEW, self.STATS_CALCULATED), self.repository)
+            return AllViewCountsResponse(
+                total_page_views=counts[self.PAGE_VIEW],
+                total_stats_calculated=counts[self.STATS_CALCULATED]
+            )
+
+        all_counts = await self.repository.get_all_counts()
+
+        if self.buffer is not None:
+            # Add increments that have not been flushed yet
+            by_type = {vc.event_type: vc for vc in all_counts}
+            all_counts = [
+                merged for merged in (
+                    self.buffer.merge(by_type.get(event_type), event_type)
+                    for event_type in (self.PAGE_VIEW, self.STATS_CALCULATED)
+                )
+                if merged is not None
+            ]
 
         # Create a dictionary for easy lookup
         counts_dict = {vc.event_type: vc.count for vc in all_counts}
@@ -55,7 +104,7 @@ class ViewCountService:
             total_stats_calculated=counts_dict.get(self.STATS_CALCULATED, 0)
         )
 
-    def get_count_by_type(self, event_type: str) -> ViewCountResponse:
+    async def get_count_by_type(self, event_type: str) -> ViewCountResponse:
         """
         Get count for specific event type
 
@@ -65,11 +114,16 @@ class ViewCountService:
         Returns:
             ViewCountResponse with count
         """
-        view_count = self.repository.get_by_event_type(event_type)
+        if self.shared is not None:
+            view_count = await self.shared.get(event_type, self.repository)
+        else:
+            view_count = await self.repository.get_by_event_type(event_type)
+
+        if self.buffer is not None:
+            view_count = self.buffer.merge(view_count, event_type)
 
         if view_count is None:
             # Return zero count if not found
-            from app.models.view_count import ViewCount
             from datetime import datetime
             view_count = ViewCount(
                 event_type=event_type,
@@ -78,3 +132,22 @@ class ViewCountService:
             )
 
         return ViewCountResponse.model_validate(view_count)
+
+
+async def compact_view_count_shards() -> int:
+    """
+    Fold sharded view count rows into shard 0 using a fresh session
+
+    Returns:
+        Number of shard rows folded
+    """
+    async with SessionLocal() as db:
+        return await ViewCountRepository(db).compact()
+
+
+# Periodic shard compaction job (started from the app lifespan when enabled)
+view_count_compaction = PeriodicTask(
+    "View count compaction",
+    interval=settings.VIEW_COUNT_COMPACTION_INTERVAL_SECONDS,
+    job=compact_view_count_shards
+)
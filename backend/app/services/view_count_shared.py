@@ -0,0 +1,281 @@
+"""
+Shared View Counts
+View counters kept in shared memory by all workers on a node and persisted by one elected flusher
+"""
+import asyncio
+import fcntl
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics_registry
+from app.core.shared_counters import SharedCounterTable
+from app.models.view_count import ViewCount
+from app.repositories.view_count_repository import ViewCountRepository
+
+
+class SharedViewCounts:
+    """
+    View counts in a SharedCounterTable, written to view_counts in the background
+
+    Increments and reads touch only the mapped file. The database is
+    read once per event type per node, to learn the persisted count,
+    and written by whichever worker holds an exclusive flock on the
+    leader file. Every worker tries to take it on each tick, so when the
+    leader exits or dies the kernel releases the lock and the next tick
+    elects another worker.
+
+    Each flush writes every counter's unflushed delta, then re-reads the
+    persisted counts so that increments from other nodes show up within
+    one interval. Unflushed increments live in the file, so they survive
+    worker restarts; they are lost only if the file goes away (a reboot
+    when it is on tmpfs). A leader that dies between committing a delta
+    and recording it in the file writes that delta again on the next
+    flush.
+    """
+
+    def __init__(
+        self,
+        table: SharedCounterTable,
+        session_factory: Callable[[], AsyncSession],
+        flush_interval: float,
+        leader_path: str
+    ):
+        self.table = table
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.leader_path = leader_path
+
+        self._leader_fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        self.flushes = 0
+        self.flushed = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def leader(self) -> bool:
+        """Whether this process is the elected flusher"""
+        return self._leader_fd is not None
+
+    async def add(self, event_type: str, repository: ViewCountRepository, amount: int = 1) -> ViewCount:
+        """
+        Add to a counter in shared memory
+
+        Args:
+            event_type: Type of event to increment
+            repository: Repository used to load the persisted count once per node
+            amount: Number to add to the count
+
+        Returns:
+            Transient ViewCount with the persisted count plus unflushed increments
+        """
+        count, updated_at, loaded = self.table.add(event_type, amount)
+        if not loaded:
+            await self._load(event_type, repository)
+            count, updated_at, _ = self.table.get(event_type)
+        return self._view_count(event_type, count, updated_at)
+
+    async def get(self, event_type: str, repository: ViewCountRepository) -> Optional[ViewCount]:
+        """
+        Read a counter from shared memory, loading it from the database on first use
+
+        Args:
+            event_type: Type of event to read
+            repository: Repository used if the count is not loaded yet
+
+        Returns:
+            Transient ViewCount, or None if the event type has never been counted
+        """
+        state = self.table.get(event_type)
+        if state is None or not state[2]:
+            if not await self._load(event_type, repository) and state is None:
+                return None
+            state = self.table.get(event_type)
+        count, updated_at, _ = state
+        return self._view_count(event_type, count, updated_at)
+
+    async def get_counts(self, event_types: Iterable[str], repository: ViewCountRepository) -> Dict[str, int]:
+        """
+        Read several counters, with one database query if any is not loaded yet
+
+        Every listed type gets a slot, so pass only known event types.
+
+        Args:
+            event_types: Types of event to read
+            repository: Repository used for counts not loaded yet
+
+        Returns:
+            Count per event type (0 if never counted)
+        """
+        states = {event_type: self.table.get(event_type) for event_type in event_types}
+        if any(state is None or not state[2] for state in states.values()):
+            persisted = {view_count.event_type: view_count for view_count in await repository.get_all_counts()}
+            for event_type in states:
+                # Types without a row are loaded as 0 so later reads skip the query too
+                view_count = persisted.get(event_type)
+                if view_count is None:
+                    self.table.load(event_type, 0, time.time())
+                else:
+                    self.table.load(event_type, view_count.count, _timestamp(view_count.updated_at))
+            states = {event_type: self.table.get(event_type) for event_type in states}
+        return {event_type: state[0] if state else 0 for event_type, state in states.items()}
+
+    async def flush(self) -> int:
+        """
+        Write every counter's unflushed increments, then refresh persisted counts
+
+        Call only while holding leadership, so that flushes never overlap.
+
+        Returns:
+            Number of increments flushed
+        """
+        started = time.perf_counter()
+        flushed = 0
+        async with self._session_factory() as db:
+            repository = ViewCountRepository(db)
+            keys = self.table.keys()
+            for event_type in keys:
+                amount = self.table.pending(event_type)
+                if amount:
+                    view_count = await repository.increment(event_type, amount)
+                    self.table.mark_flushed(event_type, amount, view_count.count)
+                    flushed += amount
+            for view_count in await repository.get_all_counts():
+                if view_count.event_type in keys:
+                    self.table.mark_flushed(view_count.event_type, 0, view_count.count)
+
+        self.flushes += 1
+        self.flushed += flushed
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return flushed
+
+    def start(self) -> None:
+        """Start the election and flush loop on the running event loop"""
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, handover_timeout: float = 1.0) -> None:
+        """
+        Stop the loop and flush what is left, if leadership can be had
+
+        Workers stopping together take the lock in turn, so each flushes
+        whatever was added after the previous one's final flush. A worker
+        that cannot get it leaves its increments to the running leader.
+        A flush in progress is waited for, not cancelled, so its deltas
+        are recorded before the final flush reads them.
+
+        Args:
+            handover_timeout: Seconds to wait for another leader to exit
+        """
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+        deadline = time.monotonic() + handover_timeout
+        while not self._try_lead() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.leader:
+            try:
+                await self.flush()
+            finally:
+                self._resign()
+        self.table.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Election state, flush counters and the shared table"""
+        return {
+            "leader": self.leader,
+            "pid": os.getpid(),
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "errors": self.errors,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "counters": {
+                key: {"count": persisted + total - flushed, "pending": total - flushed, "loaded": loaded}
+                for key, total, flushed, persisted, _, loaded in self.table.slot_states()
+            },
+        }
+
+    async def _run(self) -> None:
+        """Try to become leader every interval; flush while leader, until stopped"""
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            if not self._try_lead():
+                continue
+            try:
+                await self.flush()
+            except Exception as e:
+                self.errors += 1
+                print(f"Shared view count flush error: {str(e)}")
+
+    def _try_lead(self) -> bool:
+        """Take the leader lock without waiting; True if held"""
+        if self._leader_fd is not None:
+            return True
+        # Opened per attempt: flock belongs to the open file, which a fork would share
+        fd = os.open(self.leader_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd
+        return True
+
+    def _resign(self) -> None:
+        """Release the leader lock"""
+        if self._leader_fd is not None:
+            os.close(self._leader_fd)
+            self._leader_fd = None
+
+    async def _load(self, event_type: str, repository: ViewCountRepository) -> bool:
+        """Copy the persisted count into the table; False if the database has none"""
+        view_count = await repository.get_by_event_type(event_type)
+        if view_count is None:
+            if self.table.get(event_type) is None:
+                # No slot for event types that were never counted
+                return False
+            self.table.load(event_type, 0, time.time())
+            return False
+        self.table.load(event_type, view_count.count, _timestamp(view_count.updated_at))
+        return True
+
+    @staticmethod
+    def _view_count(event_type: str, count: int, updated_at: float) -> ViewCount:
+        """Build a transient ViewCount from table values"""
+        return ViewCount(
+            event_type=event_type,
+            count=count,
+            updated_at=datetime.fromtimestamp(updated_at, timezone.utc).replace(tzinfo=None)
+        )
+
+
+def _timestamp(updated_at: Optional[datetime]) -> float:
+    """Unix timestamp of a naive UTC datetime from the database"""
+    if updated_at is None:
+        return time.time()
+    return updated_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+# Shared counters instance; the file is opened on first use
+shared_view_counts = SharedViewCounts(
+    SharedCounterTable(settings.VIEW_COUNT_SHARED_MEMORY_PATH),
+    SessionLocal,
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL_SECONDS,
+    leader_path=f"{settings.VIEW_COUNT_SHARED_MEMORY_PATH}.leader"
+)
+if settings.VIEW_COUNT_WRITE_MODE == "shared_memory":
+    metrics_registry.register("view_count_shared", shared_view_counts.metrics)
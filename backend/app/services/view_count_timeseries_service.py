@@ -0,0 +1,127 @@
+"""
+View Count Time Series Service
+Business logic for time-bucketed view counts, rollups and retention
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.periodic import PeriodicTask
+from app.repositories.view_count_bucket_repository import (
+    GRANULARITIES,
+    ViewCountBucketRepository,
+    truncate
+)
+from app.schemas.view_count import TimeSeriesPoint, TimeSeriesResponse
+
+
+class ViewCountTimeSeriesService:
+    """Service for view count time series queries"""
+
+    # Default range per granularity when no start is given
+    DEFAULT_SPANS = {
+        "minute": timedelta(hours=1),
+        "hour": timedelta(days=1),
+        "day": timedelta(days=30),
+    }
+    MAX_POINTS = 5000
+
+    def __init__(self, db: AsyncSession):
+        self.repository = ViewCountBucketRepository(db)
+
+    async def get_series(
+        self,
+        event_type: str,
+        granularity: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> TimeSeriesResponse:
+        """
+        Get counts per bucket for one event type
+
+        Args:
+            event_type: Type of event
+            granularity: 'minute', 'hour' or 'day'
+            start: Inclusive start, naive UTC or timezone-aware (default: end minus a granularity-specific span)
+            end: Exclusive end, naive UTC or timezone-aware (default: now)
+
+        Returns:
+            TimeSeriesResponse with the non-empty buckets in range
+
+        Raises:
+            ValueError: Unknown granularity or invalid/oversized range
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+        _, width = GRANULARITIES[granularity]
+        start, end = _naive_utc(start), _naive_utc(end)
+        end = end or truncate(datetime.utcnow(), granularity) + width
+        start = start or end - self.DEFAULT_SPANS[granularity]
+
+        if start >= end:
+            raise ValueError("start must be before end")
+        if (end - start) / width > self.MAX_POINTS:
+            raise ValueError(f"Range too large for {granularity} granularity (max {self.MAX_POINTS} buckets)")
+
+        buckets = await self.repository.get_range(event_type, granularity, start, end)
+        points = [TimeSeriesPoint.model_validate(bucket) for bucket in buckets]
+
+        return TimeSeriesResponse(
+            event_type=event_type,
+            granularity=granularity,
+            start=start,
+            end=end,
+            total=sum(point.count for point in points),
+            points=points
+        )
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to the naive UTC the bucket tables store; naive values are taken as UTC"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ViewCountRollup:
+    """Rolls minute buckets into hours and days, then applies retention"""
+
+    def __init__(self):
+        self._last_run: Optional[datetime] = None
+
+    async def run(self) -> int:
+        """
+        Roll up everything touched since the previous run and purge old rows
+
+        The first run after startup covers the whole minute retention
+        window (from the first hour whose minutes are all still kept), so
+        rollups missed while the process was down are rebuilt.
+
+        Returns:
+            Number of hour and day buckets written
+        """
+        now = datetime.utcnow()
+        minute_cutoff = now - timedelta(hours=settings.VIEW_COUNT_MINUTE_RETENTION_HOURS)
+        since = self._last_run or truncate(minute_cutoff, "hour") + timedelta(hours=1)
+
+        async with SessionLocal() as db:
+            repository = ViewCountBucketRepository(db)
+            written = await repository.rollup(since)
+            await repository.purge(
+                minutes_before=minute_cutoff,
+                hours_before=now - timedelta(days=settings.VIEW_COUNT_HOUR_RETENTION_DAYS)
+            )
+
+        self._last_run = now
+        return written
+
+
+# Rollup job (started from the app lifespan when time series are enabled)
+view_count_rollup = PeriodicTask(
+    "View count rollup",
+    interval=settings.VIEW_COUNT_ROLLUP_INTERVAL_SECONDS,
+    job=ViewCountRollup().run
+)
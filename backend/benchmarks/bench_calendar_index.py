@@ -0,0 +1,120 @@
+"""
+Calendar Index Check and Benchmark
+Compares app.core.calendar_index against datetime arithmetic and times both
+
+Usage (from backend/):
+    python -m benchmarks.bench_calendar_index [--iterations 200000]
+
+The check walks every birthdate from 1900 to each reference day's year
+for reference days around leap days and year ends, and compares
+total days, days until the next birthday and age with a plain datetime
+implementation (Feb 29 observed on Feb 28 in common years). The timing
+compares the date-object code StatsService used before the index with
+calendar_index() plus the index lookups, and the cost of building an index.
+
+Exits non-zero on any mismatch or if an index lookup is slower than the
+datetime version.
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from app.core.calendar_index import FIRST_YEAR, CalendarIndex, calendar_index, observed_birthday
+
+REFERENCE_DAYS = [
+    date(2023, 2, 28), date(2023, 3, 1), date(2023, 12, 31),
+    date(2024, 1, 1), date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1),
+    date(2000, 2, 29), date(1900, 3, 1), date(2025, 6, 15),
+]
+
+
+def reference(birthdate: date, today: date) -> tuple:
+    """(total days, days until next birthday, age) with date objects"""
+    this_year = observed_birthday(today.year, birthdate.month, birthdate.day)
+    next_birthday = this_year if this_year >= today else observed_birthday(
+        today.year + 1, birthdate.month, birthdate.day
+    )
+    age = today.year - birthdate.year - (0 if this_year <= today else 1)
+    return (today - birthdate).days, (next_birthday - today).days, age
+
+
+def legacy(birthdate: date, today: date) -> tuple:
+    """The per-request code StatsService ran before the index (fails on Feb 29)"""
+    total_days = (today - birthdate).days
+    this_year_birthday = date(today.year, birthdate.month, birthdate.day)
+    if today <= this_year_birthday:
+        days_until = (this_year_birthday - today).days
+    else:
+        days_until = (date(today.year + 1, birthdate.month, birthdate.day) - today).days
+    age = today.year - birthdate.year
+    if (today.month, today.day) < (birthdate.month, birthdate.day):
+        age -= 1
+    return total_days, days_until, age
+
+
+def check() -> list:
+    """Return a list of failed checks"""
+    failures = []
+    for today in REFERENCE_DAYS:
+        index = CalendarIndex(today)
+        birthdate = date(FIRST_YEAR, 1, 1)
+        while birthdate <= today:
+            y, m, d = birthdate.year, birthdate.month, birthdate.day
+            got = (index.days_since(y, m, d), index.days_until_birthday(m, d), index.age(y, m, d))
+            expected = reference(birthdate, today)
+            if got != expected and len(failures) < 20:
+                failures.append(f"{birthdate} on {today}: {got} != {expected}")
+            birthdate += timedelta(days=1)
+        for invalid in ((2023, 2, 29), (2024, 4, 31), (1899, 12, 31), (today.year + 2, 1, 1)):
+            try:
+                index.day_number(*invalid)
+                failures.append(f"{invalid} accepted on {today}")
+            except ValueError:
+                pass
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    failures = check()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"correctness: {'ok' if not failures else f'{len(failures)} failed'}")
+
+    birthdate = date(1990, 5, 17)
+    y, m, d = birthdate.year, birthdate.month, birthdate.day
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        legacy(date(y, m, d), date.today())
+    legacy_ns = (time.perf_counter() - started) / args.iterations * 1e9
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        index = calendar_index()
+        (index.days_since(y, m, d), index.days_until_birthday(m, d), index.age(y, m, d))
+    index_ns = (time.perf_counter() - started) / args.iterations * 1e9
+
+    builds = 200
+    started = time.perf_counter()
+    for _ in range(builds):
+        CalendarIndex(date.today())
+    build_ms = (time.perf_counter() - started) / builds * 1000
+
+    print(f"datetime per request: {legacy_ns:8.0f} ns")
+    print(f"calendar index:       {index_ns:8.0f} ns ({legacy_ns / index_ns:.1f}x)")
+    print(f"index build (once a day): {build_ms:.2f} ms")
+    try:
+        legacy(date(2000, 2, 29), date(2025, 6, 15))
+    except ValueError as e:
+        print(f"datetime version on a Feb 29 birthday in a common year: ValueError({e})")
+
+    return 1 if failures or index_ns > legacy_ns else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Compatibility Load Test
+Measures stats throughput with and without slow compatibility analyses in flight
+
+Usage (from backend/):
+    python -m benchmarks.bench_compatibility_load [--analyses 16] [--delay 2.0] [--app-dir DIR]
+
+Starts the fake OpenAI server and the API (result cache disabled), then runs
+POST /api/v1/stats/calculate twice: alone, and while --analyses compatibility
+requests wait on the fake server. With a blocking OpenAI client the second
+phase stalls behind every LLM call; with the async client throughput should
+stay close to the baseline. --app-dir compares against another checkout.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_views_latency import free_port, percentile, start_server, wait_ready
+
+STATS_BODY = {"year": 1990, "month": 5, "day": 17}
+COMPATIBILITY_BODY = {
+    "person1": {"birth_year": 1990, "birth_month": 5, "birth_day": 17},
+    "person2": {"birth_year": 1992, "birth_month": 8, "birth_day": 3},
+    "language": "en",
+}
+
+
+def start_fake_openai(port: int, delay: float, first_token: float = 0.3) -> subprocess.Popen:
+    """Start benchmarks.fake_openai_server in a subprocess"""
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_openai_server",
+            "--port", str(port), "--delay", str(delay), "--first-token", str(first_token),
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+
+async def stats_load(client: httpx.AsyncClient, concurrency: int, total: int) -> Dict[str, float]:
+    """Send `total` stats requests with `concurrency` in flight"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                failed = (await client.post("/api/v1/stats/calculate", json=STATS_BODY)).status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "errors": errors,
+    }
+
+
+async def analyses(client: httpx.AsyncClient, count: int) -> List[int]:
+    """Fire `count` concurrent compatibility analyses; returns status codes (0 on transport error)"""
+    async def one() -> int:
+        try:
+            return (await client.post("/api/v1/compatibility/analyze", json=COMPATIBILITY_BODY)).status_code
+        except httpx.HTTPError:
+            return 0
+
+    return await asyncio.gather(*(one() for _ in range(count)))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.getcwd(), help="backend/ directory to serve (default: cwd)")
+    parser.add_argument("--analyses", type=int, default=16, help="Compatibility requests in flight")
+    parser.add_argument("--delay", type=float, default=2.0, help="Fake OpenAI response delay in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent stats clients")
+    parser.add_argument("--requests", type=int, default=1000, help="Stats requests per phase")
+    args = parser.parse_args()
+
+    openai_port = free_port()
+    api_port = free_port()
+    fake = start_fake_openai(openai_port, args.delay)
+    server = start_server(args.app_dir, api_port, {
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        "DEBUG": "false",
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "OPENAI_MAX_CONCURRENCY": str(args.analyses),
+        "COMPATIBILITY_CACHE_BACKEND": "none",
+    })
+
+    limits = httpx.Limits(max_connections=args.concurrency + args.analyses + 1)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", limits=limits, timeout=120) as client:
+            await wait_ready(client)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{openai_port}") as fake_client:
+                await wait_ready(fake_client, path="/docs")
+
+            baseline = await stats_load(client, args.concurrency, args.requests)
+
+            in_flight = asyncio.create_task(analyses(client, args.analyses))
+            await asyncio.sleep(0.2)  # Let the analyses reach the fake server
+            loaded = await stats_load(client, args.concurrency, args.requests)
+            statuses = await in_flight
+
+            print(f"{'phase':<28} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for name, result in (("stats only", baseline), (f"stats + {args.analyses} analyses", loaded)):
+                print(
+                    f"{name:<28} {result['rps']:>8.0f} {result['p50']:>8.1f} "
+                    f"{result['p99']:>8.1f} {result['errors']:>7}"
+                )
+            ok = sum(1 for status in statuses if status == 200)
+            print(f"analyses succeeded: {ok}/{len(statuses)}")
+    finally:
+        for process in (server, fake):
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
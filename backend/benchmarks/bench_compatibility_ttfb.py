@@ -0,0 +1,91 @@
+"""
+Compatibility Time-To-First-Byte Benchmark
+Compares TTFB and total time of /analyze and /analyze/stream against the streaming fake OpenAI server
+
+Usage (from backend/):
+    python -m benchmarks.bench_compatibility_ttfb [--requests 20] [--delay 2.0] [--first-token 0.3]
+
+Requests run one at a time with the result cache disabled. For the streaming
+endpoint "first content" is the first delta/field event, i.e. the first
+piece of the analysis a user could see.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_compatibility_load import COMPATIBILITY_BODY, start_fake_openai
+from benchmarks.bench_views_latency import free_port, percentile, start_server, wait_ready
+
+
+async def measure(client: httpx.AsyncClient, path: str) -> Dict[str, float]:
+    """Time one request: first body byte, first content event and completion, in ms"""
+    started = time.perf_counter()
+    first_byte = first_content = None
+    body = b""
+    async with client.stream("POST", path, json=COMPATIBILITY_BODY) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            now = (time.perf_counter() - started) * 1000
+            if first_byte is None:
+                first_byte = now
+            body += chunk
+            if first_content is None and (b"event: delta" in body or b"event: field" in body):
+                first_content = now
+    total = (time.perf_counter() - started) * 1000
+    if b"event: error" in body:
+        raise RuntimeError(f"{path} streamed an error event")
+    return {"ttfb": first_byte, "first_content": first_content or total, "total": total}
+
+
+def summarize(samples: List[float]) -> str:
+    """Median and p95 of a sample list"""
+    return f"{statistics.median(samples):>8.0f} {percentile(samples, 95):>8.0f}"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.getcwd(), help="backend/ directory to serve (default: cwd)")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per endpoint")
+    parser.add_argument("--delay", type=float, default=2.0, help="Fake OpenAI full response time in seconds")
+    parser.add_argument("--first-token", type=float, default=0.3, help="Fake OpenAI first token delay in seconds")
+    args = parser.parse_args()
+
+    openai_port = free_port()
+    api_port = free_port()
+    fake = start_fake_openai(openai_port, args.delay, args.first_token)
+    server = start_server(args.app_dir, api_port, {
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        "DEBUG": "false",
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "COMPATIBILITY_CACHE_BACKEND": "none",
+    })
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", timeout=120) as client:
+            await wait_ready(client)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{openai_port}") as fake_client:
+                await wait_ready(fake_client, path="/docs")
+
+            print(f"{'endpoint':<38} {'TTFB p50':>8} {'p95':>8} {'content p50':>11} {'p95':>8} {'total p50':>9} {'p95':>8}")
+            for path in ("/api/v1/compatibility/analyze", "/api/v1/compatibility/analyze/stream"):
+                results = [await measure(client, path) for _ in range(args.requests)]
+                print(
+                    f"{path:<38} {summarize([r['ttfb'] for r in results])} "
+                    f"   {summarize([r['first_content'] for r in results])} "
+                    f" {summarize([r['total'] for r in results])}"
+                )
+    finally:
+        for process in (server, fake):
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
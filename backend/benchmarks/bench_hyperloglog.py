@@ -0,0 +1,55 @@
+"""
+HyperLogLog Accuracy Benchmark
+Compares sketch estimates with exact distinct counts on synthetic visitor IDs
+
+Usage (from backend/):
+    python -m benchmarks.bench_hyperloglog [--precision 14]
+
+Each cardinality is split across several sketches (simulating workers and
+days with overlapping visitors) that are serialized, merged and estimated.
+"""
+import argparse
+import random
+import time
+
+from app.core.hyperloglog import HyperLogLog
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--precision", type=int, default=14)
+    parser.add_argument("--parts", type=int, default=4, help="Sketches each data set is split across")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    standard_error = HyperLogLog(args.precision).standard_error
+    print(f"precision={args.precision} standard error={standard_error:.4%} (3 sigma={3 * standard_error:.4%})")
+    print(f"{'exact':>9} {'estimate':>9} {'error':>8} {'within 3σ':>9} {'adds/sec':>10} {'bytes':>7}")
+
+    for exact in (100, 1_000, 10_000, 100_000, 1_000_000):
+        visitors = [f"visitor-{rng.getrandbits(64)}" for _ in range(exact)]
+        parts = [HyperLogLog(args.precision) for _ in range(args.parts)]
+
+        start = time.perf_counter()
+        for visitor in visitors:
+            # Repeat visits land on random sketches; uniques must not be double counted
+            for _ in range(rng.randint(1, 2)):
+                parts[rng.randrange(args.parts)].add(visitor)
+        elapsed = time.perf_counter() - start
+
+        merged = HyperLogLog(args.precision)
+        size = 0
+        for part in parts:
+            data = part.to_bytes()
+            size = max(size, len(data))
+            merged.merge(HyperLogLog.from_bytes(data))
+
+        estimate = merged.estimate()
+        error = (estimate - exact) / exact
+        ok = abs(error) <= 3 * standard_error
+        print(f"{exact:>9} {estimate:>9} {error:>8.3%} {str(ok):>9} {exact * 1.5 / elapsed:>10.0f} {size:>7}")
+
+
+if __name__ == "__main__":
+    main()
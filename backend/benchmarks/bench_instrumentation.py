@@ -0,0 +1,176 @@
+"""
+Instrumentation Overhead and Multi-Worker Check
+Measures what MetricsMiddleware and operation timers add per call, then checks /metrics totals across uvicorn workers
+
+Usage (from backend/):
+    python -m benchmarks.bench_instrumentation [--calls 200000] [--workers 4] [--requests 1000]
+
+Overhead is measured in-process. A minimal ASGI app is called directly
+and through MetricsMiddleware; the difference per request is the cost
+of recording. The route label is resolved against the real application's
+routes, as in production. The check fails above --max-overhead-us.
+
+The multi-worker check boots uvicorn with --workers and a shared
+METRICS_MULTIPROCESS_DIR, sends --requests to each of two routes and
+waits for a snapshot interval. A scrape of /metrics from any worker must
+then report exactly those counts and include every worker. Every line of
+the exposition must be a comment or a `name{labels} value` sample.
+Exits non-zero if any check fails.
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import create_engine
+
+from app.core.database import Base
+from app.core.instrumentation import Instrumentation, MetricsMiddleware
+from app.main import app as application
+from benchmarks.bench_views_latency import free_port, start_server, wait_ready
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="(\\.|[^"\\])*",?)*\})? -?[0-9.e+-]+$')
+ROUTES = ["/health", "/api/v1/stats/calculate?year=1990&month=5&day=17"]
+
+
+async def endpoint(scope, receive, send) -> None:
+    """Smallest possible response"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def per_call_us(asgi_app, calls: int) -> float:
+    """Mean microseconds per request through `asgi_app`"""
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/views/page_view", "app": application}
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await asgi_app(scope, receive, send)
+        best = min(best, (time.perf_counter() - started) / calls * 1e6)
+    return best
+
+
+def timer_us(calls: int) -> float:
+    """Mean microseconds of an empty `with instrumentation.timer(...)` block"""
+    instrumentation = Instrumentation()
+    started = time.perf_counter()
+    for _ in range(calls):
+        with instrumentation.timer("bench"):
+            pass
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def samples(text: str, name: str) -> Dict[str, float]:
+    """Values of one metric keyed by their label set"""
+    values = {}
+    for line in text.splitlines():
+        if line.startswith(name + "{"):
+            labels, value = line[len(name):].rsplit(" ", 1)
+            values[labels] = float(value)
+    return values
+
+
+async def multi_worker(args: argparse.Namespace) -> List[str]:
+    """Boot uvicorn with several workers and check the aggregated scrape"""
+    failures = []
+    port = free_port()
+    directory = tempfile.mkdtemp()
+    database = os.path.join(tempfile.mkdtemp(), "bench.db")
+    # Workers would race to create the tables of a fresh SQLite file
+    Base.metadata.create_all(create_engine(f"sqlite:///{database}"))
+    server = start_server(os.getcwd(), port, {
+        "DATABASE_URL": f"sqlite:///{database}",
+        "DEBUG": "false",
+        "METRICS_MULTIPROCESS_DIR": directory,
+        "METRICS_SNAPSHOT_INTERVAL_SECONDS": "0.2",
+    }, workers=args.workers)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            await wait_ready(client)
+            # wait_ready's /health probes count too; start from a scrape once every worker has written them
+            await asyncio.sleep(1.0)
+            before = samples((await client.get("/metrics")).text, "http_requests_total")
+
+        # A new connection per request spreads requests over the workers
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=0)
+        in_flight = asyncio.Semaphore(32)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            async def one(path: str) -> None:
+                async with in_flight:
+                    response = await client.get(path)
+                if response.status_code != 200:
+                    failures.append(f"{path}: status {response.status_code}")
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(path) for path in ROUTES for _ in range(args.requests)))
+            elapsed = time.perf_counter() - started
+        await asyncio.sleep(1.0)
+
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            for attempt in range(3):
+                text = (await client.get("/metrics")).text
+                after = samples(text, "http_requests_total")
+                for route in ("/health", "/api/v1/stats/calculate"):
+                    labels = f'{{method="GET",route="{route}",status="200"}}'
+                    sent = after.get(labels, 0) - before.get(labels, 0)
+                    if sent != args.requests:
+                        failures.append(f"scrape {attempt}: {route} counted {sent:.0f} of {args.requests}")
+                    count = samples(text, "http_request_duration_seconds_count").get(
+                        f'{{method="GET",route="{route}"}}', 0
+                    )
+                    if count != after.get(labels, 0):
+                        failures.append(f"scrape {attempt}: {route} histogram count {count:.0f} != counter")
+                workers = int(next(
+                    float(line.split()[1]) for line in text.splitlines() if line.startswith("app_metrics_processes ")
+                ))
+                if workers != args.workers:
+                    failures.append(f"scrape {attempt}: {workers} processes reported, {args.workers} workers")
+                bad = [line for line in text.splitlines() if line and not line.startswith("#") and not SAMPLE.match(line)]
+                if bad:
+                    failures.append(f"malformed exposition line: {bad[0]}")
+        print(f"{args.workers} workers: {len(ROUTES) * args.requests / elapsed:,.0f} req/s, "
+              f"{len(os.listdir(directory))} snapshot files, scrape consistent: {not failures}")
+    finally:
+        server.terminate()
+        server.wait()
+    return failures
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--max-overhead-us", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per route in the multi-worker check")
+    args = parser.parse_args()
+
+    failures = []
+    bare = await per_call_us(endpoint, args.calls)
+    wrapped = await per_call_us(MetricsMiddleware(endpoint, Instrumentation()), args.calls)
+    overhead = wrapped - bare
+    print(f"middleware: {bare:.2f} us bare, {wrapped:.2f} us instrumented, {overhead:.2f} us per request")
+    print(f"operation timer: {timer_us(args.calls):.2f} us per block")
+    if overhead > args.max_overhead_us:
+        failures.append(f"middleware overhead {overhead:.2f} us > {args.max_overhead_us} us")
+
+    failures += await multi_worker(args)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
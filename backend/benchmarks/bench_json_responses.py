@@ -0,0 +1,163 @@
+"""
+JSON Response Benchmark
+Requests/second of one worker per endpoint, driving the ASGI app in-process
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_responses [--requests 3000] [--baseline-dir DIR]
+
+Requests are passed straight to the ASGI app, without sockets or an HTTP
+client, so the numbers are the server-side cost of a request on one
+event loop (one uvicorn worker). Each tree runs in its own subprocess
+with a temporary SQLite database.
+
+--baseline-dir points at another checkout's backend/ directory to run the
+same requests against, e.g. a `git worktree` of the commit before the
+orjson/model_response change, and prints both columns side by side.
+Every response must have the baseline's status and JSON shape (keys and
+value types). Exits non-zero otherwise.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+# (method, path, query string, JSON body)
+ENDPOINTS: List[Tuple[str, str, str, object]] = [
+    ("GET", "/health", "", None),
+    ("GET", "/api/v1/views/all", "", None),
+    ("GET", "/api/v1/views/page_view", "", None),
+    ("POST", "/api/v1/views/page-view", "", None),
+    ("POST", "/api/v1/stats/calculate", "", {"year": 1990, "month": 5, "day": 17}),
+    ("GET", "/api/v1/metrics/db_pool", "", None),
+]
+
+
+async def call(app, method: str, path: str, query: str, body: object) -> Tuple[int, bytes]:
+    """Run one request through the ASGI app; returns (status, body)"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+    chunks: List[bytes] = []
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def child(requests: int) -> None:
+    """Measure the app importable from the current directory; print JSON results"""
+    from app.main import app
+
+    results: Dict[str, Dict[str, object]] = {}
+    async with app.router.lifespan_context(app):
+        for method, path, query, body in ENDPOINTS:
+            for _ in range(50):
+                status, content = await call(app, method, path, query, body)
+            started = time.perf_counter()
+            for _ in range(requests):
+                await call(app, method, path, query, body)
+            elapsed = time.perf_counter() - started
+            results[f"{method} {path}"] = {
+                "rps": requests / elapsed,
+                "status": status,
+                "body": json.loads(content),
+            }
+    print(json.dumps(results))
+
+
+def run_tree(app_dir: str, requests: int) -> Dict[str, Dict[str, object]]:
+    """Run the child measurement against one backend/ directory"""
+    env = {
+        **os.environ,
+        "PYTHONPATH": app_dir,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        "DEBUG": "false",
+        # Counters are applied in the background; keep the request path comparable across trees
+        "VIEW_COUNT_WRITE_MODE": "buffered",
+    }
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "--requests", str(requests)],
+        cwd=app_dir,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def shape(body: object) -> object:
+    """Keys and value types of a JSON body (counts and timings differ between runs)"""
+    if isinstance(body, dict):
+        return {key: shape(value) for key, value in body.items()}
+    if isinstance(body, list):
+        return [shape(value) for value in body]
+    return type(body).__name__
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per endpoint")
+    parser.add_argument("--baseline-dir", default=None, help="backend/ directory of the revision to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args.requests))
+        return 0
+
+    current = run_tree(os.getcwd(), args.requests)
+    baseline = run_tree(os.path.abspath(args.baseline_dir), args.requests) if args.baseline_dir else None
+
+    failures = []
+    header = f"{'endpoint':<36} {'req/s':>9}"
+    if baseline:
+        header += f" {'baseline':>9} {'change':>8}"
+    print(header)
+    for name, result in current.items():
+        line = f"{name:<36} {result['rps']:>9.0f}"
+        if baseline:
+            before = baseline[name]
+            line += f" {before['rps']:>9.0f} {result['rps'] / before['rps'] - 1:>+8.0%}"
+            if result["status"] != before["status"] or shape(result["body"]) != shape(before["body"]):
+                failures.append(f"{name}: response differs from the baseline")
+        print(line)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
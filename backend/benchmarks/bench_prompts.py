@@ -0,0 +1,99 @@
+"""
+Compatibility Prompt Benchmark
+Offline token counts and build time of each prompt variant in Korean and English
+
+Usage (from backend/):
+    python -m benchmarks.bench_prompts [--iterations 20000]
+
+Token counts come from tiktoken when it is installed, otherwise from the
+heuristic in app.services.compatibility_prompts (the output says which).
+No OpenAI calls are made.
+
+Exits non-zero if the full variant no longer matches the pinned prompt
+text, if a variant drops a field of the output schema or a person's data,
+or if the compact variant is not smaller than the full one.
+"""
+import argparse
+import hashlib
+import sys
+import time
+
+from app.schemas.compatibility import CompatibilityRequest, CompatibilityResponse, PersonInfo
+from app.services.compatibility_prompts import (
+    TOKEN_COUNTER,
+    VARIANTS,
+    build_messages,
+    count_message_tokens,
+    count_tokens,
+)
+from app.services.compatibility_service import compatibility_service
+
+# SHA-256 of the full variant's messages for REQUESTS, joined with newlines
+PINNED_FULL = {
+    "ko": "f42c90d222a19abd0e2779da2527348cb1e3820ff6ec0db3263e205e1061e92d",
+    "en": "8f1e15a371e6e0273538c3f9cb38a15804c27ee68ed0b8845e5262e616a6f44e",
+}
+
+REQUESTS = {
+    lang: CompatibilityRequest(
+        person1=PersonInfo(birth_year=1990, birth_month=5, birth_day=17, birth_hour=9, gender="male", name="A"),
+        person2=PersonInfo(birth_year=1992, birth_month=8, birth_day=3),
+        language=lang,
+    )
+    for lang in ("ko", "en")
+}
+
+
+def check(variant: str, lang: str, messages: list) -> list:
+    """Return a list of failed checks for one variant and language"""
+    failures = []
+    text = "\n".join(message["content"] for message in messages)
+    if variant == "full":
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if digest != PINNED_FULL[lang]:
+            failures.append(f"{variant}/{lang}: full prompt changed ({digest})")
+    for field in CompatibilityResponse.model_fields:
+        if f'"{field}"' not in text:
+            failures.append(f"{variant}/{lang}: schema field {field} missing")
+    for value in ("A", "1990", "1992", "17", "9"):
+        if value not in messages[-1]["content"]:
+            failures.append(f"{variant}/{lang}: {value!r} missing from user message")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"token counter: {TOKEN_COUNTER}")
+    print(f"{'variant':<8} {'lang':<4} {'system':>7} {'user':>6} {'total':>6} {'build us':>9}")
+    failures = []
+    totals = {}
+    for lang, request in REQUESTS.items():
+        for variant in VARIANTS:
+            messages = build_messages(request, variant, compatibility_service._year_info)
+            failures += check(variant, lang, messages)
+            totals[variant, lang] = count_message_tokens(messages)
+
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                build_messages(request, variant, compatibility_service._year_info)
+            build_us = (time.perf_counter() - started) / args.iterations * 1e6
+
+            print(
+                f"{variant:<8} {lang:<4} {count_tokens(messages[0]['content']):>7} "
+                f"{count_tokens(messages[1]['content']):>6} {totals[variant, lang]:>6} {build_us:>9.2f}"
+            )
+        saved = 1 - totals["compact", lang] / totals["full", lang]
+        print(f"compact saves {saved:.0%} of {lang} input tokens")
+        if saved <= 0:
+            failures.append(f"compact/{lang}: not smaller than full")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
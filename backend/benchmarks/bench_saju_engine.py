@@ -0,0 +1,120 @@
+"""
+Saju Engine Check and Benchmark
+Pins the precomputed relation tables of app.services.saju_engine and times analyze()
+
+Usage (from backend/):
+    python -m benchmarks.bench_saju_engine [--iterations 100000]
+
+Exits non-zero if a pinned table entry or invariant changes, or if one
+analysis takes 1 ms or more on average.
+"""
+import argparse
+import itertools
+import sys
+import time
+from collections import Counter
+
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo
+from app.services.saju_engine import (
+    BRANCH_RELATIONS,
+    ELEMENT_RELATIONS,
+    ELEMENTS,
+    ZODIACS,
+    branch_of_hour,
+    branch_of_year,
+    element_index,
+    saju_engine,
+    zodiac_index,
+)
+
+RAT, OX, TIGER, RABBIT, DRAGON, SNAKE, HORSE, GOAT, MONKEY, ROOSTER, DOG, PIG = range(12)
+WOOD, FIRE, EARTH, METAL, WATER = range(5)
+
+PINNED_BRANCHES = {
+    (RAT, OX): "six_harmony", (TIGER, PIG): "six_harmony", (RABBIT, DOG): "six_harmony",
+    (DRAGON, ROOSTER): "six_harmony", (SNAKE, MONKEY): "six_harmony", (HORSE, GOAT): "six_harmony",
+    (RAT, DRAGON): "trine", (DRAGON, MONKEY): "trine", (OX, ROOSTER): "trine",
+    (TIGER, DOG): "trine", (RABBIT, GOAT): "trine", (PIG, RABBIT): "trine",
+    (RAT, HORSE): "clash", (OX, GOAT): "clash", (TIGER, MONKEY): "clash",
+    (RABBIT, ROOSTER): "clash", (DRAGON, DOG): "clash", (SNAKE, PIG): "clash",
+    (RAT, GOAT): "harm", (OX, HORSE): "harm", (TIGER, SNAKE): "harm",
+    (RABBIT, DRAGON): "harm", (MONKEY, PIG): "harm", (ROOSTER, DOG): "harm",
+    (RAT, RAT): "same", (TIGER, RABBIT): "neutral", (RAT, TIGER): "neutral",
+}
+PINNED_ELEMENTS = {
+    (WOOD, FIRE): "generating", (FIRE, EARTH): "generating", (EARTH, METAL): "generating",
+    (METAL, WATER): "generating", (WATER, WOOD): "generating",
+    (WOOD, EARTH): "overcoming", (EARTH, WATER): "overcoming", (WATER, FIRE): "overcoming",
+    (FIRE, METAL): "overcoming", (METAL, WOOD): "overcoming",
+    (WOOD, WOOD): "same",
+}
+PINNED_YEARS = {2020: ("Rat", "Metal"), 1990: ("Horse", "Metal"), 1984: ("Rat", "Wood"), 1997: ("Ox", "Fire")}
+PINNED_HOURS = {23: RAT, 0: RAT, 1: OX, 2: OX, 11: HORSE, 12: HORSE, 22: PIG}
+
+
+def check_tables() -> list:
+    """Return a list of failed checks"""
+    failures = []
+
+    def expect(condition: bool, message: str) -> None:
+        if not condition:
+            failures.append(message)
+
+    for (a, b), relation in PINNED_BRANCHES.items():
+        expect(BRANCH_RELATIONS[a][b] == relation, f"branch {a}-{b}: {BRANCH_RELATIONS[a][b]} != {relation}")
+    for (a, b), relation in PINNED_ELEMENTS.items():
+        expect(ELEMENT_RELATIONS[a][b] == relation, f"element {a}-{b}: {ELEMENT_RELATIONS[a][b]} != {relation}")
+    for year, (zodiac, element) in PINNED_YEARS.items():
+        expect(ZODIACS[zodiac_index(year)]["en"] == zodiac, f"zodiac of {year}")
+        expect(ELEMENTS[element_index(year)]["en"] == element, f"element of {year}")
+        expect(ZODIACS[(branch_of_year(year) + 4) % 12] == ZODIACS[zodiac_index(year)], f"branch of {year}")
+    for hour, branch in PINNED_HOURS.items():
+        expect(branch_of_hour(hour) == branch, f"hour branch of {hour}")
+
+    expected_row = Counter({"same": 1, "six_harmony": 1, "trine": 2, "clash": 1, "harm": 1, "neutral": 6})
+    for a in range(12):
+        expect(Counter(BRANCH_RELATIONS[a]) == expected_row, f"branch row {a} counts")
+    for a in range(5):
+        expect(Counter(ELEMENT_RELATIONS[a]) == Counter({"same": 1, "generating": 2, "overcoming": 2}), f"element row {a}")
+    for a, b in itertools.product(range(12), repeat=2):
+        expect(BRANCH_RELATIONS[a][b] == BRANCH_RELATIONS[b][a], f"branch table symmetric at {a}-{b}")
+
+    # Every year pair validates, is deterministic and scores the same in either order
+    for y1, y2, hour, lang in itertools.product(range(1900, 1912), range(1900, 1912), (None, 0, 13), ("ko", "en")):
+        p1 = PersonInfo(birth_year=y1, birth_month=1, birth_day=1, birth_hour=hour)
+        p2 = PersonInfo(birth_year=y2, birth_month=1, birth_day=1, birth_hour=None if hour is None else 6)
+        forward = saju_engine.analyze(CompatibilityRequest(person1=p1, person2=p2, language=lang))
+        backward = saju_engine.analyze(CompatibilityRequest(person1=p2, person2=p1, language=lang))
+        again = saju_engine.analyze(CompatibilityRequest(person1=p1, person2=p2, language=lang))
+        expect(forward == again, f"deterministic {y1}/{y2}/{hour}/{lang}")
+        expect(forward.score == backward.score, f"order-independent score {y1}/{y2}/{hour}/{lang}")
+        expect(40 <= forward.score <= 100, f"score range {y1}/{y2}: {forward.score}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    failures = check_tables()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"table checks: {'ok' if not failures else f'{len(failures)} failed'}")
+
+    request = CompatibilityRequest(
+        person1=PersonInfo(birth_year=1990, birth_month=5, birth_day=17, birth_hour=9, name="A"),
+        person2=PersonInfo(birth_year=1992, birth_month=8, birth_day=3, birth_hour=21, name="B"),
+        language="ko",
+    )
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        saju_engine.analyze(request)
+    per_call_us = (time.perf_counter() - started) / args.iterations * 1e6
+    print(f"analyze(): {per_call_us:.1f} us/call over {args.iterations} calls")
+
+    return 1 if failures or per_call_us >= 1000 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
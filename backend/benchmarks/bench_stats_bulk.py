@@ -0,0 +1,120 @@
+"""
+Bulk Life Stats Check and Benchmark
+Compares StatsService.calculate_bulk_life_stats with the single-date path and measures rows/second
+
+Usage (from backend/):
+    python -m benchmarks.bench_stats_bulk [--sizes 1000,100000,1000000] [--scalar-max 100000]
+
+The check pins the calendar index to reference days around leap days
+and year ends. For each day it computes every birthdate from 1900 with
+both paths and requires every field to match exactly. It also requires
+invalid and future dates to be rejected.
+
+The benchmark times the vectorized path alone and with JSON
+serialization of the columnar response. It times the single-date path
+(BirthdateRequest + calculate_life_stats per row) up to --scalar-max
+rows.
+
+Exits non-zero on any mismatch.
+"""
+import argparse
+import math
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from fastapi.responses import ORJSONResponse
+
+from app.core import calendar_index as calendar_index_module
+from app.core.calendar_index import CalendarIndex
+from app.schemas.stats import BirthdateRequest
+from app.services.stats_service import stats_service
+
+REFERENCE_DAYS = [date(2023, 2, 28), date(2023, 3, 1), date(2024, 2, 29), date(2024, 12, 31), date.today()]
+
+
+def pin_today(today: date) -> None:
+    """Make calendar_index() return an index for `today` until pinned again"""
+    index = CalendarIndex(today)
+    index.expires_at = math.inf
+    calendar_index_module._index = index
+
+
+def check() -> list:
+    """Return a list of failed checks"""
+    failures = []
+    for today in REFERENCE_DAYS:
+        pin_today(today)
+        dates = [date(1900, 1, 1) + timedelta(days=n) for n in range((today - date(1900, 1, 1)).days + 1)]
+        columns = stats_service.calculate_bulk_life_stats(
+            [d.year for d in dates], [d.month for d in dates], [d.day for d in dates]
+        )
+        for row, d in enumerate(dates):
+            expected = stats_service.calculate_life_stats(BirthdateRequest(year=d.year, month=d.month, day=d.day))
+            for field, value in expected.model_dump().items():
+                if columns[field][row] != value:
+                    failures.append(f"{d} on {today}: {field} {columns[field][row]} != {value}")
+                    break
+            if len(failures) >= 20:
+                return failures
+
+        tomorrow = today + timedelta(days=1)
+        for invalid in [(2023, 2, 29), (2024, 4, 31), (2024, 13, 1), (2024, 1, 0), (1899, 12, 31),
+                        (tomorrow.year, tomorrow.month, tomorrow.day), (10 ** 20, 1, 1)]:
+            try:
+                stats_service.calculate_bulk_life_stats([2000, invalid[0]], [1, invalid[1]], [1, invalid[2]])
+                if invalid[0] <= today.year:
+                    failures.append(f"{invalid} accepted on {today}")
+            except ValueError:
+                pass
+    calendar_index_module._index = None
+    return failures
+
+
+def random_columns(size: int, rng: np.random.Generator) -> tuple:
+    """Valid random birthdates as Python lists, like a parsed request"""
+    start = np.datetime64("1900-01-01")
+    span = (np.datetime64(date.today()) - start).astype(int)
+    births = start + rng.integers(0, span, size)
+    years = births.astype("datetime64[Y]").astype(int) + 1970
+    months = births.astype("datetime64[M]").astype(int) % 12 + 1
+    days = (births - births.astype("datetime64[M]")).astype(int) + 1
+    return years.tolist(), months.tolist(), days.tolist()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--scalar-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    failures = check()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"agreement with single-date path: {'ok' if not failures else f'{len(failures)} failed'}")
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>9} {'bulk rows/s':>13} {'bulk+json rows/s':>17} {'single rows/s':>14}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        years, months, days = random_columns(size, rng)
+
+        started = time.perf_counter()
+        columns = stats_service.calculate_bulk_life_stats(years, months, days)
+        bulk = time.perf_counter() - started
+        ORJSONResponse(content={"count": size, **columns})
+        bulk_json = time.perf_counter() - started
+
+        scalar = "-"
+        if size <= args.scalar_max:
+            started = time.perf_counter()
+            for y, m, d in zip(years, months, days):
+                stats_service.calculate_life_stats(BirthdateRequest(year=y, month=m, day=d)).model_dump()
+            scalar = f"{size / (time.perf_counter() - started):,.0f}"
+        print(f"{size:>9,} {size / bulk:>13,.0f} {size / bulk_json:>17,.0f} {scalar:>14}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Stats Response Cache Check and Load Test
+Boots the API with uvicorn and compares GET /api/v1/stats/calculate without the response cache, on misses, on hits and with If-None-Match
+
+Usage (from backend/):
+    python -m benchmarks.bench_stats_cache [--concurrency 32] [--birthdates 1000] [--rounds 3]
+
+Each phase requests the same set of distinct birthdates --rounds times.
+The check requires cached bodies to equal freshly computed ones, a
+matching If-None-Match to get an empty 304 with the same ETag, a
+Cache-Control max-age that ends by local midnight, and the reported hit
+ratio to match the requests sent. Exits non-zero if any check fails.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_views_latency import free_port, percentile, start_server, wait_ready
+
+PATH = "/api/v1/stats/calculate"
+
+
+def birthdates(count: int) -> List[Dict[str, int]]:
+    """Distinct valid birthdates"""
+    rng = random.Random(0)
+    start = date(1900, 1, 1)
+    span = (date.today() - start).days
+    days = rng.sample(range(span), count)
+    return [
+        {"year": d.year, "month": d.month, "day": d.day}
+        for d in (start + timedelta(days=n) for n in days)
+    ]
+
+
+async def phase(
+    client: httpx.AsyncClient,
+    params: List[Dict[str, int]],
+    concurrency: int,
+    etags: Optional[Dict[Tuple[int, int, int], str]] = None
+) -> Tuple[Dict[str, float], List[httpx.Response]]:
+    """Request every birthdate once with `concurrency` in flight, optionally with If-None-Match"""
+    queue = list(params)
+    latencies: List[float] = []
+    responses: List[httpx.Response] = []
+
+    async def worker() -> None:
+        while queue:
+            birthdate = queue.pop()
+            headers = {}
+            if etags is not None:
+                headers["If-None-Match"] = etags[birthdate["year"], birthdate["month"], birthdate["day"]]
+            started = time.perf_counter()
+            response = await client.get(PATH, params=birthdate, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            responses.append(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": len(params) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+    }, responses
+
+
+def key(response: httpx.Response) -> Tuple[int, int, int]:
+    """Birthdate of a response, from its request URL"""
+    query = response.request.url.params
+    return int(query["year"]), int(query["month"]), int(query["day"])
+
+
+async def run(args: argparse.Namespace, cache_enabled: bool) -> Tuple[Dict[str, Dict[str, float]], List[str], Dict]:
+    """Boot a server and run its phases; returns results, failures and cache metrics"""
+    port = free_port()
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    server = start_server(args.app_dir, port, {
+        "DATABASE_URL": database_url,
+        "DEBUG": "false",
+        "STATS_RESPONSE_CACHE_ENABLED": str(cache_enabled).lower(),
+    })
+    params = birthdates(args.birthdates)
+    results: Dict[str, Dict[str, float]] = {}
+    failures: List[str] = []
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            if not cache_enabled:
+                rounds = [await phase(client, params, args.concurrency) for _ in range(args.rounds)]
+                results["GET, cache disabled"] = rounds[-1][0]
+                return results, failures, {}
+
+            started = time.time()
+            results["GET, cache miss"], first = await phase(client, params, args.concurrency)
+            bodies = {key(response): response.content for response in first}
+            etags = {key(response): response.headers["etag"] for response in first}
+            midnight = datetime.combine(date.today() + timedelta(days=1), datetime.min.time()).timestamp()
+            for response in first:
+                max_age = int(response.headers["cache-control"].split("max-age=")[1])
+                if response.status_code != 200 or started + max_age > midnight + 1:
+                    failures.append(f"{key(response)}: status {response.status_code}, max-age {max_age}")
+                    break
+
+            for _ in range(args.rounds):
+                results["GET, cache hit"], hits = await phase(client, params, args.concurrency)
+            if any(response.content != bodies[key(response)] for response in hits):
+                failures.append("cached body differs from the computed one")
+
+            for _ in range(args.rounds):
+                results["GET, If-None-Match (304)"], revalidated = await phase(client, params, args.concurrency, etags)
+            if any(
+                response.status_code != 304 or response.content or response.headers["etag"] != etags[key(response)]
+                for response in revalidated
+            ):
+                failures.append("matching If-None-Match did not get an empty 304 with the same ETag")
+
+            metrics = (await client.get("/api/v1/metrics/stats_response_cache")).json()
+            expected = {"misses": len(params), "hits": len(params) * args.rounds, "not_modified": len(params) * args.rounds}
+            if any(metrics[name] != value for name, value in expected.items()):
+                failures.append(f"cache metrics {metrics} != {expected}")
+            return results, failures, metrics
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.getcwd(), help="backend/ directory to serve (default: cwd)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--birthdates", type=int, default=1000, help="Distinct birthdates per phase")
+    parser.add_argument("--rounds", type=int, default=3, help="Repeats of the hit and 304 phases")
+    args = parser.parse_args()
+
+    baseline, _, _ = await run(args, cache_enabled=False)
+    cached, failures, metrics = await run(args, cache_enabled=True)
+
+    print(f"{'phase':<28} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, result in {**baseline, **cached}.items():
+        print(f"{name:<28} {result['rps']:>8.0f} {result['p50']:>8.1f} {result['p99']:>8.1f}")
+    print(f"hit ratio: {metrics.get('hit_ratio')}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
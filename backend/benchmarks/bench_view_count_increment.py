@@ -0,0 +1,96 @@
+"""
+View Count Increment Benchmark
+Compares the ORM read-modify-write path with the atomic upsert path under concurrency
+
+Usage (from backend/):
+    python -m benchmarks.bench_view_count_increment [--url URL] [--workers 8] [--increments 200]
+
+Defaults to a temporary SQLite file; pass a PostgreSQL URL to measure row-lock behaviour.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base, async_database_url
+from app.models.view_count import ViewCount
+from app.repositories.view_count_repository import ViewCountRepository
+
+EVENT_TYPE = "bench_increment"
+
+
+async def run(url: str, mode: str, workers: int, increments: int, shards: int = 1) -> dict:
+    """Run `workers` concurrent sessions doing `increments` increments each"""
+    if url.startswith("sqlite"):
+        engine_args = {"connect_args": {"timeout": 30}}
+    else:
+        engine_args = {"pool_size": workers, "max_overflow": 0}
+    engine = create_async_engine(async_database_url(url), **engine_args)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SessionFactory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async with SessionFactory() as db:
+        await db.execute(delete(ViewCount).where(ViewCount.event_type == EVENT_TYPE))
+        await db.commit()
+
+    errors = []
+
+    async def worker() -> None:
+        async with SessionFactory() as db:
+            repository = ViewCountRepository(db, increment_mode=mode, shards=shards)
+            for _ in range(increments):
+                try:
+                    await repository.increment(EVENT_TYPE)
+                except Exception as e:
+                    await db.rollback()
+                    errors.append(type(e).__name__)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+
+    async with SessionFactory() as db:
+        result = await db.execute(
+            select(func.count(ViewCount.id), func.coalesce(func.sum(ViewCount.count), 0)).where(
+                ViewCount.event_type == EVENT_TYPE
+            )
+        )
+        rows = result.one()
+    await engine.dispose()
+
+    expected = workers * increments
+    return {
+        "mode": mode,
+        "ops_per_sec": expected / elapsed,
+        "expected": expected,
+        "counted": int(rows[1]),
+        "rows": int(rows[0]),
+        "errors": len(errors),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Database URL (default: temporary SQLite file)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--increments", type=int, default=200)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    print(f"{'mode':<8} {'ops/sec':>10} {'expected':>9} {'counted':>9} {'lost':>6} {'rows':>5} {'errors':>7}")
+    for mode in ("orm", "atomic"):
+        result = await run(url, mode, args.workers, args.increments)
+        lost = result["expected"] - result["counted"] - result["errors"]
+        print(
+            f"{result['mode']:<8} {result['ops_per_sec']:>10.0f} {result['expected']:>9} "
+            f"{result['counted']:>9} {lost:>6} {result['rows']:>5} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+Sharded View Count Benchmark
+Increments per second as the worker count grows, for 1 shard and for N shards
+
+Usage (from backend/):
+    python -m benchmarks.bench_view_count_shards --url postgresql://... [--shards 16]
+
+Row-lock contention only shows up on PostgreSQL; SQLite serialises every
+writer on the database lock, so shards make no difference there.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+from benchmarks.bench_view_count_increment import run
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Database URL (default: temporary SQLite file)")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Comma-separated worker counts")
+    parser.add_argument("--increments", type=int, default=200, help="Increments per worker")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    print(f"{'workers':>7} {'1 shard ops/s':>14} {f'{args.shards} shards ops/s':>16}")
+    for workers in worker_counts:
+        single = await run(url, "atomic", workers, args.increments, shards=1)
+        sharded = await run(url, "atomic", workers, args.increments, shards=args.shards)
+        print(f"{workers:>7} {single['ops_per_sec']:>14.0f} {sharded['ops_per_sec']:>16.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
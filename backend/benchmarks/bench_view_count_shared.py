@@ -0,0 +1,186 @@
+"""
+Shared-Memory View Count Benchmark
+Compares direct and shared_memory write modes across 1, 4 and 16 worker processes
+
+Usage (from backend/):
+    python -m benchmarks.bench_view_count_shared [--processes 1,4,16] [--adds 20000]
+                                                 [--requests 2000] [--concurrency 32]
+                                                 [--modes direct,shared_memory]
+
+Two parts:
+
+1. Counter table. --processes forked processes each add --adds times
+   to the same key of a fresh SharedCounterTable, with no HTTP and no
+   database. Reports aggregate adds/s and checks that the final count
+   is exactly processes x adds (no lost updates under contention).
+
+2. HTTP. uvicorn is started with --workers N for each mode on a fresh
+   SQLite database (and a fresh counter file). --requests POSTs to
+   /api/v1/views/page-view are sent over new connections so they
+   spread across workers. Reports req/s and latency, then checks that
+   GET /api/v1/views/all reports every request. After a graceful
+   shutdown, the view_counts table must hold every request as well
+   (the final flush).
+
+Exits non-zero if a counter check fails, or if shared_memory returns
+errors. The direct mode on SQLite may see "database is locked" errors
+with many workers; they are reported, not failed on.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.core.shared_counters import SharedCounterTable
+from benchmarks.bench_views_latency import free_port, percentile, start_server, wait_ready
+
+
+def add_many(path: str, adds: int, start: multiprocessing.Event) -> None:
+    """Child process: add `adds` times to one key once `start` is set"""
+    table = SharedCounterTable(path)
+    table.add("bench", 0)
+    start.wait()
+    for _ in range(adds):
+        table.add("bench")
+    table.close()
+
+
+def table_run(processes: int, adds: int) -> Dict[str, float]:
+    """Aggregate adds/s of `processes` concurrent writers and the final count"""
+    path = os.path.join(tempfile.mkdtemp(), "counters")
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    children = [context.Process(target=add_many, args=(path, adds, start)) for _ in range(processes)]
+    for child in children:
+        child.start()
+    time.sleep(0.2)  # Let every child map the file before timing
+    started = time.perf_counter()
+    start.set()
+    for child in children:
+        child.join()
+    elapsed = time.perf_counter() - started
+
+    table = SharedCounterTable(path)
+    count = table.get("bench")[0]
+    table.close()
+    return {"adds_per_s": processes * adds / elapsed, "count": count}
+
+
+def persisted_count(database: str, event_type: str) -> int:
+    """Sum of view_counts rows for an event type"""
+    with sqlite3.connect(database) as conn:
+        row = conn.execute("SELECT SUM(count) FROM view_counts WHERE event_type = ?", (event_type,)).fetchone()
+    return int(row[0] or 0)
+
+
+async def http_run(mode: str, workers: int, args: argparse.Namespace) -> Dict[str, float]:
+    """Boot uvicorn in a write mode, send the POSTs and read the counts back"""
+    port = free_port()
+    directory = tempfile.mkdtemp()
+    database = os.path.join(directory, "bench.db")
+    server = start_server(os.getcwd(), port, {
+        "DATABASE_URL": f"sqlite:///{database}",
+        "DEBUG": "false",
+        "VIEW_COUNT_WRITE_MODE": mode,
+        "VIEW_COUNT_SHARED_MEMORY_PATH": os.path.join(directory, "counters"),
+        "VIEW_COUNT_FLUSH_INTERVAL_SECONDS": "1.0",
+        "VIEW_COUNT_PIPELINE_ENABLED": "false",
+    }, workers=workers)
+    latencies: List[float] = []
+    errors = 0
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            await wait_ready(client, timeout=120)
+            # Every worker runs its own migrations check and warmup
+            await asyncio.sleep(0.5 * workers)
+
+        # A new connection per request spreads requests over the workers
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=0)
+        in_flight = asyncio.Semaphore(args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            async def one() -> None:
+                nonlocal errors
+                async with in_flight:
+                    started = time.perf_counter()
+                    try:
+                        failed = (await client.post("/api/v1/views/page-view")).status_code != 200
+                    except httpx.HTTPError:
+                        failed = True
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    errors += failed
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+            reads = []
+            for _ in range(50):
+                read_started = time.perf_counter()
+                reported = (await client.get("/api/v1/views/all")).json()["total_page_views"]
+                reads.append((time.perf_counter() - read_started) * 1000)
+    finally:
+        server.terminate()
+        server.wait(timeout=120)
+
+    return {
+        "rps": args.requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "read_p50": statistics.median(reads),
+        "errors": errors,
+        "reported": reported,
+        "persisted": persisted_count(database, "page_view"),
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", default="1,4,16", help="Process counts, comma-separated")
+    parser.add_argument("--adds", type=int, default=20000, help="Adds per process in the counter table part")
+    parser.add_argument("--requests", type=int, default=2000, help="POSTs per HTTP run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--modes", default="direct,shared_memory")
+    parser.add_argument("--skip-http", action="store_true")
+    args = parser.parse_args()
+    process_counts = [int(n) for n in args.processes.split(",")]
+    failures = []
+
+    print(f"{'processes':>9} {'adds/s':>12} {'count':>10}")
+    for processes in process_counts:
+        result = table_run(processes, args.adds)
+        print(f"{processes:>9} {result['adds_per_s']:>12,.0f} {result['count']:>10,}")
+        if result["count"] != processes * args.adds:
+            failures.append(f"table, {processes} processes: count {result['count']} != {processes * args.adds}")
+
+    if not args.skip_http:
+        print(f"\n{'mode':<14} {'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'read ms':>8} {'errors':>7} {'reported':>9} {'persisted':>9}")
+        for mode in args.modes.split(","):
+            for workers in process_counts:
+                result = await http_run(mode, workers, args)
+                print(f"{mode:<14} {workers:>7} {result['rps']:>8,.0f} {result['p50']:>8.1f} {result['p99']:>8.1f} "
+                      f"{result['read_p50']:>8.1f} {result['errors']:>7} {result['reported']:>9} {result['persisted']:>9}")
+                succeeded = args.requests - result["errors"]
+                label = f"{mode}, {workers} workers"
+                if mode == "shared_memory" and result["errors"]:
+                    failures.append(f"{label}: {result['errors']} errors")
+                if result["reported"] != succeeded:
+                    failures.append(f"{label}: /views/all reported {result['reported']} of {succeeded}")
+                if result["persisted"] != succeeded:
+                    failures.append(f"{label}: {result['persisted']} of {succeeded} persisted after shutdown")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,146 @@
+"""
+View Count Latency Load Test
+Boots the API with uvicorn and reports latency percentiles for /api/v1/views/* under concurrency
+
+Usage (from backend/):
+    python -m benchmarks.bench_views_latency [--concurrency 32] [--requests 2000] [--app-dir DIR]
+
+--app-dir points at another checkout's backend/ directory, so the same run can
+be repeated against an older revision (e.g. a `git worktree` of the commit before
+the async database layer) to compare p99 latency before and after a change.
+While the load runs, /health is probed serially; its latency shows how long the
+event loop is blocked by request handlers.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+ENDPOINTS: List[Tuple[str, str]] = [
+    ("POST", "/api/v1/views/page-view"),
+    ("GET", "/api/v1/views/all"),
+    ("GET", "/api/v1/views/page_view"),
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sample list"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app_dir: str, port: int, env: Dict[str, str], workers: int = 1) -> subprocess.Popen:
+    """Start uvicorn for app.main:app in a subprocess"""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers)],
+        cwd=app_dir,
+        env={**os.environ, **env},
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0, path: str = "/health") -> None:
+    """Poll `path` until the server answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(path)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become ready")
+
+
+async def load(client: httpx.AsyncClient, method: str, path: str, concurrency: int, total: int) -> Dict[str, float]:
+    """Send `total` requests with `concurrency` in flight; probe /health meanwhile"""
+    latencies: List[float] = []
+    health: List[float] = []
+    errors = 0
+    remaining = total
+    done = asyncio.Event()
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            if failed:
+                errors += 1
+
+    async def probe() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get("/health")
+            health.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.01)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "health_p99": percentile(health, 99) if health else 0.0,
+        "errors": errors,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.getcwd(), help="backend/ directory to serve (default: cwd)")
+    parser.add_argument("--url", default=None, help="Database URL (default: temporary SQLite file)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    args = parser.parse_args()
+
+    port = free_port()
+    database_url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    server = start_server(args.app_dir, port, {"DATABASE_URL": database_url, "DEBUG": "false"})
+
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            print(f"{'endpoint':<32} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'/health p99':>12} {'errors':>7}")
+            for method, path in ENDPOINTS:
+                result = await load(client, method, path, args.concurrency, args.requests)
+                print(
+                    f"{method + ' ' + path:<32} {result['rps']:>8.0f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                    f"{result['p99']:>8.1f} {result['health_p99']:>12.1f} {result['errors']:>7}"
+                )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Fake OpenAI Server
+Minimal /v1/chat/completions endpoint that answers with a valid compatibility result after a delay
+
+Usage (from backend/):
+    python -m benchmarks.fake_openai_server [--port 8099] [--delay 2.0] [--first-token 0.3]
+
+Requests with "stream": true get chat.completion.chunk events: the first
+token after --first-token seconds, the rest spread evenly until --delay.
+With "stream_options": {"include_usage": true} a final usage chunk follows.
+
+Faults can be injected with --error-rate/--error-status/--hang-rate, or at
+runtime with POST /fault {"error_rate": 1.0, "error_status": 503, "hang_rate": 0}.
+GET /stats returns the number of completion requests received.
+
+Point the API at it with OPENAI_BASE_URL=http://127.0.0.1:8099/v1 and any
+non-empty OPENAI_API_KEY.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+RESULT = {
+    "score": 82,
+    "summary": "Fake analysis used for load testing.",
+    "strengths": ["Strength 1", "Strength 2", "Strength 3"],
+    "cautions": ["Caution 1", "Caution 2", "Caution 3"],
+    "elements_analysis": "Fake elements analysis.",
+    "zodiac_compatibility": "Fake zodiac analysis.",
+    "advice": "Fake advice.",
+}
+
+# Characters per streamed token
+TOKEN_CHARS = 4
+
+# Injected faults: fraction of requests answered with error_status, fraction that never answer
+FAULTS = {
+    "error_rate": float(os.environ.get("FAKE_OPENAI_ERROR_RATE", "0")),
+    "error_status": int(os.environ.get("FAKE_OPENAI_ERROR_STATUS", "500")),
+    "hang_rate": float(os.environ.get("FAKE_OPENAI_HANG_RATE", "0")),
+}
+STATS = {"requests": 0}
+
+app = FastAPI()
+
+
+@app.post("/fault")
+async def set_fault(body: dict) -> dict:
+    """Update injected faults; omitted keys keep their value"""
+    FAULTS.update({key: body[key] for key in FAULTS if key in body})
+    return FAULTS
+
+
+@app.get("/stats")
+async def stats() -> dict:
+    """Completion requests received so far"""
+    return STATS
+
+
+def _usage(body: dict, content: str) -> dict:
+    """Rough 4-characters-per-token estimate, enough for cost accounting tests"""
+    prompt_tokens = sum(len(message.get("content", "")) for message in body.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    """One chat.completion.chunk SSE message"""
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _stream(body: dict, model: str, delay: float, first_token: float) -> AsyncIterator[str]:
+    """Stream RESULT as content deltas, then usage if requested, then [DONE]"""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    content = json.dumps(RESULT, ensure_ascii=False)
+    tokens = [content[i:i + TOKEN_CHARS] for i in range(0, len(content), TOKEN_CHARS)]
+    interval = max(0.0, delay - first_token) / max(1, len(tokens) - 1)
+
+    await asyncio.sleep(first_token)
+    yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+    for i, token in enumerate(tokens):
+        if i:
+            await asyncio.sleep(interval)
+        yield _chunk(completion_id, model, {"content": token})
+    yield _chunk(completion_id, model, {}, finish_reason="stop")
+    if (body.get("stream_options") or {}).get("include_usage"):
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": _usage(body, content),
+        }
+        yield f"data: {json.dumps(payload)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: dict):
+    """Sleep FAKE_OPENAI_DELAY_SECONDS, then return a chat completion (or stream it)"""
+    STATS["requests"] += 1
+    if random.random() < FAULTS["hang_rate"]:
+        await asyncio.sleep(3600)
+    if random.random() < FAULTS["error_rate"]:
+        return JSONResponse(
+            status_code=FAULTS["error_status"],
+            content={"error": {"message": "Injected fault", "type": "server_error", "code": None}},
+        )
+
+    delay = float(os.environ.get("FAKE_OPENAI_DELAY_SECONDS", "2.0"))
+    model = body.get("model", "gpt-4o-mini")
+    if body.get("stream"):
+        first_token = float(os.environ.get("FAKE_OPENAI_FIRST_TOKEN_SECONDS", "0.3"))
+        return StreamingResponse(_stream(body, model, delay, first_token), media_type="text/event-stream")
+
+    await asyncio.sleep(delay)
+    content = json.dumps(RESULT)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": _usage(body, content),
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds before each response")
+    parser.add_argument("--first-token", type=float, default=0.3, help="Seconds before the first streamed token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that never answer")
+    args = parser.parse_args()
+    FAULTS.update(error_rate=args.error_rate, error_status=args.error_status, hang_rate=args.hang_rate)
+    os.environ["FAKE_OPENAI_DELAY_SECONDS"] = str(args.delay)
+    os.environ["FAKE_OPENAI_FIRST_TOKEN_SECONDS"] = str(args.first_token)
+    uvicorn.run(app, port=args.port, log_level="warning")
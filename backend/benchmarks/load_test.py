@@ -0,0 +1,346 @@
+"""
+End-to-End Load Test
+Boots the API against SQLite (or a given database) and the fake OpenAI server, drives every router with a request mix, and compares the results with a stored baseline
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--duration 20] [--runs 3] [--concurrency 32] [--mix stats_get=40,compatibility=5]
+                                   [--database-url URL] [--output FILE] [--baseline FILE] [--threshold 0.25]
+                                   [--update-baseline]
+
+Each of --concurrency clients sends requests back to back for --duration
+seconds after a --warmup period, --runs times on a fresh server and
+database; reported values are the median over the runs. Each request picks a scenario at
+random, weighted by --mix. The scenarios are:
+
+    stats_get        GET  /api/v1/stats/calculate     (birthdates from a pool, so the response cache sees repeats)
+    stats_post       POST /api/v1/stats/calculate
+    views_increment  POST /api/v1/views/page-view
+    views_read       GET  /api/v1/views/all
+    views_event      GET  /api/v1/views/page_view
+    compatibility    POST /api/v1/compatibility/analyze (random pairs, answered by the fake server after --openai-delay)
+
+Results go to --output as JSON: run settings, per-scenario and total
+throughput, latency percentiles and error counts, and each run's own
+numbers under "runs".
+
+Without --database-url each run gets a fresh SQLite file. A Postgres
+URL (postgresql://...) works as well. Its tables are created if missing
+and are not cleaned up between runs.
+
+--baseline (default benchmarks/baselines/load_test.json) is compared
+with the result. It fails if total throughput drops or any scenario's
+p50 grows by more than --threshold, if a p99 grows by more than
+--p99-threshold (tail latency on SQLite varies a lot between runs), or
+if a scenario's error rate rises. --update-baseline writes the result
+as the new baseline instead. Baselines are only comparable on the same
+machine and settings, so the stored one records both.
+
+Exits non-zero on a regression or when any request fails.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_compatibility_load import start_fake_openai
+from benchmarks.bench_views_latency import free_port, percentile, start_server, wait_ready
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_test.json")
+DEFAULT_MIX = "stats_get=40,stats_post=10,views_increment=20,views_read=15,views_event=10,compatibility=5"
+
+# Distinct birthdates the stats scenarios draw from
+BIRTHDATE_POOL = 5000
+
+Request = Tuple[str, str, Dict[str, Any]]  # (method, path, httpx keyword arguments)
+
+
+def random_birthdate(rng: random.Random) -> date:
+    """Birthdate between 1900 and today"""
+    start = date(1900, 1, 1)
+    return start + timedelta(days=rng.randrange((date.today() - start).days))
+
+
+def scenarios(rng: random.Random) -> Dict[str, Callable[[], Request]]:
+    """Request builders per scenario name"""
+    pool = [random_birthdate(rng) for _ in range(BIRTHDATE_POOL)]
+
+    def stats_params() -> Dict[str, int]:
+        birthdate = rng.choice(pool)
+        return {"year": birthdate.year, "month": birthdate.month, "day": birthdate.day}
+
+    def person() -> Dict[str, Any]:
+        birthdate = random_birthdate(rng)
+        return {
+            "birth_year": birthdate.year,
+            "birth_month": birthdate.month,
+            "birth_day": birthdate.day,
+            "birth_hour": rng.choice([None, rng.randrange(24)]),
+        }
+
+    return {
+        "stats_get": lambda: ("GET", "/api/v1/stats/calculate", {"params": stats_params()}),
+        "stats_post": lambda: ("POST", "/api/v1/stats/calculate", {"json": stats_params()}),
+        "views_increment": lambda: ("POST", "/api/v1/views/page-view", {}),
+        "views_read": lambda: ("GET", "/api/v1/views/all", {}),
+        "views_event": lambda: ("GET", "/api/v1/views/page_view", {}),
+        "compatibility": lambda: (
+            "POST",
+            "/api/v1/compatibility/analyze",
+            {"json": {"person1": person(), "person2": person(), "language": rng.choice(["ko", "en"])}},
+        ),
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """'name=weight,...' to a weight per scenario"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles of one scenario (or all of them)"""
+    if not latencies:
+        return {"requests": 0, "errors": errors, "rps": 0.0}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4),
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p90_ms": round(percentile(latencies, 90), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    weights: Dict[str, float],
+    concurrency: int,
+    warmup: float,
+    duration: float,
+    seed: int
+) -> Dict[str, Any]:
+    """Closed-loop load: every client sends its next request as soon as the previous one returns"""
+    rng = random.Random(seed)
+    builders = scenarios(rng)
+    unknown = set(weights) - set(builders)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    names = list(weights)
+    mix = [weights[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    statuses: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def worker() -> None:
+        while loop.time() < stop_at:
+            name = rng.choices(names, weights=mix)[0]
+            method, path, kwargs = builders[name]()
+            started = time.perf_counter()
+            try:
+                status = (await client.request(method, path, **kwargs)).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if loop.time() < measure_from:
+                continue
+            latencies[name].append(elapsed_ms)
+            statuses[name][str(status)] = statuses[name].get(str(status), 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                errors[name] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    everything = [latency for values in latencies.values() for latency in values]
+    return {
+        "scenarios": {
+            name: {**summarize(latencies[name], errors[name], duration), "statuses": statuses[name]}
+            for name in names
+        },
+        "total": summarize(everything, sum(errors.values()), duration),
+    }
+
+
+def git_revision(app_dir: str) -> Optional[str]:
+    """Commit of the tree being measured, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=app_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def median_of(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-metric median over repeated runs; request and error counts are summed"""
+    def combine(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        rows = [row for row in rows if row["requests"]]
+        if not rows:
+            return {"requests": 0, "errors": 0, "rps": 0.0}
+        combined = {key: round(statistics.median(row[key] for row in rows), 2) for key in rows[0]
+                    if key not in ("requests", "errors", "statuses")}
+        combined["requests"] = sum(row["requests"] for row in rows)
+        combined["errors"] = sum(row["errors"] for row in rows)
+        combined["error_rate"] = round(combined["errors"] / combined["requests"], 4)
+        return combined
+
+    return {
+        "scenarios": {name: combine([run["scenarios"][name] for run in runs]) for name in runs[0]["scenarios"]},
+        "total": combine([run["total"] for run in runs]),
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float, p99_threshold: float) -> List[str]:
+    """Regressions of `result` against `baseline` beyond the thresholds (fractions)"""
+    regressions = []
+    before, after = baseline["total"], result["total"]
+    if after["rps"] < before["rps"] * (1 - threshold):
+        regressions.append(f"total throughput {after['rps']:.0f} req/s < baseline {before['rps']:.0f} req/s")
+    for name, now in result["scenarios"].items():
+        then = baseline["scenarios"].get(name)
+        if not then or not then.get("requests") or not now.get("requests"):
+            continue
+        for metric, allowed in (("p50_ms", threshold), ("p99_ms", p99_threshold)):
+            if now[metric] > then[metric] * (1 + allowed):
+                regressions.append(f"{name} {metric} {now[metric]:.1f} > baseline {then[metric]:.1f}")
+        if now["error_rate"] > then["error_rate"]:
+            regressions.append(f"{name} error rate {now['error_rate']:.2%} > baseline {then['error_rate']:.2%}")
+    return regressions
+
+
+def print_table(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    """Human-readable summary, with baseline p99 and throughput when there is one"""
+    header = f"{'scenario':<16} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    if baseline:
+        header += f" {'base req/s':>10} {'base p99':>9}"
+    print(header)
+    rows = list(result["scenarios"].items()) + [("total", result["total"])]
+    for name, row in rows:
+        if not row["requests"]:
+            print(f"{name:<16} {'-':>8}")
+            continue
+        line = (
+            f"{name:<16} {row['rps']:>8.0f} {row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['errors']:>7}"
+        )
+        if baseline:
+            then = baseline["total"] if name == "total" else baseline["scenarios"].get(name, {})
+            if then.get("requests"):
+                line += f" {then['rps']:>10.0f} {then['p99_ms']:>9.1f}"
+        print(line)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fake OpenAI server and the API, then drive the load once"""
+    openai_port = free_port()
+    api_port = free_port()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}"
+    fake = start_fake_openai(openai_port, args.openai_delay, first_token=min(0.3, args.openai_delay))
+    server = start_server(args.app_dir, api_port, {
+        "DATABASE_URL": database_url,
+        "DEBUG": "false",
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "OPENAI_MAX_CONCURRENCY": str(args.concurrency),
+    })
+    # Drop idle connections before uvicorn's 5 s keep-alive timeout can close one under a new request
+    limits = httpx.Limits(max_connections=args.concurrency + 1, keepalive_expiry=2.0)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", limits=limits, timeout=120) as client:
+            await wait_ready(client)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{openai_port}") as fake_client:
+                await wait_ready(fake_client, path="/docs")
+            return await drive(
+                client, parse_mix(args.mix), args.concurrency, args.warmup, args.duration, args.seed
+            )
+    finally:
+        for process in (server, fake):
+            process.terminate()
+            process.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.getcwd(), help="backend/ directory to serve (default: cwd)")
+    parser.add_argument("--database-url", default=None, help="Database to run against (default: fresh SQLite file)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clients sending requests back to back")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the measurement")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, name=weight,...")
+    parser.add_argument("--openai-delay", type=float, default=0.5, help="Fake OpenAI response time in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_results.json", help="Where to write the results as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results to compare against")
+    parser.add_argument("--runs", type=int, default=3, help="Repeats on a fresh server; results are medians")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed throughput and p50 regression (fraction)")
+    parser.add_argument("--p99-threshold", type=float, default=0.5, help="Allowed p99 regression (fraction)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run to --baseline")
+    args = parser.parse_args()
+
+    runs = [asyncio.run(run(args)) for _ in range(args.runs)]
+    result = {
+        "settings": {
+            "revision": git_revision(args.app_dir),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "database": (args.database_url or "sqlite").split(":", 1)[0],
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "runs": args.runs,
+            "mix": args.mix,
+            "openai_delay": args.openai_delay,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        },
+        **median_of(runs),
+        "runs": runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_table(result, baseline)
+    print(f"results: {args.output}")
+
+    failures = []
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"baseline updated: {args.baseline}")
+    elif baseline is not None:
+        failures += [f"regression: {message}" for message in compare(result, baseline, args.threshold, args.p99_threshold)]
+    else:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to store one")
+
+    if result["total"]["errors"]:
+        failures.append(f"{result['total']['errors']} requests failed")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Service Microbenchmarks
+ns/op and allocated bytes/op of the hot service functions, stored per commit and diffed against a baseline
+
+Usage (from backend/):
+    python -m benchmarks.microbench [--filter stats] [--min-time 0.2] [--repeat 5]
+                                    [--baseline FILE | --against REVISION] [--threshold 0.5]
+                                    [--update-baseline]
+
+Every case runs in-process, with no HTTP and no network. The
+repository cases use an in-memory SQLite database. Timing calibrates an
+iteration count that takes at least --min-time and reports the fastest
+of --repeat runs in ns/op. Allocation figures come from tracemalloc:
+
+    alloc B/op     peak traced memory during one call, above the memory
+                   in use before it (the transient allocation high-water)
+    retained B/op  memory still in use after 1000 calls, per call
+                   (caches and leaks)
+
+Results are written to benchmarks/results/microbench/<revision>.json,
+where the revision is the short commit hash, with a -dirty suffix for
+uncommitted changes. They are then compared with --baseline (default
+benchmarks/baselines/microbench.json) or with the stored results of
+--against REVISION. A case regresses when its ns/op or alloc B/op grows
+by more than --threshold. The default of 0.5 catches a doubling without
+tripping on timing noise. --update-baseline writes this run as the
+baseline instead.
+
+Exits non-zero on any regression.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import view_count, view_count_bucket  # noqa: F401
+from app.repositories.view_count_repository import ViewCountRepository
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo
+from app.schemas.stats import BirthdateRequest
+from app.services.compatibility_prompts import VARIANTS, build_messages
+from app.services.compatibility_service import compatibility_service
+from app.services.saju_engine import saju_engine
+from app.services.stats_service import stats_service
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results", "microbench")
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baselines", "microbench.json")
+
+BIRTHDATE = {"year": 1990, "month": 5, "day": 17}
+COMPATIBILITY_REQUEST = CompatibilityRequest(
+    person1=PersonInfo(birth_year=1990, birth_month=5, birth_day=17, birth_hour=9, gender="male", name="A"),
+    person2=PersonInfo(birth_year=1992, birth_month=8, birth_day=3),
+    language="ko",
+)
+
+Operation = Callable[[], Any]
+AsyncOperation = Callable[[], Awaitable[Any]]
+
+
+def sync_cases() -> Dict[str, Operation]:
+    """Pure-Python cases"""
+    request = BirthdateRequest(**BIRTHDATE)
+    cases: Dict[str, Operation] = {
+        "stats_service.calculate_life_stats": lambda: stats_service.calculate_life_stats(request),
+        "BirthdateRequest(...)": lambda: BirthdateRequest(**BIRTHDATE),
+        "BirthdateRequest.model_validate_json": lambda: BirthdateRequest.model_validate_json(
+            b'{"year": 1990, "month": 5, "day": 17}'
+        ),
+        "compatibility_service._calculate_zodiac": lambda: compatibility_service._calculate_zodiac(1990),
+        "compatibility_service._calculate_elements": lambda: compatibility_service._calculate_elements(1990),
+        "saju_engine.analyze": lambda: saju_engine.analyze(COMPATIBILITY_REQUEST),
+    }
+    for variant in VARIANTS:
+        cases[f"compatibility_service._build_messages[{variant}]"] = (
+            lambda variant=variant: build_messages(COMPATIBILITY_REQUEST, variant, compatibility_service._year_info)
+        )
+    return cases
+
+
+async def repository_case(mode: str) -> Tuple[AsyncOperation, Callable[[], Awaitable[None]]]:
+    """ViewCountRepository.increment on a fresh in-memory SQLite database; returns (operation, close)"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)()
+    repository = ViewCountRepository(session, increment_mode=mode, shards=1)
+
+    async def close() -> None:
+        await session.close()
+        await engine.dispose()
+
+    return lambda: repository.increment("microbench"), close
+
+
+ASYNC_CASES: Dict[str, Callable[[], Awaitable[Tuple[AsyncOperation, Callable[[], Awaitable[None]]]]]] = {
+    "view_count_repository.increment[orm]": lambda: repository_case("orm"),
+    "view_count_repository.increment[atomic]": lambda: repository_case("atomic"),
+}
+
+
+def measure(run: Callable[[int], None], min_time: float, repeat: int) -> Dict[str, float]:
+    """
+    Time `run(n)` (n calls of the operation) and trace its allocations
+
+    Args:
+        run: Calls the operation n times
+        min_time: Shortest timed run in seconds, used to pick n
+        repeat: Timed runs; the fastest counts
+
+    Returns:
+        ns/op, alloc B/op, retained B/op and the calibrated n
+    """
+    run(10)  # Warm caches and lazy imports
+    n = 1
+    while True:
+        started = time.perf_counter()
+        run(n)
+        if time.perf_counter() - started >= min_time / 10 or n >= 10 ** 7:
+            break
+        n *= 10
+    elapsed = time.perf_counter() - started
+    n = max(1, int(n * min_time / max(elapsed, 1e-9)))
+
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(n)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(25):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run(1)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        run(1000)
+        gc.collect()
+        retained = (tracemalloc.get_traced_memory()[0] - before) / 1000
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ns_per_op": round(best / n * 1e9, 1),
+        "alloc_bytes_per_op": int(statistics.median(peaks)),
+        "retained_bytes_per_op": round(max(0.0, retained), 1),
+        "ops": n,
+    }
+
+
+def run_cases(selected: Callable[[str], bool], min_time: float, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measure every selected case, printing as it goes"""
+    results = {}
+    for name, operation in sync_cases().items():
+        if not selected(name):
+            continue
+        def run(n: int, operation: Operation = operation) -> None:
+            for _ in range(n):
+                operation()
+        results[name] = measure(run, min_time, repeat)
+        print_row(name, results[name])
+
+    loop = asyncio.new_event_loop()
+    try:
+        for name, factory in ASYNC_CASES.items():
+            if not selected(name):
+                continue
+            operation, close = loop.run_until_complete(factory())
+
+            async def batch(n: int, operation: AsyncOperation = operation) -> None:
+                for _ in range(n):
+                    await operation()
+
+            try:
+                results[name] = measure(lambda n: loop.run_until_complete(batch(n)), min_time, repeat)
+            finally:
+                loop.run_until_complete(close())
+            print_row(name, results[name])
+    finally:
+        loop.close()
+    return results
+
+
+def print_row(name: str, result: Dict[str, float], base: Optional[Dict[str, float]] = None) -> None:
+    """One line of the results table, with changes against `base` when given"""
+    line = (
+        f"{name:<52} {result['ns_per_op']:>12,.0f} {result['alloc_bytes_per_op']:>9,}"
+        f" {result['retained_bytes_per_op']:>9,.0f}"
+    )
+    if base:
+        line += (
+            f" {result['ns_per_op'] / base['ns_per_op'] - 1:>+8.0%}"
+            f" {result['alloc_bytes_per_op'] - base['alloc_bytes_per_op']:>+9,}"
+        )
+    print(line)
+
+
+def revision() -> str:
+    """Short commit hash, with -dirty when the working tree has changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Cases whose ns/op or alloc B/op grew by more than `threshold`"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["ns_per_op"] > base["ns_per_op"] * (1 + threshold):
+            regressions.append(f"{name}: {result['ns_per_op']:,.0f} ns/op vs {base['ns_per_op']:,.0f}")
+        # Small absolute growth (a few objects) is not worth failing on
+        if result["alloc_bytes_per_op"] > base["alloc_bytes_per_op"] * (1 + threshold) + 256:
+            regressions.append(f"{name}: {result['alloc_bytes_per_op']:,} B/op vs {base['alloc_bytes_per_op']:,}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results file to compare against")
+    parser.add_argument("--against", default=None, help="Compare against the stored results of this revision")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed growth as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run to --baseline")
+    args = parser.parse_args()
+
+    print(f"{'case':<52} {'ns/op':>12} {'alloc B':>9} {'retain B':>9}")
+    results = run_cases(lambda name: args.filter in name, args.min_time, args.repeat)
+    run = {
+        "revision": revision(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "results": results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{run['revision']}.json")
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"results: {path}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    against = os.path.join(RESULTS_DIR, f"{args.against}.json") if args.against else args.baseline
+    if not os.path.exists(against):
+        print(f"nothing to compare against at {against}")
+        return 0
+    with open(against) as f:
+        baseline = json.load(f)
+
+    print(f"\nagainst {baseline['revision']} ({baseline['created_at']})")
+    print(f"{'case':<52} {'ns/op':>12} {'alloc B':>9} {'retain B':>9} {'ns/op':>8} {'alloc B':>9}")
+    for name, result in results.items():
+        print_row(name, result, baseline["results"].get(name))
+    regressions = compare(results, baseline["results"], args.threshold)
+    for regression in regressions:
+        print(f"FAIL {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
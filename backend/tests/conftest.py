@@ -0,0 +1,28 @@
+"""
+Test configuration
+Settings are read from the environment at import, so they are pinned here before any app module loads
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("COMPATIBILITY_CACHE_BACKEND", "none")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models import (  # noqa: E402,F401
+    view_count, view_count_bucket, unique_visitor_sketch, compatibility_cache_entry
+)
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Async URL of a fresh SQLite file holding every model's table"""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{path}"
@@ -0,0 +1,185 @@
+"""
+Compatibility batch route tests
+Fan-out under the batch semaphore, per-candidate failures, NDJSON framing, and cancellation on disconnect
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core.resilience import CircuitBreaker
+from app.main import app
+from app.services.compatibility_service import compatibility_service, settings
+from benchmarks.fake_openai_server import RESULT
+
+BATCH = "/api/v1/compatibility/analyze/batch"
+CONCURRENCY = 3
+ANCHOR = {"birth_year": 1990, "birth_month": 5, "birth_day": 17}
+FAILING_YEAR = 1977
+
+
+def candidates(count: int) -> list:
+    return [{"birth_year": 1970 + n, "birth_month": 3, "birth_day": 1 + n} for n in range(count)]
+
+
+class Upstream:
+    """chat.completions stand-in tracking concurrency; fails for pairs with FAILING_YEAR"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    async def create(self, **kwargs) -> SimpleNamespace:
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        if str(FAILING_YEAR) in kwargs["messages"][-1]["content"]:
+            raise RuntimeError("stub upstream failure")
+        message = SimpleNamespace(content=json.dumps(RESULT))
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=40)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    for name, value in {
+        "COMPATIBILITY_MODE": "llm",
+        "COMPATIBILITY_BATCH_CONCURRENCY": CONCURRENCY,
+        "OPENAI_RETRY_ATTEMPTS": 0,
+        "OPENAI_INPUT_COST_PER_1M_TOKENS": 1.0,
+        "OPENAI_OUTPUT_COST_PER_1M_TOKENS": 2.0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    stub = Upstream()
+    monkeypatch.setattr(compatibility_service, "_client", SimpleNamespace(chat=SimpleNamespace(completions=stub)))
+    monkeypatch.setattr(compatibility_service, "breaker", CircuitBreaker("OpenAI", failure_threshold=100, reset_timeout=30))
+    return stub
+
+
+def post_batch(body: dict) -> httpx.Response:
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            return await api.post(BATCH, json=body)
+
+    return asyncio.run(main())
+
+
+def ndjson(response: httpx.Response) -> list:
+    """Every line is one JSON object and the body ends with a newline"""
+    assert response.text.endswith("\n")
+    return [json.loads(line) for line in response.text[:-1].split("\n")]
+
+
+def test_fan_out_is_bounded_by_the_batch_semaphore(upstream):
+    response = post_batch({"anchor": ANCHOR, "candidates": candidates(7), "language": "en"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = ndjson(response)
+    items, summary = lines[:-1], lines[-1]
+    assert [line["type"] for line in items] == ["item"] * 7
+    assert sorted(item["index"] for item in items) == list(range(7))
+    assert upstream.calls == 7
+    assert upstream.peak == CONCURRENCY
+    assert summary["type"] == "summary"
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (7, 7, 0)
+
+
+def test_one_failed_candidate_does_not_fail_the_rest(upstream):
+    response = post_batch({"anchor": ANCHOR, "candidates": candidates(9), "language": "en"})
+    lines = ndjson(response)
+    by_index = {line["index"]: line for line in lines[:-1]}
+    failed = FAILING_YEAR - 1970
+
+    assert by_index[failed]["status"] == "error"
+    assert by_index[failed]["result"] is None
+    assert by_index[failed]["error"] == "Failed to analyze compatibility. Please try again later."
+    assert by_index[failed]["usage"]["total_tokens"] == 0
+    for index, item in by_index.items():
+        if index != failed:
+            assert item["status"] == "ok"
+            assert item["source"] == "llm"
+            assert item["result"]["score"] == RESULT["score"]
+            assert item["usage"] == {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140}
+            assert item["cost_usd"] == pytest.approx(0.00018)
+
+    summary = lines[-1]
+    assert (summary["succeeded"], summary["failed"]) == (8, 1)
+    assert summary["sources"] == {"llm": 8}
+    assert summary["usage"]["total_tokens"] == 8 * 140
+    assert summary["cost_usd"] == pytest.approx(8 * 0.00018)
+
+
+def test_invalid_candidate_date_is_reported_per_item(upstream):
+    body = {"anchor": ANCHOR, "candidates": [candidates(1)[0], {"birth_year": 1990, "birth_month": 2, "birth_day": 30}]}
+    lines = ndjson(post_batch(body))
+    by_index = {line["index"]: line for line in lines[:-1]}
+
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1] == {**by_index[1], "status": "error", "error": "Invalid date for candidate"}
+    assert upstream.calls == 1
+
+
+def test_invalid_anchor_is_rejected_before_streaming(upstream):
+    response = post_batch({"anchor": {**ANCHOR, "birth_month": 2, "birth_day": 30}, "candidates": candidates(2)})
+
+    assert response.status_code == 400
+    assert upstream.calls == 0
+
+
+@pytest.mark.parametrize("single_flight", [False, True])
+def test_disconnect_cancels_remaining_candidates(upstream, monkeypatch, single_flight):
+    """Drives the app directly so the client can disconnect after the first lines"""
+    monkeypatch.setattr(settings, "OPENAI_SINGLE_FLIGHT_ENABLED", single_flight)
+    body = json.dumps({"anchor": ANCHOR, "candidates": candidates(12), "language": "en"}).encode()
+
+    async def main():
+        first_line = asyncio.Event()
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+        chunks = []
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await first_line.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                chunks.append(message["body"])
+                first_line.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": BATCH, "raw_path": BATCH.encode(), "query_string": b"", "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+            "server": ("test", 80), "client": ("127.0.0.1", 50000),
+        }
+        await app(scope, receive, send)
+        await asyncio.sleep(upstream.delay * 4)  # Long enough for every remaining candidate to have run
+        leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return chunks, leftover
+
+    chunks, leftover = asyncio.run(main())
+    assert 1 <= len(chunks) < 12
+    assert leftover == []
+    assert upstream.active == 0
+    # Only candidates already holding a batch slot at the disconnect reached the upstream
+    assert upstream.calls <= len(chunks) + CONCURRENCY
+    if single_flight:
+        # A shared call outlives its cancelled callers so its result can still be cached
+        assert upstream.cancelled == 0
+    else:
+        assert upstream.cancelled == upstream.calls - len(chunks) > 0
@@ -0,0 +1,192 @@
+"""
+Compatibility cache tests
+Key normalization, memory TTL and LRU, and the database tier behind memory
+"""
+import asyncio
+import hashlib
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo
+from app.services import compatibility_cache as cache_module
+from app.services.compatibility_cache import (
+    CompatibilityCache, DatabaseCacheBackend, MemoryCacheBackend, cache_key
+)
+
+MODEL = "gpt-4o-mini"
+A = {"birth_year": 1990, "birth_month": 5, "birth_day": 17, "birth_hour": 3, "gender": "female", "name": "Ana"}
+B = {"birth_year": 1992, "birth_month": 8, "birth_day": 3, "birth_hour": 14, "gender": "male", "name": "Bo"}
+RESULT = {"score": 82, "summary": "좋은 궁합"}
+
+
+def request(person1=A, person2=B, language="ko") -> CompatibilityRequest:
+    return CompatibilityRequest(person1=PersonInfo(**person1), person2=PersonInfo(**person2), language=language)
+
+
+def key(*args, variant="full", model=MODEL, **kwargs) -> str:
+    return cache_key(request(*args, **kwargs), model, variant)
+
+
+class Clock:
+    """Monotonic clock moved by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache module's view of time; the event loop keeps the real clock
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_key_is_order_independent():
+    assert key(A, B) == key(B, A)
+
+
+def test_key_ignores_name_whitespace_and_empty_names():
+    assert key({**A, "name": "  Ana "}, B) == key(A, B)
+    assert key({**A, "name": ""}, B) == key({**A, "name": "   "}, B) == key({**A, "name": None}, B)
+
+
+def test_key_format_is_stable():
+    # Changing the canonical form silently orphans every stored entry; bump CACHE_KEY_VERSION instead
+    people = sorted(json.dumps({**person}, sort_keys=True) for person in (A, B))
+    canonical = json.dumps(
+        {"v": 1, "model": MODEL, "language": "ko", "people": people}, sort_keys=True, separators=(",", ":")
+    )
+    assert key(B, A) == hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("change", [
+    {"birth_year": 1991},
+    {"birth_month": 6},
+    {"birth_day": 18},
+    {"birth_hour": 4},
+    {"birth_hour": None},
+    {"gender": "male"},
+    {"gender": None},
+    {"name": "Anna"},
+    {"name": None},
+])
+def test_key_changes_with_every_input_field(change):
+    assert key({**A, **change}, B) != key(A, B)
+
+
+def test_key_does_not_mix_fields_between_people():
+    # Same multiset of hours and names, attached to the other person
+    assert key({**A, "birth_hour": 14}, {**B, "birth_hour": 3}) != key(A, B)
+    assert key({**A, "name": "Bo"}, {**B, "name": "Ana"}) != key(A, B)
+
+
+def test_key_changes_with_language_model_and_prompt_variant():
+    base = key(A, B)
+    assert key(A, B, language="en") != base
+    assert key(A, B, model="gpt-4o") != base
+    assert key(A, B, variant="compact") != base
+
+
+def test_memory_entries_expire(clock):
+    async def scenario():
+        memory = MemoryCacheBackend(max_entries=10, ttl_seconds=60)
+        await memory.set("k", RESULT)
+        clock.now += 59
+        fresh = await memory.get("k")
+        clock.now += 1
+        return fresh, await memory.get("k"), memory.size(), memory.expirations
+
+    assert asyncio.run(scenario()) == (RESULT, None, 0, 1)
+
+
+def test_memory_evicts_least_recently_used(clock):
+    async def scenario():
+        memory = MemoryCacheBackend(max_entries=2, ttl_seconds=60)
+        await memory.set("a", {"n": 1})
+        await memory.set("b", {"n": 2})
+        await memory.get("a")  # b is now the least recently used
+        await memory.set("c", {"n": 3})
+        await memory.set("a", {"n": 4})  # Overwriting does not evict
+        return [await memory.get(name) for name in "abc"], memory.evictions
+
+    assert asyncio.run(scenario()) == ([{"n": 4}, None, {"n": 3}], 1)
+
+
+def run_database(database_url, scenario):
+    async def main():
+        engine = create_async_engine(database_url)
+        try:
+            return await scenario(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_database_tier_serves_memory_misses_and_fills_memory(database_url, clock):
+    async def scenario(sessions):
+        database = DatabaseCacheBackend(sessions, max_entries=100, ttl_seconds=3600)
+        writer = CompatibilityCache(memory=MemoryCacheBackend(10, 3600), database=database)
+        await writer.set("k", RESULT)
+
+        # Another worker: empty memory, same database
+        reader = CompatibilityCache(memory=MemoryCacheBackend(10, 3600), database=database)
+        first = await reader.get("k")
+        second = await reader.get("k")
+        missing = await reader.get("other")
+        return first, second, missing, reader.metrics()
+
+    first, second, missing, metrics = run_database(database_url, scenario)
+    assert first == second == RESULT
+    assert missing is None
+    assert (metrics["database_hits"], metrics["memory_hits"], metrics["misses"]) == (1, 1, 1)
+    assert metrics["memory_size"] == 1
+
+
+def test_database_entries_expire_and_are_evicted(database_url):
+    async def scenario(sessions):
+        expired = DatabaseCacheBackend(sessions, max_entries=2, ttl_seconds=-1)
+        await expired.set("stale", RESULT)
+        live = DatabaseCacheBackend(sessions, max_entries=2, ttl_seconds=3600)
+        for name in ("a", "b", "c"):
+            await live.set(name, {"n": name})
+        stale = await live.get("stale")
+        deleted = await live.evict()
+        return stale, deleted, [await live.get(name) for name in "abc"]
+
+    stale, deleted, remaining = run_database(database_url, scenario)
+    assert stale is None
+    assert deleted == 2  # The expired entry, then the oldest beyond max_entries
+    assert remaining == [None, {"n": "b"}, {"n": "c"}]
+
+
+class BrokenDatabase:
+    name = "database"
+    evictions = 0
+
+    async def get(self, key):
+        raise RuntimeError("database went away")
+
+    async def set(self, key, value):
+        raise RuntimeError("database went away")
+
+
+def test_database_errors_fall_through_as_misses():
+    async def scenario():
+        cache = CompatibilityCache(memory=MemoryCacheBackend(10, 3600), database=BrokenDatabase())
+        missed = await cache.get("k")
+        await cache.set("k", RESULT)
+        return missed, await cache.get("k"), cache.metrics()
+
+    missed, hit, metrics = asyncio.run(scenario())
+    assert missed is None
+    assert hit == RESULT  # Still served from memory
+    assert metrics["errors"] == 2
+    assert (metrics["misses"], metrics["memory_hits"]) == (1, 1)
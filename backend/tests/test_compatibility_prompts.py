@@ -0,0 +1,238 @@
+"""
+Compatibility prompt tests
+The full variant against the original prompt, the compact variant's schema, and token accounting
+"""
+import hashlib
+
+import pytest
+
+from app.schemas.compatibility import CompatibilityRequest, CompatibilityResponse, PersonInfo, TokenUsage
+from app.services import compatibility_prompts
+from app.services.compatibility_prompts import PromptStats, build_messages, count_message_tokens, count_tokens
+from app.services.compatibility_service import compatibility_service
+from benchmarks.bench_prompts import PINNED_FULL, REQUESTS
+
+BASELINE_SYSTEM = "You are a professional Saju fortune teller. Always respond in valid JSON format."
+
+PEOPLE = [
+    PersonInfo(birth_year=1990, birth_month=5, birth_day=17, birth_hour=9, gender="male", name="A"),
+    PersonInfo(birth_year=1992, birth_month=8, birth_day=3),
+    PersonInfo(birth_year=1984, birth_month=12, birth_day=31, birth_hour=0, gender="female", name="김민지"),
+    PersonInfo(birth_year=2003, birth_month=2, birth_day=28, birth_hour=23, name="O'Brien \"Jo\" {x}"),
+]
+
+
+def baseline_zodiac(year: int) -> dict:
+    """CompatibilityService._calculate_zodiac before the templates"""
+    zodiacs = ["원숭이", "닭", "개", "돼지", "쥐", "소", "호랑이", "토끼", "용", "뱀", "말", "양"]
+    zodiacs_en = ["Monkey", "Rooster", "Dog", "Pig", "Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake", "Horse", "Goat"]
+    index = year % 12
+    return {"ko": zodiacs[index], "en": zodiacs_en[index]}
+
+
+def baseline_element(year: int) -> dict:
+    """CompatibilityService._calculate_elements before the templates"""
+    names = [("금(金)", "Metal"), ("수(水)", "Water"), ("목(木)", "Wood"), ("화(火)", "Fire"), ("토(土)", "Earth")]
+    ko, en = names[year % 10 // 2]
+    return {"ko": ko, "en": en}
+
+
+def baseline_prompt(request: CompatibilityRequest) -> str:
+    """The user prompt exactly as CompatibilityService._build_prompt wrote it before the templates"""
+    p1 = request.person1
+    p2 = request.person2
+    lang = request.language
+
+    # 띠와 오행 계산
+    zodiac1 = baseline_zodiac(p1.birth_year)
+    zodiac2 = baseline_zodiac(p2.birth_year)
+    element1 = baseline_element(p1.birth_year)
+    element2 = baseline_element(p2.birth_year)
+
+    # 이름 설정
+    name1 = p1.name if p1.name else ("첫 번째 사람" if lang == "ko" else "Person 1")
+    name2 = p2.name if p2.name else ("두 번째 사람" if lang == "ko" else "Person 2")
+
+    if lang == "ko":
+        prompt = f"""당신은 전문 사주 명리학자입니다. 두 사람의 사주 궁합을 분석해주세요.
+
+**{name1}의 정보:**
+- 생년월일: {p1.birth_year}년 {p1.birth_month}월 {p1.birth_day}일
+- 생시: {f'{p1.birth_hour}시' if p1.birth_hour is not None else '미제공'}
+- 성별: {p1.gender if p1.gender else '미제공'}
+- 띠: {zodiac1['ko']}띠
+- 오행: {element1['ko']}
+
+**{name2}의 정보:**
+- 생년월일: {p2.birth_year}년 {p2.birth_month}월 {p2.birth_day}일
+- 생시: {f'{p2.birth_hour}시' if p2.birth_hour is not None else '미제공'}
+- 성별: {p2.gender if p2.gender else '미제공'}
+- 띠: {zodiac2['ko']}띠
+- 오행: {element2['ko']}
+
+아래 JSON 형식으로 정확히 응답해주세요:
+
+{{
+  "score": 0-100 사이의 궁합 점수 (정수),
+  "summary": "전체적인 궁합에 대한 2-3문장 요약",
+  "strengths": ["강점 1", "강점 2", "강점 3"],
+  "cautions": ["주의할 점 1", "주의할 점 2", "주의할 점 3"],
+  "elements_analysis": "오행 관점에서의 상생상극 분석 (2-3문장)",
+  "zodiac_compatibility": "띠 궁합 분석 (2-3문장)",
+  "advice": "두 사람을 위한 조언 및 팁 (2-3문장)"
+}}
+
+**중요 지침:**
+1. 반드시 유효한 JSON 형식으로만 응답하세요.
+2. strengths와 cautions는 정확히 3개의 항목을 포함해야 합니다.
+3. score는 0-100 사이의 정수여야 합니다.
+4. 모든 텍스트는 한국어로 작성하세요.
+5. 긍정적이면서도 현실적인 조언을 제공하세요."""
+
+    else:  # English
+        prompt = f"""You are a professional Saju (Four Pillars of Destiny) fortune teller. Please analyze the compatibility between two people.
+
+**{name1}'s Information:**
+- Birth Date: {p1.birth_month}/{p1.birth_day}/{p1.birth_year}
+- Birth Hour: {f'{p1.birth_hour}:00' if p1.birth_hour is not None else 'Not provided'}
+- Gender: {p1.gender if p1.gender else 'Not provided'}
+- Zodiac: {zodiac1['en']}
+- Element: {element1['en']}
+
+**{name2}'s Information:**
+- Birth Date: {p2.birth_month}/{p2.birth_day}/{p2.birth_year}
+- Birth Hour: {f'{p2.birth_hour}:00' if p2.birth_hour is not None else 'Not provided'}
+- Gender: {p2.gender if p2.gender else 'Not provided'}
+- Zodiac: {zodiac2['en']}
+- Element: {element2['en']}
+
+Please respond in exactly this JSON format:
+
+{{
+  "score": compatibility score between 0-100 (integer),
+  "summary": "Overall compatibility summary in 2-3 sentences",
+  "strengths": ["Strength 1", "Strength 2", "Strength 3"],
+  "cautions": ["Caution 1", "Caution 2", "Caution 3"],
+  "elements_analysis": "Analysis from Five Elements perspective (2-3 sentences)",
+  "zodiac_compatibility": "Chinese zodiac compatibility analysis (2-3 sentences)",
+  "advice": "Advice and tips for the couple (2-3 sentences)"
+}}
+
+**Important Guidelines:**
+1. Respond ONLY in valid JSON format.
+2. strengths and cautions must contain exactly 3 items each.
+3. score must be an integer between 0-100.
+4. All text should be in English.
+5. Provide positive yet realistic advice."""
+
+    return prompt
+
+
+def request(person1: PersonInfo, person2: PersonInfo, language: str) -> CompatibilityRequest:
+    return CompatibilityRequest(person1=person1, person2=person2, language=language)
+
+
+def messages(req: CompatibilityRequest, variant: str) -> list:
+    return build_messages(req, variant, compatibility_service._year_info)
+
+
+def test_year_lookup_matches_the_original_tables():
+    for year in range(1900, 2101):
+        assert compatibility_service._year_info(year) == (baseline_zodiac(year), baseline_element(year))
+
+
+@pytest.mark.parametrize("language", ["ko", "en"])
+@pytest.mark.parametrize("first", range(len(PEOPLE)))
+@pytest.mark.parametrize("second", range(len(PEOPLE)))
+def test_full_variant_is_byte_identical_to_the_original_prompt(language, first, second):
+    req = request(PEOPLE[first], PEOPLE[second], language)
+    assert messages(req, "full") == [
+        {"role": "system", "content": BASELINE_SYSTEM},
+        {"role": "user", "content": baseline_prompt(req)},
+    ]
+
+
+def test_year_info_override_matches_the_lookup():
+    req = request(PEOPLE[0], PEOPLE[2], "ko")
+    year_info = {year: compatibility_service._year_info(year) for year in (1990, 1984)}
+    assert build_messages(req, "full", lambda year: pytest.fail("lookup used"), year_info) == messages(req, "full")
+
+
+@pytest.mark.parametrize("language", ["ko", "en"])
+def test_full_variant_matches_the_pinned_benchmark_hash(language):
+    text = "\n".join(message["content"] for message in messages(REQUESTS[language], "full"))
+    assert hashlib.sha256(text.encode("utf-8")).hexdigest() == PINNED_FULL[language]
+
+
+@pytest.mark.parametrize("language", ["ko", "en"])
+def test_compact_variant_keeps_the_schema_and_both_people(language):
+    req = request(PEOPLE[0], PEOPLE[2], language)
+    system, user = messages(req, "compact")
+    full = messages(req, "full")
+
+    assert (system["role"], user["role"]) == ("system", "user")
+    for field in CompatibilityResponse.model_fields:
+        assert f'"{field}"' in system["content"]
+    assert "exactly 3" in system["content"] or "정확히 3개" in system["content"]
+    for value in ("A", "김민지", "1990", "1984", "17", "31", "12"):
+        assert value in user["content"]
+    assert ("male" in user["content"]) and ("female" in user["content"])
+    # Person data goes only in the user message, so the system message is the same for every request
+    assert system == messages(request(PEOPLE[1], PEOPLE[3], language), "compact")[0]
+    assert count_message_tokens([system, user]) < count_message_tokens(full)
+
+
+@pytest.fixture
+def heuristic(monkeypatch):
+    monkeypatch.setattr(compatibility_prompts, "_encoding", None)
+
+
+class FakeEncoding:
+    """tiktoken Encoding stand-in: one token per whitespace-separated word"""
+
+    def encode(self, text: str) -> list:
+        return [hash(word) for word in text.split()]
+
+
+def test_heuristic_counts_four_ascii_characters_per_token(heuristic):
+    assert count_tokens("") == 0
+    assert count_tokens("abcd") == 1
+    assert count_tokens("abcde") == 2
+    assert count_tokens("궁합") == 2
+    assert count_tokens("궁합 score") == 2 + 2  # " score" is 6 ASCII characters
+
+
+def test_tiktoken_encoding_is_used_when_available(monkeypatch):
+    monkeypatch.setattr(compatibility_prompts, "_encoding", FakeEncoding())
+    assert count_tokens("one two  three") == 3
+    assert count_tokens("궁합 분석") == 2
+
+
+@pytest.mark.parametrize("encoding", [None, FakeEncoding()], ids=["heuristic", "tiktoken"])
+def test_message_tokens_add_per_message_overhead(monkeypatch, encoding):
+    monkeypatch.setattr(compatibility_prompts, "_encoding", encoding)
+    msgs = messages(REQUESTS["en"], "full")
+    assert count_message_tokens(msgs) == sum(3 + count_tokens(m["content"]) for m in msgs) + 3
+    assert count_message_tokens([]) == 3
+
+
+def test_token_counter_names_the_active_counter():
+    expected = "heuristic" if compatibility_prompts.tiktoken is None else "tiktoken"
+    assert compatibility_prompts.TOKEN_COUNTER == expected
+    assert PromptStats().snapshot() == {"token_counter": expected, "variants": {}}
+
+
+def test_prompt_stats_snapshot():
+    stats = PromptStats()
+    stats.record_prompt("full", 400)
+    stats.record_prompt("full", 401)
+    stats.record_prompt("compact", 150)
+    stats.record_usage("full", TokenUsage(prompt_tokens=410, completion_tokens=300))
+
+    variants = stats.snapshot()["variants"]
+    assert variants["full"] == {
+        "prompts": 2, "estimated_prompt_tokens": 801, "responses": 1, "prompt_tokens": 410, "completion_tokens": 300,
+        "avg_estimated_prompt_tokens": 400.5, "avg_prompt_tokens": 410.0, "avg_completion_tokens": 300.0,
+    }
+    assert variants["compact"]["avg_estimated_prompt_tokens"] == 150.0
+    assert variants["compact"]["avg_prompt_tokens"] == 0.0
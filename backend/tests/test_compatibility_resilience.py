@@ -0,0 +1,190 @@
+"""
+Compatibility resilience tests
+Retry, circuit breaker and deadline policy against the fault-injecting fake OpenAI server
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.core.resilience import CircuitBreaker, RetryBudget
+from app.main import app
+from app.schemas.compatibility import CompatibilityRequest
+from app.services.compatibility_service import compatibility_service, settings
+from benchmarks import fake_openai_server
+from benchmarks.bench_compatibility_load import COMPATIBILITY_BODY
+
+ANALYZE = "/api/v1/compatibility/analyze"
+HEALTH = "/api/v1/compatibility/health"
+BREAKER_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 0.3
+DEADLINE_SECONDS = 0.5
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Routes the service's OpenAI client to the fake server in-process
+
+    Returns the fake server's FAULTS dict; tests change it to inject faults.
+    """
+    monkeypatch.setenv("FAKE_OPENAI_DELAY_SECONDS", "0")
+    monkeypatch.setattr(fake_openai_server, "FAULTS", {"error_rate": 0.0, "error_status": 500, "hang_rate": 0.0})
+    monkeypatch.setattr(fake_openai_server, "STATS", {"requests": 0})
+
+    for name, value in {
+        "COMPATIBILITY_MODE": "llm",
+        "OPENAI_SINGLE_FLIGHT_ENABLED": False,
+        "OPENAI_DEADLINE_SECONDS": DEADLINE_SECONDS,
+        "OPENAI_RETRY_ATTEMPTS": 3,
+        "OPENAI_RETRY_BASE_DELAY_SECONDS": 0.01,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    transport = httpx.ASGITransport(app=fake_openai_server.app)
+    monkeypatch.setattr(compatibility_service, "_client", AsyncOpenAI(
+        api_key="sk-fake", base_url="http://fake-openai/v1", max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport)
+    ))
+    monkeypatch.setattr(compatibility_service, "breaker", CircuitBreaker(
+        "OpenAI", failure_threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET_SECONDS
+    ))
+    monkeypatch.setattr(compatibility_service, "retry_budget", RetryBudget(
+        ratio=0.2, min_per_second=0.5, capacity=100
+    ))
+    return fake_openai_server.FAULTS
+
+
+def requests_sent() -> int:
+    return fake_openai_server.STATS["requests"]
+
+
+def run(scenario):
+    """Run a scenario with an API client on the app (no lifespan)"""
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            return await scenario(api)
+
+    return asyncio.run(main())
+
+
+def test_healthy_upstream(upstream):
+    async def scenario(api):
+        response = await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        health = (await api.get(HEALTH)).json()
+        return response, health
+
+    response, health = run(scenario)
+    assert response.status_code == 200
+    assert response.json()["score"] == fake_openai_server.RESULT["score"]
+    assert health["status"] == "healthy"
+    assert health["circuit_breaker"]["state"] == "closed"
+
+
+class Alternating:
+    """random stand-in: the fake server draws hang then error per request, so every other request fails"""
+
+    def __init__(self):
+        self.values = [0.9, 0.0, 0.9, 0.9]
+        self.index = 0
+
+    def random(self) -> float:
+        value = self.values[self.index % len(self.values)]
+        self.index += 1
+        return value
+
+
+def test_retries_hide_a_flaky_upstream(upstream, monkeypatch):
+    upstream.update(error_rate=0.5)
+    monkeypatch.setattr(fake_openai_server, "random", Alternating())
+
+    async def scenario(api):
+        return [(await api.post(ANALYZE, json=COMPATIBILITY_BODY)).status_code for _ in range(10)]
+
+    statuses = run(scenario)
+    assert statuses == [200] * 10
+    assert requests_sent() == 20
+
+
+def test_breaker_opens_and_fails_fast(upstream):
+    upstream.update(error_rate=1.0)
+
+    async def scenario(api):
+        first = await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        sent = requests_sent()
+        started = time.perf_counter()
+        second = await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        elapsed = time.perf_counter() - started
+        health = (await api.get(HEALTH)).json()
+        return first, sent, second, elapsed, health
+
+    first, sent, second, elapsed, health = run(scenario)
+    assert first.status_code in (500, 503)
+    assert sent == BREAKER_THRESHOLD  # Retries stop once the breaker opens
+    assert second.status_code == 503
+    assert "retry-after" in second.headers
+    assert elapsed < 0.1
+    assert requests_sent() == sent
+    assert health["status"] == "degraded"
+    assert health["circuit_breaker"]["state"] == "open"
+
+
+def test_half_open_probe_closes_the_breaker(upstream):
+    upstream.update(error_rate=1.0)
+
+    async def scenario(api):
+        await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        upstream.update(error_rate=0.0)
+        await asyncio.sleep(BREAKER_RESET_SECONDS + 0.05)
+        response = await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        return response, (await api.get(HEALTH)).json()
+
+    response, health = run(scenario)
+    assert response.status_code == 200
+    assert health["circuit_breaker"]["state"] == "closed"
+
+
+def test_hanging_upstream_hits_the_deadline(upstream):
+    upstream.update(hang_rate=1.0)
+
+    async def scenario(api):
+        started = time.perf_counter()
+        response = await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        return response, time.perf_counter() - started
+
+    response, elapsed = run(scenario)
+    assert response.status_code == 504
+    assert DEADLINE_SECONDS <= elapsed < DEADLINE_SECONDS + 0.5
+
+
+def test_cancelled_half_open_probe_is_released(upstream):
+    upstream.update(error_rate=1.0)
+
+    async def scenario(api):
+        await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        assert compatibility_service.breaker.state == "open"
+        upstream.update(error_rate=0.0, hang_rate=1.0)
+        await asyncio.sleep(BREAKER_RESET_SECONDS + 0.05)
+
+        # The probe hangs upstream and its caller goes away
+        probe = asyncio.create_task(compatibility_service.analyze_compatibility(
+            CompatibilityRequest(**COMPATIBILITY_BODY)
+        ))
+        sent = requests_sent()
+        while requests_sent() == sent:
+            await asyncio.sleep(0.01)
+        assert compatibility_service.breaker.state == "half_open"
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        # The next caller may probe instead of being rejected as if a probe were running
+        upstream.update(hang_rate=0.0)
+        response = await api.post(ANALYZE, json=COMPATIBILITY_BODY)
+        return response, compatibility_service.breaker.snapshot()
+
+    response, breaker = run(scenario)
+    assert response.status_code == 200
+    assert breaker["state"] == "closed"
@@ -0,0 +1,132 @@
+"""
+Single-flight tests
+Concurrent identical analyses make one upstream call and share its outcome
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.core.single_flight import SingleFlight
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo
+from app.services.compatibility_service import CompatibilityService
+from benchmarks.fake_openai_server import RESULT
+
+REQUESTS = 100
+
+
+class StubCompletions:
+    """chat.completions stand-in that counts calls and answers after a delay"""
+
+    def __init__(self, delay: float = 0.1, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def create(self, **kwargs) -> SimpleNamespace:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("stub upstream failure")
+        message = SimpleNamespace(content=json.dumps(RESULT))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def make_request(swapped: bool) -> CompatibilityRequest:
+    """Same pair of people, optionally in swapped order"""
+    a = PersonInfo(birth_year=1990, birth_month=5, birth_day=17, name="A")
+    b = PersonInfo(birth_year=1992, birth_month=8, birth_day=3, name="B")
+    return CompatibilityRequest(person1=b if swapped else a, person2=a if swapped else b, language="en")
+
+
+def service_with(stub: StubCompletions) -> CompatibilityService:
+    service = CompatibilityService()
+    service._client = SimpleNamespace(chat=SimpleNamespace(completions=stub))
+    return service
+
+
+async def analyze_all(service: CompatibilityService, cancel_every: int = 0) -> list:
+    """REQUESTS concurrent analyses, half with the people swapped; optionally cancel some mid-call"""
+    tasks = [asyncio.create_task(service._analyze(make_request(i % 2 == 1))) for i in range(REQUESTS)]
+    if cancel_every:
+        await asyncio.sleep(0.05)
+        for task in tasks[::cancel_every]:
+            task.cancel()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_identical_requests_make_one_upstream_call():
+    stub = StubCompletions()
+    service = service_with(stub)
+    results = asyncio.run(analyze_all(service))
+
+    assert stub.calls == 1
+    assert [source for _, source, _ in results].count("llm") == 1
+    assert [source for _, source, _ in results].count("coalesced") == REQUESTS - 1
+    assert all(result.score == RESULT["score"] for result, _, _ in results)
+    assert service.flights.metrics() == {"in_flight": 0, "calls": 1, "shared": REQUESTS - 1, "errors": 0}
+
+
+def test_upstream_error_reaches_every_caller_from_one_call():
+    stub = StubCompletions(fail=True)
+    service = service_with(stub)
+    results = asyncio.run(analyze_all(service))
+
+    assert stub.calls == 1
+    assert all(isinstance(result, Exception) and "stub upstream failure" in str(result) for result in results)
+    assert service.flights.metrics()["errors"] == 1
+
+
+def test_cancelled_callers_do_not_cancel_the_shared_call():
+    stub = StubCompletions()
+    service = service_with(stub)
+    results = asyncio.run(analyze_all(service, cancel_every=2))
+
+    cancelled = [result for result in results if isinstance(result, asyncio.CancelledError)]
+    assert stub.calls == 1
+    assert len(cancelled) == REQUESTS // 2
+    assert all(result[0].score == RESULT["score"] for result in results if not isinstance(result, BaseException))
+
+
+def test_disabled_single_flight_calls_upstream_per_request(monkeypatch):
+    monkeypatch.setattr("app.services.compatibility_service.settings.OPENAI_SINGLE_FLIGHT_ENABLED", False)
+    stub = StubCompletions(delay=0.01)
+    service = service_with(stub)
+    asyncio.run(analyze_all(service))
+    assert stub.calls == REQUESTS
+
+
+def test_finished_call_is_forgotten():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            return len(calls)
+
+        first = await flights.do("key", call)
+        second = await flights.do("key", call)
+        return first, second, flights.metrics()
+
+    first, second, metrics = asyncio.run(scenario())
+    assert first == (1, False)
+    assert second == (2, False)
+    assert metrics["in_flight"] == 0
+
+
+def test_error_without_waiters_is_retrieved():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        caller = asyncio.create_task(flights.do("key", fail))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        return flights.metrics()
+
+    assert asyncio.run(scenario())["errors"] == 1
+
@@ -0,0 +1,128 @@
+"""
+Compatibility streaming route tests
+The SSE event sequence for a good stream, a failed one, and a failed one in fallback mode
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.compatibility_service import compatibility_service, settings
+from benchmarks.fake_openai_server import RESULT
+from benchmarks.bench_compatibility_load import COMPATIBILITY_BODY
+
+STREAM = "/api/v1/compatibility/analyze/stream"
+
+
+def upstream_chunks(chunks, error=None):
+    """_complete_stream stand-in that yields fixed chunks, then optionally fails"""
+    async def complete_stream(messages):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+
+    return complete_stream
+
+
+@pytest.fixture
+def mode(monkeypatch):
+    """Sets COMPATIBILITY_MODE for the test"""
+    def set_mode(value):
+        monkeypatch.setattr(settings, "COMPATIBILITY_MODE", value)
+
+    return set_mode
+
+
+def stream(monkeypatch, complete_stream, body=COMPATIBILITY_BODY):
+    """POST to the stream route; return the response and its (event, data) pairs"""
+    monkeypatch.setattr(compatibility_service, "_complete_stream", complete_stream)
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            return await api.post(STREAM, json=body)
+
+    response = asyncio.run(main())
+    events = []
+    if not response.headers["content-type"].startswith("text/event-stream"):
+        return response, events
+    for message in response.text.split("\n\n"):
+        if not message:
+            continue
+        event, data = message.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return response, events
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_event_sequence(monkeypatch, mode):
+    mode("llm")
+    content = json.dumps(RESULT, ensure_ascii=False)
+    response, events = stream(monkeypatch, upstream_chunks(chunked(content, 5)))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert events[-1] == ("result", RESULT)
+    assert [event for event, _ in events].count("result") == 1
+
+    fields = [data for event, data in events if event == "field"]
+    assert [(data["field"], data["value"]) for data in fields] == list(RESULT.items())
+    summary = "".join(data["text"] for event, data in events if event == "delta" and data["field"] == "summary")
+    assert summary == RESULT["summary"]
+    # Each string field streams its deltas before the field event
+    first_delta = next(i for i, (event, data) in enumerate(events) if event == "delta" and data["field"] == "summary")
+    summary_field = next(i for i, (event, data) in enumerate(events) if event == "field" and data["field"] == "summary")
+    assert first_delta < summary_field
+
+
+def test_upstream_failure_ends_with_error_event(monkeypatch, mode):
+    mode("llm")
+    content = json.dumps(RESULT)
+    response, events = stream(monkeypatch, upstream_chunks([content[:40]], error=RuntimeError("stream dropped")))
+
+    assert response.status_code == 200
+    assert events[:2] == [
+        ("field", {"field": "score", "value": 82}),
+        ("delta", {"field": "summary", "text": "Fake analysis "}),
+    ]
+    assert events[-1] == ("error", {"status": 500, "detail": "Failed to analyze compatibility. Please try again later."})
+    assert "result" not in [event for event, _ in events]
+
+
+def test_invalid_result_ends_with_error_event(monkeypatch, mode):
+    mode("llm")
+    _, events = stream(monkeypatch, upstream_chunks(['{"score": 82, "summary": "no other fields"}']))
+
+    assert [event for event, _ in events] == ["field", "delta", "field", "error"]
+    assert events[-1][1]["status"] == 500
+
+
+def test_fallback_mode_replaces_error_with_local_result(monkeypatch, mode):
+    mode("fallback")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    fallbacks = compatibility_service.fallbacks
+    content = json.dumps(RESULT)
+    _, events = stream(monkeypatch, upstream_chunks([content[:40]], error=RuntimeError("stream dropped")))
+
+    event, data = events[-1]
+    assert event == "result"
+    assert data != RESULT
+    assert 0 <= data["score"] <= 100
+    assert "error" not in [event for event, _ in events]
+    assert compatibility_service.fallbacks == fallbacks + 1
+
+
+def test_invalid_date_is_rejected_before_streaming(monkeypatch, mode):
+    mode("llm")
+    body = {**COMPATIBILITY_BODY, "person1": {**COMPATIBILITY_BODY["person1"], "birth_month": 2, "birth_day": 30}}
+    response, events = stream(monkeypatch, upstream_chunks([]), body=body)
+
+    assert response.status_code == 400
+    assert events == []
@@ -0,0 +1,136 @@
+"""
+Database pool instrumentation tests
+Checkouts beyond pool_size, overflow, waits and timeouts as reported by PoolStats, and idle pre-ping
+"""
+import asyncio
+from contextlib import AsyncExitStack
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import db_pool
+from app.core.database import engine_options, settings
+from app.core.db_pool import InstrumentedQueuePool, PoolStats, instrument_engine
+
+POOL_SIZE = 2
+MAX_OVERFLOW = 2
+TIMEOUT = 0.3
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """Fresh module-level PoolStats, so counts start at zero"""
+    stats = PoolStats()
+    monkeypatch.setattr(db_pool, "pool_stats", stats)
+    return stats
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    for name, value in {
+        "DB_POOL_SIZE": POOL_SIZE,
+        "DB_MAX_OVERFLOW": MAX_OVERFLOW,
+        "DB_POOL_TIMEOUT_SECONDS": TIMEOUT,
+        "DB_POOL_PRE_PING": "idle",
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def run(database_url, scenario, pre_ping_idle_seconds=None):
+    """Run scenario(engine) on an engine configured like the application's"""
+    async def main():
+        engine = create_async_engine(database_url, **engine_options(database_url))
+        instrument_engine(engine.sync_engine, pre_ping_idle_seconds)
+        try:
+            return await scenario(engine)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def pool_state(snapshot):
+    return {key: snapshot[key] for key in ("size", "checked_out", "checked_in", "overflow")}
+
+
+def test_file_database_uses_the_instrumented_pool(database_url, pool_settings, stats):
+    async def scenario(engine):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return stats.snapshot()
+
+    snapshot = run(database_url, scenario)
+    assert snapshot["pool_class"] == InstrumentedQueuePool.__name__
+    assert pool_state(snapshot) == {"size": POOL_SIZE, "checked_out": 0, "checked_in": 1, "overflow": -1}
+    assert (snapshot["connects"], snapshot["checkouts"], snapshot["checkins"]) == (1, 1, 1)
+    assert snapshot["wait_ms"]["count"] == snapshot["checkout_ms"]["count"] == 1
+
+
+def test_checkouts_beyond_pool_size_overflow_then_wait(database_url, pool_settings, stats):
+    async def scenario(engine):
+        snapshots = {}
+        async with AsyncExitStack() as stack:
+            held = [await stack.enter_async_context(engine.connect()) for _ in range(POOL_SIZE + MAX_OVERFLOW)]
+            for conn in held:
+                await conn.execute(text("SELECT 1"))
+            snapshots["full"] = stats.snapshot()
+
+            # Nothing free and no overflow left: the next checkout waits out pool_timeout
+            with pytest.raises(exc.TimeoutError):
+                await engine.connect().start()
+            snapshots["timed_out"] = stats.snapshot()
+
+            # A waiter gets the connection another request hands back
+            waiter = asyncio.create_task(engine.connect().start())
+            await asyncio.sleep(0.1)
+            await held[0].close()
+            conn = await waiter
+            snapshots["handed_over"] = stats.snapshot()
+            await conn.close()
+        snapshots["released"] = stats.snapshot()
+        return snapshots
+
+    snapshots = run(database_url, scenario)
+
+    full = snapshots["full"]
+    assert pool_state(full) == {"size": 2, "checked_out": 4, "checked_in": 0, "overflow": 2}
+    assert (full["connects"], full["checkouts"], full["checkins"], full["timeouts"]) == (4, 4, 0, 0)
+    assert full["wait_ms"]["count"] == 4
+
+    timed_out = snapshots["timed_out"]
+    assert timed_out["timeouts"] == 1
+    assert timed_out["checkouts"] == 4
+    assert timed_out["wait_ms"]["count"] == 5
+    assert timed_out["wait_ms"]["sum"] - full["wait_ms"]["sum"] >= TIMEOUT * 1000 * 0.9
+
+    handed_over = snapshots["handed_over"]
+    assert pool_state(handed_over) == {"size": 2, "checked_out": 4, "checked_in": 0, "overflow": 2}
+    assert (handed_over["connects"], handed_over["checkouts"], handed_over["checkins"]) == (4, 5, 1)
+    assert handed_over["wait_ms"]["count"] == 6
+    assert handed_over["wait_ms"]["sum"] - timed_out["wait_ms"]["sum"] >= 90
+    assert handed_over["checkout_ms"]["count"] == 6  # Timed-out attempts included
+
+    # Overflow connections are closed on return; pool_size connections stay open
+    released = snapshots["released"]
+    assert pool_state(released) == {"size": 2, "checked_out": 0, "checked_in": 2, "overflow": 0}
+    assert (released["checkouts"], released["checkins"], released["timeouts"]) == (5, 5, 1)
+
+
+@pytest.mark.parametrize("idle_seconds, pings", [(None, 0), (0.0, 2), (3600.0, 0)])
+def test_idle_pre_ping(database_url, pool_settings, stats, idle_seconds, pings):
+    async def scenario(engine):
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        return stats.snapshot()
+
+    snapshot = run(database_url, scenario, pre_ping_idle_seconds=idle_seconds)
+    # The first checkout is a fresh connection and is never pinged
+    assert (snapshot["pre_pings"], snapshot["pre_ping_failures"]) == (pings, 0)
+    assert (snapshot["connects"], snapshot["checkouts"]) == (1, 3)
+
+
+def test_in_memory_sqlite_keeps_the_default_pool():
+    options = engine_options("sqlite+aiosqlite:///:memory:")
+    assert "poolclass" not in options
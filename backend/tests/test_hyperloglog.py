@@ -0,0 +1,78 @@
+"""
+HyperLogLog tests
+Merged sketch estimates stay within three standard errors of exact distinct counts
+"""
+import random
+
+import pytest
+
+from app.core.hyperloglog import HyperLogLog
+
+
+def split_visits(exact: int, parts: int, precision: int, seed: int) -> list:
+    """Sketches of `exact` visitors, each visiting once or twice and landing on random sketches"""
+    rng = random.Random(seed)
+    sketches = [HyperLogLog(precision) for _ in range(parts)]
+    for _ in range(exact):
+        visitor = f"visitor-{rng.getrandbits(64)}"
+        for _ in range(rng.randint(1, 2)):
+            sketches[rng.randrange(parts)].add(visitor)
+    return sketches
+
+
+@pytest.mark.parametrize("precision", [10, 14])
+@pytest.mark.parametrize("exact", [100, 1_000, 10_000, 100_000])
+def test_merged_estimate_within_three_standard_errors(exact, precision):
+    merged = HyperLogLog(precision)
+    for sketch in split_visits(exact, parts=4, precision=precision, seed=exact):
+        merged.merge(HyperLogLog.from_bytes(sketch.to_bytes()))
+    assert abs(merged.estimate() - exact) / exact <= 3 * merged.standard_error
+
+
+def test_merge_equals_single_sketch():
+    values = [f"visitor-{n}" for n in range(5_000)]
+    whole = HyperLogLog()
+    whole.update(values)
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(values[:3_000])
+    right.update(values[2_000:])
+    left.merge(right)
+    assert left.registers == whole.registers
+
+
+def test_repeats_are_not_counted():
+    sketch = HyperLogLog()
+    for _ in range(50):
+        sketch.update(["a", "b", "c"])
+    assert sketch.estimate() == 3
+    assert HyperLogLog().estimate() == 0
+
+
+def test_serialization_round_trip():
+    sketch = HyperLogLog(12)
+    sketch.update(str(n) for n in range(1_000))
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.precision == 12
+    assert restored.registers == sketch.registers
+
+
+def test_invalid_precision_and_mismatched_merge():
+    with pytest.raises(ValueError):
+        HyperLogLog(HyperLogLog.MAX_PRECISION + 1)
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+@pytest.mark.parametrize("precision", [4, 10, 13])
+def test_folding_equals_a_sketch_built_at_the_lower_precision(precision):
+    values = [f"visitor-{n}" for n in range(20_000)]
+    fine, coarse = HyperLogLog(14), HyperLogLog(precision)
+    fine.update(values)
+    coarse.update(values)
+    assert fine.folded(precision).registers == coarse.registers
+    assert fine.folded(14) is fine
+
+
+def test_folding_up_is_rejected():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).folded(12)
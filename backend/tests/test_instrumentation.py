@@ -0,0 +1,149 @@
+"""
+Instrumentation tests
+Route template labels, the Prometheus exposition, multi-worker merging and the metrics token
+"""
+import asyncio
+import multiprocessing
+import re
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.instrumentation import UNMATCHED_ROUTE, Instrumentation, instrumentation
+from app.main import app
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="(\\.|[^"\\])*",?)*\})? -?[0-9.e+-]+$')
+
+
+def send(asgi_app, requests, headers=None):
+    """Send (method, path) pairs to an ASGI app; returns the status codes"""
+    async def main():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+            return [(await client.request(method, path)).status_code for method, path in requests]
+
+    return asyncio.run(main())
+
+
+def test_requests_are_labelled_by_route_template():
+    before = dict(instrumentation.requests)
+    statuses = send(app, [
+        ("GET", "/health"),
+        ("GET", "/health"),
+        ("POST", "/health"),
+        ("GET", "/api/v1/metrics/startup"),
+        ("GET", "/api/v1/metrics/no_such_subsystem"),
+        ("GET", "/no/such/path/1"),
+        ("GET", "/no/such/path/2"),
+    ])
+    assert statuses == [200, 200, 405, 200, 404, 404, 404]
+    recorded = {key: count - before.get(key, 0) for key, count in instrumentation.requests.items()}
+    assert {key: count for key, count in recorded.items() if count} == {
+        ("GET", "/health", 200): 2,
+        ("POST", "/health", 405): 1,
+        ("GET", "/api/v1/metrics/{subsystem}", 200): 1,
+        ("GET", "/api/v1/metrics/{subsystem}", 404): 1,
+        ("GET", UNMATCHED_ROUTE, 404): 2,
+    }
+    assert not any(instrumentation.in_flight.values())
+
+
+def test_operation_timers_count_errors():
+    local = Instrumentation()
+
+    @local.timed("fails")
+    async def fails():
+        raise RuntimeError
+
+    with local.timer("works"):
+        pass
+    with pytest.raises(RuntimeError):
+        asyncio.run(fails())
+
+    operations = local.collect().summary()["operations"]
+    assert operations["works"]["calls"] == 1 and operations["works"]["errors"] == 0
+    assert operations["fails"]["calls"] == 1 and operations["fails"]["errors"] == 1
+
+
+def test_exposition_format():
+    local = Instrumentation()
+    local.observe_request("GET", '/odd"route\\', 200, 3.0)
+    local.observe_request("GET", "/health", 500, 12000.0)
+    local.observe_operation("db.query", 0.2, failed=True)
+    text = local.collect().render()
+
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        assert line.startswith("# HELP ") or line.startswith("# TYPE ") or SAMPLE.match(line), line
+    assert 'http_requests_total{method="GET",route="/odd\\"route\\\\",status="200"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="10"} 0' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"} 1' in text
+    assert 'http_request_duration_seconds_sum{method="GET",route="/health"} 12.000000' in text
+    assert 'app_operation_errors_total{operation="db.query"} 1' in text
+    assert "app_metrics_processes 1" in text
+
+
+def worker(directory: str, requests: int) -> None:
+    """Forked worker: record requests, one of them still in flight, then write a snapshot"""
+    local = Instrumentation()
+    local.configure(directory)
+    for _ in range(requests):
+        local.observe_request("GET", "/health", 200, 1.0)
+    local.in_flight["GET", "/health"] += 1
+    local.write_snapshot()
+
+
+def test_snapshots_from_every_worker_are_summed(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=worker, args=(str(tmp_path), 100 * (n + 1))) for n in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    scraper = Instrumentation()
+    scraper.configure(str(tmp_path))
+    scraper.observe_request("GET", "/health", 200, 1.0)
+    scraper.in_flight["GET", "/health"] += 1
+    merged = scraper.collect()
+
+    assert merged.processes == 5
+    assert merged.requests["GET", "/health", 200] == 100 + 200 + 300 + 400 + 1
+    assert merged.latency_ms["GET", "/health"].count == 1001
+    # Exited workers keep their counters but not their in-flight gauges
+    assert merged.in_flight["GET", "/health"] == 1
+
+
+def test_live_worker_in_flight_is_included(tmp_path):
+    sleeper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        other = Instrumentation()
+        other.configure(str(tmp_path))
+        other.pid = sleeper.pid
+        other.in_flight["GET", "/health"] = 2
+        other.write_snapshot()
+
+        scraper = Instrumentation()
+        scraper.configure(str(tmp_path))
+        assert scraper.collect().in_flight["GET", "/health"] == 2
+    finally:
+        sleeper.kill()
+        sleeper.wait()
+
+
+@pytest.mark.parametrize("path", ["/metrics", "/api/v1/metrics", "/api/v1/metrics/startup"])
+def test_metrics_token(monkeypatch, path):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert send(app, [("GET", path)]) == [401]
+    assert send(app, [("GET", path)], headers={"Authorization": "Bearer wrong"}) == [401]
+    assert send(app, [("GET", path)], headers={"Authorization": "Basic s3cret"}) == [401]
+    assert send(app, [("GET", path)], headers={"Authorization": "Bearer s3cret"}) == [200]
+
+
+def test_metrics_are_open_without_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert send(app, [("GET", "/metrics"), ("GET", "/api/v1/metrics")]) == [200, 200]
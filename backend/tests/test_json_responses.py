@@ -0,0 +1,161 @@
+"""
+JSON response encoding tests
+model_response and ORJSONResponse bodies against the encoding FastAPI produced before them:
+the route's response_model serialization, jsonable_encoder and JSONResponse
+"""
+import asyncio
+import json
+import math
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import httpx
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.core.responses import model_response
+from app.main import app
+from app.routers import stats as stats_router
+from app.schemas.compatibility import CompatibilityResponse
+from app.schemas.stats import LifeStatsResponse
+from app.schemas.view_count import (
+    AllViewCountsResponse, TimeSeriesPoint, TimeSeriesResponse, UniqueVisitorsResponse, ViewCountResponse
+)
+from app.services.compatibility_service import settings
+from app.services.stats_service import stats_service
+from benchmarks.bench_compatibility_load import COMPATIBILITY_BODY
+
+KST = timezone(timedelta(hours=9), "KST")
+
+KOREAN = CompatibilityResponse(
+    score=82,
+    summary='두 분은 "물(水)"과 나무(木)처럼\n서로를 키워주는 궁합입니다 \U0001F600',
+    strengths=["배려심 깊음", "대화가 잘 통함\t(특히 저녁)", "경제관념 비슷 — 100% 일치"],
+    cautions=["고집 \\ 자존심", "감정 표현 차이", "줄 바꿈과 제어\x7f문자"],
+    elements_analysis="금(金)이 수(水)를 생(生)합니다.",
+    zodiac_compatibility="말띠와 양띠는 육합(六合)입니다.",
+    advice="서로의 속도를 존중하세요. é ñ ü",
+)
+
+
+def route(path: str, method: str) -> APIRoute:
+    return next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path and method in r.methods)
+
+
+def previous_body(path: str, method: str, content) -> bytes:
+    """What FastAPI sent for `content` returned from the route: response_model serialization, then JSONResponse"""
+    encoded = asyncio.run(serialize_response(field=route(path, method).response_field, response_content=content))
+    return JSONResponse(encoded).body
+
+
+MODEL_ROUTES = [
+    ("/api/v1/views/{event_type}", "GET", ViewCountResponse(
+        event_type="page_view", count=1234, updated_at=datetime(2024, 1, 12, 10, 30, 0, 123456)
+    )),
+    ("/api/v1/views/page-view", "POST", ViewCountResponse(
+        event_type="페이지_조회", count=0, updated_at=datetime(2024, 1, 12, 10, 30, tzinfo=timezone.utc)
+    )),
+    ("/api/v1/views/stats-calculated", "POST", ViewCountResponse(
+        event_type="stats_calculated", count=2**40, updated_at=datetime(1999, 12, 31, 23, 59, 59, 1, tzinfo=KST)
+    )),
+    ("/api/v1/views/all", "GET", AllViewCountsResponse(total_page_views=5678, total_stats_calculated=0)),
+    ("/api/v1/views/timeseries/{event_type}", "GET", TimeSeriesResponse(
+        event_type="page_view",
+        granularity="hour",
+        start=datetime(2024, 1, 12, tzinfo=timezone.utc),
+        end=datetime(2024, 1, 13),
+        total=42,
+        points=[
+            TimeSeriesPoint(bucket_start=datetime(2024, 1, 12, 9, tzinfo=timezone.utc), count=30),
+            TimeSeriesPoint(bucket_start=datetime(2024, 1, 12, 10, 0, 0, 500000), count=12),
+        ],
+    )),
+    ("/api/v1/views/uniques/{event_type}", "GET", UniqueVisitorsResponse(
+        event_type="page_view",
+        start=date(2024, 1, 1),
+        end=date(2024, 2, 29),
+        unique_visitors=1000,
+        standard_error=1.04 / math.sqrt(2 ** 14),
+        lower_bound=984,
+        upper_bound=1016,
+    )),
+    ("/api/v1/compatibility/analyze", "POST", KOREAN),
+    ("/api/v1/compatibility/analyze", "POST", CompatibilityResponse(**{
+        **KOREAN.model_dump(), "summary": "", "strengths": ["a", "b", "c"], "score": 0
+    })),
+]
+
+
+@pytest.mark.parametrize("path, method, model", MODEL_ROUTES, ids=[f"{m} {p}" for p, m, _ in MODEL_ROUTES])
+def test_model_response_matches_the_previous_encoding(path, method, model):
+    assert model_response(model).body == previous_body(path, method, model)
+
+
+def test_life_stats_body_matches_the_previous_encoding():
+    stats = LifeStatsResponse(
+        total_days=12345, total_hours=296280, total_minutes=17776800, total_seconds=1066608000,
+        heartbeats=1279964160, breaths=266656000, sleep_hours=98760, meals_eaten=37035,
+        days_until_next_birthday=0, days_until_next_milestone=7655, next_milestone=20000, age_years=33,
+    )
+    # The stats routes send model_dump_json() bytes (possibly cached) instead of returning the model
+    assert stats.model_dump_json().encode() == previous_body("/api/v1/stats/calculate", "POST", stats)
+
+
+@pytest.mark.parametrize("content", [
+    {"message": "Stats router is working", "status": "ok"},
+    {"이름": "김민지", "emoji": "\U0001F600", "escape": 'quote " backslash \\ newline \n'},
+    {"at": datetime(2024, 1, 12, 10, 30, 0, 123456), "utc": datetime(2024, 1, 12, tzinfo=timezone.utc),
+     "kst": datetime(2024, 1, 12, 9, tzinfo=KST), "day": date(2024, 2, 29)},
+    {"price": Decimal("1.50"), "whole": Decimal("3"), "tiny": Decimal("0.0001"), "big": Decimal("12345678901234567")},
+    {"nested": [{"n": 1, "x": 0.1, "y": 2.5, "z": None, "t": True}], "empty": {}, "list": []},
+], ids=["plain", "korean", "datetimes", "decimals", "nested"])
+def test_default_response_class_matches_json_response(content):
+    """Routes returning dicts: FastAPI encodes with jsonable_encoder, then renders with the default class"""
+    encoded = jsonable_encoder(content)
+    assert ORJSONResponse(encoded).body == JSONResponse(encoded).body
+
+
+def call(method: str, path: str, **kwargs) -> httpx.Response:
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            return await api.request(method, path, **kwargs)
+
+    return asyncio.run(main())
+
+
+def test_bulk_stats_match_the_previous_encoding():
+    body = {"year": [1990, 2000, 1984], "month": [5, 2, 12], "day": [17, 29, 31]}
+    response = call("POST", "/api/v1/stats/calculate/bulk", json=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    # Previously the NumPy columns were converted with tolist() and sent through JSONResponse
+    columns = stats_service.calculate_bulk_life_stats(body["year"], body["month"], body["day"])
+    previous = JSONResponse({"count": 3, **{field: column.tolist() for field, column in columns.items()}})
+    assert response.content == previous.body
+
+
+def test_compatibility_route_matches_the_previous_encoding(monkeypatch):
+    monkeypatch.setattr(settings, "COMPATIBILITY_MODE", "local")
+    response = call("POST", "/api/v1/compatibility/analyze", json={**COMPATIBILITY_BODY, "language": "ko"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    result = CompatibilityResponse.model_validate_json(response.content)
+    assert any(ord(char) > 0x7F for char in result.summary)  # Korean text, sent as UTF-8
+    assert response.content == previous_body("/api/v1/compatibility/analyze", "POST", result)
+    assert json.loads(response.content) == result.model_dump()
+
+
+def test_stats_route_matches_the_previous_encoding(monkeypatch):
+    async def record(db):
+        pass
+
+    monkeypatch.setattr(stats_router, "_record_stats_calculated", record)
+    response = call("GET", "/api/v1/stats/calculate", params={"year": 1990, "month": 5, "day": 17})
+
+    assert response.status_code == 200
+    result = LifeStatsResponse.model_validate_json(response.content)
+    assert response.content == previous_body("/api/v1/stats/calculate", "GET", result)
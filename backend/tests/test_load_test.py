@@ -0,0 +1,86 @@
+"""
+Load test report tests
+Summaries, the median over runs and the regression check against the stored baseline
+"""
+import copy
+import json
+
+import pytest
+
+from benchmarks.load_test import DEFAULT_BASELINE, DEFAULT_MIX, compare, median_of, parse_mix, summarize
+
+
+def scenario(rps: float, p50: float, p99: float, requests: int = 1000, errors: int = 0) -> dict:
+    return {"requests": requests, "errors": errors, "error_rate": round(errors / requests, 4),
+            "rps": rps, "p50_ms": p50, "p99_ms": p99}
+
+
+def result(**scenarios) -> dict:
+    total = scenario(sum(row["rps"] for row in scenarios.values()), 10, 100)
+    return {"scenarios": scenarios, "total": total}
+
+
+BASELINE = result(stats_get=scenario(100, 10, 100), compatibility=scenario(10, 50, 500))
+
+
+def test_identical_result_has_no_regressions():
+    assert compare(copy.deepcopy(BASELINE), BASELINE, threshold=0.25, p99_threshold=0.5) == []
+
+
+def test_changes_within_thresholds_pass():
+    now = result(stats_get=scenario(80, 12.4, 149), compatibility=scenario(9, 62, 740))
+    now["total"]["rps"] = BASELINE["total"]["rps"] * 0.76
+    assert compare(now, BASELINE, threshold=0.25, p99_threshold=0.5) == []
+
+
+@pytest.mark.parametrize("change,message", [
+    ({"total_rps": 80}, "total throughput 80 req/s < baseline 110 req/s"),
+    ({"stats_get": scenario(100, 12.6, 100)}, "stats_get p50_ms 12.6 > baseline 10.0"),
+    ({"compatibility": scenario(10, 50, 751)}, "compatibility p99_ms 751.0 > baseline 500.0"),
+    ({"stats_get": scenario(100, 10, 100, errors=1)}, "stats_get error rate 0.10% > baseline 0.00%"),
+])
+def test_regressions_are_reported(change, message):
+    now = copy.deepcopy(BASELINE)
+    if "total_rps" in change:
+        now["total"]["rps"] = change["total_rps"]
+    else:
+        now["scenarios"].update(change)
+    assert compare(now, BASELINE, threshold=0.25, p99_threshold=0.5) == [message]
+
+
+def test_scenarios_missing_from_either_side_are_skipped():
+    now = copy.deepcopy(BASELINE)
+    now["scenarios"]["views_read"] = scenario(50, 5, 50)
+    now["scenarios"]["compatibility"] = {"requests": 0, "errors": 0, "rps": 0.0}
+    assert compare(now, BASELINE, threshold=0.25, p99_threshold=0.5) == []
+
+
+def test_summarize():
+    summary = summarize([float(n) for n in range(1, 101)], errors=5, elapsed=2.0)
+    assert summary["requests"] == 100
+    assert summary["rps"] == 50.0
+    assert summary["error_rate"] == 0.05
+    assert summary["max_ms"] == 100.0
+    assert summary["p50_ms"] <= summary["p90_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+    assert summarize([], errors=3, elapsed=2.0) == {"requests": 0, "errors": 3, "rps": 0.0}
+
+
+def test_median_of_runs_sums_counts():
+    runs = [
+        result(stats_get={**scenario(rps, p50, 100, requests=1000, errors=errors), "statuses": {"200": 1000}})
+        for rps, p50, errors in ((90, 12, 0), (100, 10, 2), (120, 11, 0))
+    ]
+    combined = median_of(runs)["scenarios"]["stats_get"]
+    assert combined["rps"] == 100
+    assert combined["p50_ms"] == 11
+    assert combined["requests"] == 3000
+    assert combined["errors"] == 2
+    assert combined["error_rate"] == round(2 / 3000, 4)
+    assert "statuses" not in combined
+
+
+def test_default_mix_and_stored_baseline_agree():
+    with open(DEFAULT_BASELINE) as f:
+        baseline = json.load(f)
+    assert set(parse_mix(DEFAULT_MIX)) == set(baseline["scenarios"])
+    assert compare(baseline, baseline, threshold=0.25, p99_threshold=0.5) == []
@@ -0,0 +1,86 @@
+"""
+Microbenchmark suite tests
+The regression check, what measure() reports, and that every case still runs
+"""
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.microbench import ASYNC_CASES, DEFAULT_BASELINE, compare, measure, sync_cases
+
+BASELINE = {
+    "fast": {"ns_per_op": 1000.0, "alloc_bytes_per_op": 1000, "retained_bytes_per_op": 0.0},
+    "tiny": {"ns_per_op": 100.0, "alloc_bytes_per_op": 0, "retained_bytes_per_op": 0.0},
+}
+
+
+def results(**changes) -> dict:
+    current = json.loads(json.dumps(BASELINE))
+    for name, values in changes.items():
+        current[name].update(values)
+    return current
+
+
+def test_unchanged_results_pass():
+    assert compare(results(), BASELINE, threshold=0.5) == []
+
+
+def test_growth_within_threshold_passes():
+    assert compare(results(fast={"ns_per_op": 1500.0, "alloc_bytes_per_op": 1756}), BASELINE, threshold=0.5) == []
+
+
+@pytest.mark.parametrize("changes,message", [
+    ({"fast": {"ns_per_op": 1501.0}}, "fast: 1,501 ns/op vs 1,000"),
+    ({"fast": {"alloc_bytes_per_op": 1757}}, "fast: 1,757 B/op vs 1,000"),
+    ({"tiny": {"alloc_bytes_per_op": 257}}, "tiny: 257 B/op vs 0"),
+])
+def test_regressions_are_reported(changes, message):
+    assert compare(results(**changes), BASELINE, threshold=0.5) == [message]
+
+
+def test_small_absolute_allocation_growth_is_ignored():
+    assert compare(results(tiny={"alloc_bytes_per_op": 256}), BASELINE, threshold=0.5) == []
+
+
+def test_cases_missing_from_the_baseline_are_skipped():
+    current = results()
+    current["new_case"] = {"ns_per_op": 10 ** 9, "alloc_bytes_per_op": 10 ** 9, "retained_bytes_per_op": 0.0}
+    assert compare(current, BASELINE, threshold=0.5) == []
+
+
+def test_measure_reports_allocations_and_retention():
+    leaked = []
+
+    def allocate(n: int) -> None:
+        for _ in range(n):
+            bytearray(100_000)
+
+    def leak(n: int) -> None:
+        for _ in range(n):
+            leaked.append(bytearray(1_000))
+
+    allocating = measure(allocate, min_time=0.01, repeat=2)
+    leaking = measure(leak, min_time=0.01, repeat=2)
+    assert allocating["alloc_bytes_per_op"] >= 100_000
+    assert allocating["retained_bytes_per_op"] < 100
+    assert leaking["retained_bytes_per_op"] >= 1_000
+    assert allocating["ns_per_op"] > 0 and allocating["ops"] >= 1
+
+
+def test_every_case_runs_and_is_in_the_baseline():
+    for operation in sync_cases().values():
+        operation()
+
+    async def run_async_cases():
+        for factory in ASYNC_CASES.values():
+            operation, close = await factory()
+            try:
+                await operation()
+            finally:
+                await close()
+
+    asyncio.run(run_async_cases())
+    with open(DEFAULT_BASELINE) as f:
+        baseline = json.load(f)["results"]
+    assert set(sync_cases()) | set(ASYNC_CASES) == set(baseline)
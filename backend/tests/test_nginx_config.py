@@ -0,0 +1,114 @@
+"""
+nginx config tests
+There is no nginx here, so location selection is emulated to check where the frontend's requests actually land
+"""
+import re
+from pathlib import Path
+
+import pytest
+from starlette.routing import Match
+
+from app.main import app
+
+NGINX_DIR = Path(__file__).resolve().parents[2] / "nginx"
+CONFIGS = ["nginx.conf", "nginx-unified.conf"]
+
+# The frontend calls ${NEXT_PUBLIC_API_URL}/api/v1/..., and NEXT_PUBLIC_API_URL is the site root behind nginx
+FRONTEND_STATS = "/api/api/v1/stats/calculate"
+METRICS_PATHS = [
+    "/metrics",
+    "/api/metrics",
+    "/api/v1/metrics",
+    "/api/v1/metrics/",
+    "/api/v1/metrics/compatibility",
+    "/api/api/v1/metrics",
+    "/api/api/v1/metrics/stats",
+]
+
+LOCATION = re.compile(r"location\s+(=|~|\^~)?\s*(\S+)\s*\{(.*?)\}", re.S)
+
+
+def server_blocks(text):
+    """Bodies of every server { ... } block"""
+    blocks = []
+    for start in re.finditer(r"\bserver\s*\{", text):
+        depth, i = 0, start.end() - 1
+        while True:
+            depth += {"{": 1, "}": -1}.get(text[i], 0)
+            if depth == 0:
+                break
+            i += 1
+        blocks.append(text[start.end():i])
+    return blocks
+
+
+def locations(server):
+    return [(modifier or "", path, body) for modifier, path, body in LOCATION.findall(server)]
+
+
+def select(server, uri):
+    """nginx location choice: exact match, then regexes in order unless the longest prefix is ^~, then that prefix"""
+    locs = locations(server)
+    for modifier, path, body in locs:
+        if modifier == "=" and path == uri:
+            return modifier, path, body
+    prefixes = [loc for loc in locs if loc[0] in ("", "^~") and uri.startswith(loc[1])]
+    longest = max(prefixes, key=lambda loc: len(loc[1]), default=None)
+    if longest is None or longest[0] != "^~":
+        for modifier, path, body in locs:
+            if modifier == "~" and re.search(path, uri):
+                return modifier, path, body
+    return longest
+
+
+def upstream_path(location, uri):
+    """Path proxy_pass sends upstream: a URI part replaces the matched location, otherwise the request URI passes as is"""
+    modifier, path, body = location
+    target = re.search(r"proxy_pass\s+https?://[^/;\s]+(/[^;\s]*)?;", body)
+    assert target, f"location {path} does not proxy"
+    part = target.group(1)
+    if part is None:
+        return uri
+    if modifier == "=":
+        return part
+    return part + uri[len(path):]
+
+
+def backend_serves(path, method="GET"):
+    scope = {"type": "http", "path": path, "method": method, "root_path": ""}
+    return any(route.matches(scope)[0] == Match.FULL for route in app.routes)
+
+
+def yourlife_servers(name):
+    """Server blocks that front this backend (the ones carrying the stats cache)"""
+    text = (NGINX_DIR / name).read_text(encoding="utf-8")
+    servers = [server for server in server_blocks(text) if "proxy_cache stats_cache" in server]
+    assert servers, f"{name} has no server using the stats cache"
+    return servers
+
+
+@pytest.mark.parametrize("name", CONFIGS)
+def test_frontend_stats_request_hits_the_cache(name):
+    for server in yourlife_servers(name):
+        location = select(server, FRONTEND_STATS)
+        assert "proxy_cache stats_cache" in location[2]
+        path = upstream_path(location, FRONTEND_STATS)
+        assert path == "/api/v1/stats/calculate"
+        assert backend_serves(path)
+
+
+@pytest.mark.parametrize("name", CONFIGS)
+def test_other_api_requests_strip_the_prefix(name):
+    for server in yourlife_servers(name):
+        location = select(server, "/api/api/v1/views/page_view")
+        assert location[1] == "/api/"
+        assert upstream_path(location, "/api/api/v1/views/page_view") == "/api/v1/views/page_view"
+
+
+@pytest.mark.parametrize("name", CONFIGS)
+@pytest.mark.parametrize("uri", METRICS_PATHS)
+def test_metrics_are_denied(name, uri):
+    for server in yourlife_servers(name):
+        location = select(server, uri)
+        assert location is not None
+        assert "deny all" in location[2], f"{uri} reaches {location[1]}"
@@ -0,0 +1,126 @@
+"""
+Saju engine tests
+Relation tables against the traditional pairings, year/hour mapping and scoring
+"""
+from itertools import combinations
+
+import pytest
+
+from app.schemas.compatibility import CompatibilityRequest, PersonInfo
+from app.services.saju_engine import (
+    BASE_SCORE,
+    BRANCH_RELATIONS,
+    ELEMENT_RELATIONS,
+    ELEMENTS,
+    ZODIACS,
+    branch_of_hour,
+    branch_of_year,
+    element_index,
+    saju_engine,
+    zodiac_index,
+)
+
+# 지지: 0=자 1=축 2=인 3=묘 4=진 5=사 6=오 7=미 8=신 9=유 10=술 11=해
+SIX_HARMONY = [(0, 1), (2, 11), (3, 10), (4, 9), (5, 8), (6, 7)]
+TRINES = [(8, 0, 4), (5, 9, 1), (2, 6, 10), (11, 3, 7)]
+CLASH = [(0, 6), (1, 7), (2, 8), (3, 9), (4, 10), (5, 11)]
+HARM = [(0, 7), (1, 6), (2, 5), (3, 4), (8, 11), (9, 10)]
+
+# 오행: 0=목 1=화 2=토 3=금 4=수
+GENERATING = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0)]  # 목생화, 화생토, 토생금, 금생수, 수생목
+OVERCOMING = [(0, 2), (2, 4), (4, 1), (1, 3), (3, 0)]  # 목극토, 토극수, 수극화, 화극금, 금극목
+
+
+def expected_branch_table():
+    table = {(a, b): "neutral" for a in range(12) for b in range(12)}
+    pairs = {
+        "six_harmony": SIX_HARMONY,
+        "trine": [pair for trine in TRINES for pair in combinations(trine, 2)],
+        "clash": CLASH,
+        "harm": HARM,
+    }
+    for relation, relation_pairs in pairs.items():
+        for a, b in relation_pairs:
+            table[a, b] = table[b, a] = relation
+    for a in range(12):
+        table[a, a] = "same"
+    return table
+
+
+@pytest.mark.parametrize("a,b,relation", [(a, b, r) for (a, b), r in sorted(expected_branch_table().items())])
+def test_branch_relations(a, b, relation):
+    assert BRANCH_RELATIONS[a][b] == relation
+
+
+@pytest.mark.parametrize("relation,pairs", [("generating", GENERATING), ("overcoming", OVERCOMING)])
+def test_element_cycles(relation, pairs):
+    for a, b in pairs:
+        assert ELEMENT_RELATIONS[a][b] == relation
+        assert ELEMENT_RELATIONS[b][a] == relation
+
+
+def test_element_relations_cover_every_pair():
+    cycle_pairs = {pair for pairs in (GENERATING, OVERCOMING) for a, b in pairs for pair in ((a, b), (b, a))}
+    for a in range(5):
+        assert ELEMENT_RELATIONS[a][a] == "same"
+        for b in range(5):
+            assert a == b or (a, b) in cycle_pairs
+
+
+@pytest.mark.parametrize("year,zodiac,element", [
+    (1984, "쥐", "Wood"),    # 갑자
+    (1985, "소", "Wood"),    # 을축
+    (1990, "말", "Metal"),   # 경오
+    (1992, "원숭이", "Water"),  # 임신
+    (2000, "용", "Metal"),   # 경진
+    (2008, "쥐", "Earth"),   # 무자
+    (2024, "용", "Wood"),    # 갑진
+])
+def test_year_mapping(year, zodiac, element):
+    assert ZODIACS[zodiac_index(year)]["ko"] == zodiac
+    assert ELEMENTS[element_index(year)]["en"] == element
+    assert ZODIACS[zodiac_index(year)]["ko"] == ZODIACS[zodiac_index(1984 + branch_of_year(year))]["ko"]
+
+
+@pytest.mark.parametrize("hour,branch", [
+    (23, 0), (0, 0), (1, 1), (2, 1), (3, 2), (5, 3), (11, 6), (12, 6), (13, 7), (21, 11), (22, 11)
+])
+def test_hour_branches(hour, branch):
+    assert branch_of_hour(hour) == branch
+
+
+def person(year: int, hour=None) -> PersonInfo:
+    return PersonInfo(birth_year=year, birth_month=1, birth_day=15, birth_hour=hour)
+
+
+@pytest.mark.parametrize("year1,year2,hours,relations,score", [
+    (1984, 1985, None, ("six_harmony", "same", None), BASE_SCORE + 15 + 5),
+    (1984, 1992, None, ("trine", "generating", None), BASE_SCORE + 12 + 10),
+    (1984, 1990, None, ("clash", "overcoming", None), BASE_SCORE - 15 - 10),
+    (1984, 1991, None, ("harm", "overcoming", None), BASE_SCORE - 8 - 10),
+    (1984, 1986, None, ("neutral", "generating", None), BASE_SCORE + 10),
+    (1984, 1985, (0, 2), ("six_harmony", "same", "six_harmony"), BASE_SCORE + 15 + 5 + 5),
+    (1984, 1990, (0, 12), ("clash", "overcoming", "clash"), BASE_SCORE - 15 - 10 - 5),
+    (1984, 1996, (9, 9), ("same", "generating", "same"), BASE_SCORE + 5 + 10 + 2),
+])
+def test_relations_and_score(year1, year2, hours, relations, score):
+    hour1, hour2 = hours or (None, None)
+    found = saju_engine.relations(person(year1, hour1), person(year2, hour2))
+    assert (found["zodiac"], found["element"], found["hour"]) == relations
+    assert saju_engine.score(found) == score
+
+
+def test_hour_ignored_unless_both_known():
+    assert saju_engine.relations(person(1984, 0), person(1985))["hour"] is None
+
+
+@pytest.mark.parametrize("language", ["ko", "en"])
+def test_analysis_is_deterministic_and_order_independent(language):
+    for year1, year2 in [(1984, 1985), (1990, 1984), (1977, 2003)]:
+        forward = CompatibilityRequest(person1=person(year1, 3), person2=person(year2, 17), language=language)
+        backward = CompatibilityRequest(person1=person(year2, 17), person2=person(year1, 3), language=language)
+        first = saju_engine.analyze(forward)
+        assert saju_engine.analyze(forward) == first
+        assert saju_engine.analyze(backward).score == first.score
+        assert len(first.strengths) == len(first.cautions) == 3
+        assert 0 <= first.score <= 100
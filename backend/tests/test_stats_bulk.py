@@ -0,0 +1,95 @@
+"""
+Bulk life stats tests
+calculate_bulk_life_stats must agree row by row with calculate_life_stats and reject what it cannot compute
+"""
+import math
+from datetime import date, timedelta
+
+import pytest
+
+from app.core import calendar_index as calendar_index_module
+from app.core.calendar_index import CalendarIndex
+from app.schemas.stats import BirthdateRequest
+from app.services.stats_service import stats_service
+
+# Around leap days and year ends, plus the real today
+REFERENCE_DAYS = [
+    date(2023, 2, 28), date(2023, 3, 1), date(2024, 2, 28), date(2024, 2, 29),
+    date(2024, 3, 1), date(2024, 12, 31), date.today(),
+]
+
+
+@pytest.fixture(params=REFERENCE_DAYS, ids=str)
+def today(request):
+    """Pin the calendar index to a reference day"""
+    index = CalendarIndex(request.param)
+    index.expires_at = math.inf
+    calendar_index_module._index = index
+    yield request.param
+    calendar_index_module._index = None
+
+
+def birthdates(today: date) -> list:
+    """Every day of the last four years, every Feb 28/29 and Mar 1 since 1900, and the first days of 1900"""
+    dates = {today - timedelta(days=n) for n in range(4 * 366)}
+    dates.update(date(1900, 1, 1) + timedelta(days=n) for n in range(60))
+    for year in range(1900, today.year + 1):
+        dates.update({date(year, 2, 28), date(year, 3, 1)})
+        if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+            dates.add(date(year, 2, 29))
+    return sorted(d for d in dates if d <= today)
+
+
+def test_bulk_matches_scalar_row_by_row(today):
+    dates = birthdates(today)
+    columns = stats_service.calculate_bulk_life_stats(
+        [d.year for d in dates], [d.month for d in dates], [d.day for d in dates]
+    )
+    for row, d in enumerate(dates):
+        expected = stats_service.calculate_life_stats(BirthdateRequest(year=d.year, month=d.month, day=d.day))
+        assert {field: int(values[row]) for field, values in columns.items()} == expected.model_dump(), d
+
+
+def test_born_today(today):
+    columns = stats_service.calculate_bulk_life_stats([today.year], [today.month], [today.day])
+    assert columns["total_days"][0] == 0
+    assert columns["age_years"][0] == 0
+    assert columns["days_until_next_milestone"][0] == 10000
+
+
+def test_feb_29_birthday_observed_on_feb_28_in_common_years(today):
+    columns = stats_service.calculate_bulk_life_stats([2000], [2], [29])
+    scalar = stats_service.calculate_life_stats(BirthdateRequest(year=2000, month=2, day=29))
+    assert columns["days_until_next_birthday"][0] == scalar.days_until_next_birthday
+    if today == date(2023, 2, 28):
+        assert scalar.days_until_next_birthday == 0
+        assert scalar.age_years == 23
+
+
+@pytest.mark.parametrize("year,month,day,reason", [
+    (2019, 2, 29, "Invalid date"),
+    (2020, 4, 31, "Invalid date"),
+    (2020, 13, 1, "Invalid date"),
+    (2020, 0, 1, "Invalid date"),
+    (2020, 1, 0, "Invalid date"),
+    (2020, 1, 32, "Invalid date"),
+    (1899, 12, 31, "Invalid date"),
+    (10 ** 20, 1, 1, "out of range"),
+])
+def test_invalid_rows_are_rejected(today, year, month, day, reason):
+    with pytest.raises(ValueError, match=reason) as error:
+        stats_service.calculate_bulk_life_stats([2000, year], [1, month], [1, day])
+    if reason != "out of range":
+        assert "rows 1" in str(error.value)
+
+
+def test_future_rows_are_rejected(today):
+    tomorrow = today + timedelta(days=1)
+    for year, month, day in [(tomorrow.year, tomorrow.month, tomorrow.day), (today.year + 1, 1, 1)]:
+        with pytest.raises(ValueError, match="Birthdate in the future at rows 2"):
+            stats_service.calculate_bulk_life_stats([2000, 2001, year], [1, 1, month], [1, 1, day])
+
+
+def test_rejection_lists_the_first_ten_rows(today):
+    with pytest.raises(ValueError, match=r"Invalid date at rows 0, 1, 2, 3, 4, 5, 6, 7, 8, 9 and 2 more"):
+        stats_service.calculate_bulk_life_stats([1899] * 12, [1] * 12, [1] * 12)
@@ -0,0 +1,67 @@
+"""
+Stats router tests
+ETag revalidation and which responses count as a calculation
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.routers import stats as stats_router
+
+CALCULATE = "/api/v1/stats/calculate"
+BIRTHDATE = {"year": 1990, "month": 5, "day": 17}
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Counts stats-calculated increments instead of writing them"""
+    calls = []
+
+    async def record(db):
+        calls.append(db)
+
+    monkeypatch.setattr(stats_router, "_record_stats_calculated", record)
+    return calls
+
+
+def run(scenario):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def test_not_modified_is_not_counted(recorded):
+    async def scenario(client):
+        first = await client.get(CALCULATE, params=BIRTHDATE)
+        second = await client.get(CALCULATE, params=BIRTHDATE, headers={"If-None-Match": first.headers["ETag"]})
+        return first, second
+
+    first, second = run(scenario)
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(recorded) == 1
+
+
+def test_each_full_response_is_counted(recorded):
+    async def scenario(client):
+        return [
+            (await client.get(CALCULATE, params=BIRTHDATE)).status_code,
+            (await client.get(CALCULATE, params=BIRTHDATE, headers={"If-None-Match": '"stale"'})).status_code,
+            (await client.post(CALCULATE, json=BIRTHDATE)).status_code,
+        ]
+
+    assert run(scenario) == [200, 200, 200]
+    assert len(recorded) == 3
+
+
+def test_invalid_date_is_not_counted(recorded):
+    async def scenario(client):
+        return (await client.get(CALCULATE, params={"year": 2023, "month": 2, "day": 29})).status_code
+
+    assert run(scenario) == 400
+    assert recorded == []
@@ -0,0 +1,104 @@
+"""
+Streaming JSON parser tests
+Every chunking of the text yields the same fields, and string deltas add up to the decoded values
+"""
+import json
+
+import pytest
+
+from app.core.streaming_json import JsonObjectStreamParser
+
+ESCAPES = json.dumps({
+    "summary": 'quote " backslash \\ slash / newline \n tab \t',
+    "advice": "한글 궁합 é emoji \U0001F600 pair \U0001D11E",
+}, ensure_ascii=True)
+
+NESTED = json.dumps({
+    "strengths": ["a]b", "c}d", "e\"f", ["g", {"h": "[{"}]],
+    "score": {"total": 82, "parts": [1, 2.5, -3e2]},
+    "summary": "done",
+})
+
+LITERALS = '{"yes": true, "no":false ,"none" : null,"n": -12.5e3, "last": true}'
+
+
+def feed_all(chunks):
+    """Feed chunks in order; return the parser and every event"""
+    parser = JsonObjectStreamParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return parser, events
+
+
+def deltas(events):
+    """Concatenated delta text per field"""
+    joined = {}
+    for kind, key, value in events:
+        if kind == "delta":
+            joined[key] = joined.get(key, "") + value
+    return joined
+
+
+def assert_parsed(text, chunks):
+    parser, events = feed_all(chunks)
+    expected = json.loads(text)
+    assert parser.done
+    assert parser.fields == expected
+    assert [(key, value) for kind, key, value in events if kind == "field"] == list(expected.items())
+    assert deltas(events) == {key: value for key, value in expected.items() if isinstance(value, str)}
+    for kind, _, value in events:
+        if kind == "delta":
+            value.encode("utf-8")  # A split surrogate pair would leave a lone surrogate here
+
+
+@pytest.mark.parametrize("text", [ESCAPES, NESTED, LITERALS], ids=["escapes", "nested", "literals"])
+def test_every_two_way_split(text):
+    for i in range(len(text) + 1):
+        assert_parsed(text, [text[:i], text[i:]])
+
+
+@pytest.mark.parametrize("text", [ESCAPES, NESTED, LITERALS], ids=["escapes", "nested", "literals"])
+def test_one_character_at_a_time(text):
+    assert_parsed(text, list(text))
+
+
+def test_surrogate_pair_is_held_until_complete():
+    parser = JsonObjectStreamParser()
+    assert parser.feed('{"a": "x\\ud83d') == [("delta", "a", "x")]
+    assert parser.feed("\\ude0") == []
+    assert parser.feed('0y"}') == [("delta", "a", "\U0001F600y"), ("field", "a", "x\U0001F600y")]
+    assert parser.done
+
+
+def test_escape_split_after_backslash():
+    parser = JsonObjectStreamParser()
+    assert parser.feed('{"a": "1\\') == [("delta", "a", "1")]
+    assert parser.feed('"2"}') == [("delta", "a", '"2'), ("field", "a", '1"2')]
+
+
+def test_string_deltas_come_before_the_field():
+    _, events = feed_all(['{"a": "he', 'llo", "b": [1, ', '2]}'])
+    assert events == [
+        ("delta", "a", "he"),
+        ("delta", "a", "llo"),
+        ("field", "a", "hello"),
+        ("field", "b", [1, 2]),
+    ]
+
+
+def test_empty_object_and_surrounding_whitespace():
+    assert_parsed(' \n{ } \n', [' \n{', ' } \n'])
+
+
+@pytest.mark.parametrize("text", [
+    '["not", "an", "object"]',
+    '{"a" 1}',
+    '{"a": 1 2}',
+    '{"a": tru}',
+    '{"a": 1} trailing',
+    '{1: 2}',
+])
+def test_malformed_text_raises(text):
+    with pytest.raises(ValueError):
+        feed_all(list(text))
@@ -0,0 +1,74 @@
+"""
+Unique visitor tests
+Sketches stored under a different UNIQUE_VISITORS_PRECISION still merge and read
+"""
+import asyncio
+from datetime import date
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.hyperloglog import HyperLogLog
+from app.repositories.unique_visitor_repository import UniqueVisitorRepository
+from app.services.unique_visitor_service import UniqueVisitorCounter, UniqueVisitorService
+
+DAY = date(2024, 3, 1)
+
+
+def sketch_of(precision, start, stop):
+    sketch = HyperLogLog(precision)
+    sketch.update(f"visitor-{n}" for n in range(start, stop))
+    return sketch
+
+
+def run(database_url, scenario):
+    async def main():
+        engine = create_async_engine(database_url)
+        try:
+            return await scenario(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_reads_fold_sketches_from_an_earlier_precision(database_url):
+    async def scenario(sessions):
+        async with sessions() as db:
+            repository = UniqueVisitorRepository(db)
+            # Stored while the precision was 14, read after it was lowered to 12
+            await repository.merge("page_view", DAY, sketch_of(14, 0, 3_000))
+            await repository.merge("page_view", date(2024, 3, 2), sketch_of(12, 2_000, 5_000))
+            counter = UniqueVisitorCounter(12)
+            return await UniqueVisitorService(db, counter).get_unique_visitors("page_view", DAY, date(2024, 3, 2))
+
+    response = run(database_url, scenario)
+    expected = sketch_of(12, 0, 5_000)
+    assert response.unique_visitors == expected.estimate()
+    assert response.standard_error == round(expected.standard_error, 4)
+    assert response.lower_bound <= 5_000 <= response.upper_bound
+
+
+def test_reads_fold_a_higher_counter_precision(database_url):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await UniqueVisitorRepository(db).merge("page_view", DAY, sketch_of(10, 0, 1_000))
+            counter = UniqueVisitorCounter(14)
+            return await UniqueVisitorService(db, counter).get_unique_visitors("page_view", DAY, DAY)
+
+    response = run(database_url, scenario)
+    assert response.unique_visitors == sketch_of(10, 0, 1_000).estimate()
+
+
+def test_merging_into_a_row_of_another_precision(database_url):
+    async def scenario(sessions):
+        async with sessions() as db:
+            repository = UniqueVisitorRepository(db)
+            await repository.merge("page_view", DAY, sketch_of(14, 0, 2_000))
+            await repository.merge("page_view", DAY, sketch_of(11, 1_000, 4_000))
+            rows = await repository.get_range("page_view", DAY, DAY)
+            return [HyperLogLog.from_bytes(row.sketch) for row in rows]
+
+    stored = run(database_url, scenario)
+    assert len(stored) == 1
+    assert stored[0].precision == 11
+    assert stored[0].registers == sketch_of(11, 0, 4_000).registers
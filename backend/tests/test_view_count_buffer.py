@@ -0,0 +1,137 @@
+"""
+View count buffer tests
+Every buffered increment is written exactly once, including across shutdown
+"""
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.view_count import ViewCount
+from app.repositories.view_count_repository import ViewCountRepository
+from app.services.view_count_buffer import ViewCountBuffer
+
+
+def slow_commit_sessions(engine, delay: float, commits: list):
+    """Session factory whose commits return `delay` seconds after committing, and are counted"""
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    def factory():
+        session = sessionmaker()
+        commit = session.commit
+
+        async def slow_commit():
+            await commit()
+            commits.append(asyncio.current_task())
+            await asyncio.sleep(delay)
+
+        session.commit = slow_commit
+        return session
+
+    return factory
+
+
+async def persisted(engine, event_type: str) -> int:
+    async with async_sessionmaker(engine)() as db:
+        return (await db.execute(
+            select(func.coalesce(func.sum(ViewCount.count), 0)).where(ViewCount.event_type == event_type)
+        )).scalar()
+
+
+def test_stop_during_flush_writes_each_increment_once(database_url):
+    async def scenario():
+        engine = create_async_engine(database_url)
+        commits = []
+        sessions = slow_commit_sessions(engine, 0.2, commits)
+        buffer = ViewCountBuffer(sessions, flush_interval=60, max_pending=5)
+        buffer.start()
+        async with sessions() as db:
+            repository = ViewCountRepository(db)
+            for _ in range(5):
+                await buffer.add("page_view", repository)  # The fifth wakes the flush task
+            while not commits:
+                await asyncio.sleep(0.01)
+            # The batch is committed but not yet recorded as flushed; these go to the final flush
+            await buffer.add("page_view", repository, amount=2)
+        await buffer.stop()
+        total = await persisted(engine, "page_view")
+        await engine.dispose()
+        return total
+
+    assert asyncio.run(scenario()) == 7
+
+
+def test_stop_flushes_pending_without_running_task(database_url):
+    async def scenario():
+        engine = create_async_engine(database_url)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        buffer = ViewCountBuffer(sessions, flush_interval=60, max_pending=100)
+        async with sessions() as db:
+            view_count = await buffer.add("page_view", ViewCountRepository(db), amount=3)
+        assert view_count.count == 3
+        assert await persisted(engine, "page_view") == 0
+        await buffer.stop()
+        total = await persisted(engine, "page_view")
+        await engine.dispose()
+        return total
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_failed_flush_keeps_deltas_for_the_next_one(database_url):
+    async def scenario():
+        engine = create_async_engine(database_url)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        buffer = ViewCountBuffer(sessions, flush_interval=60, max_pending=100)
+        async with sessions() as db:
+            await buffer.add("page_view", ViewCountRepository(db), amount=4)
+
+        failing = slow_commit_sessions(engine, 0, [])
+
+        def broken():
+            session = failing()
+
+            async def commit():
+                raise RuntimeError("database went away")
+
+            session.commit = commit
+            return session
+
+        buffer._session_factory = broken
+        try:
+            await buffer.flush()
+        except RuntimeError:
+            pass
+        assert buffer.merge(None, "page_view").count == 4
+
+        buffer._session_factory = sessions
+        assert await buffer.flush() == 4
+        total = await persisted(engine, "page_view")
+        await engine.dispose()
+        return total
+
+    assert asyncio.run(scenario()) == 4
+
+
+def test_overlapping_flushes_write_each_increment_once(database_url):
+    async def scenario():
+        engine = create_async_engine(database_url)
+        commits = []
+        sessions = slow_commit_sessions(engine, 0.2, commits)
+        buffer = ViewCountBuffer(sessions, flush_interval=60, max_pending=5)
+        async with sessions() as db:
+            repository = ViewCountRepository(db)
+            await buffer.add("page_view", repository, amount=3)
+            periodic = asyncio.create_task(buffer.flush())
+            while not commits:
+                await asyncio.sleep(0.01)
+            # Reaching max_pending flushes inline while the first flush is still awaiting its write
+            await buffer.add("page_view", repository, amount=5)
+            await buffer.add("signup", repository, amount=1)
+            await asyncio.gather(periodic, buffer.flush())
+        assert buffer.merge(None, "page_view") is None
+        totals = await persisted(engine, "page_view"), await persisted(engine, "signup")
+        await engine.dispose()
+        return totals
+
+    assert asyncio.run(scenario()) == (8, 1)
@@ -0,0 +1,197 @@
+"""
+View count repository tests
+Atomic increments under concurrency, totals over shards, and compaction into shard 0
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import upsert_dialect
+from app.models.view_count import ViewCount
+from app.repositories import view_count_repository
+from app.repositories.view_count_repository import ViewCountRepository
+
+MODES = ["orm", "atomic"]
+
+
+def run(database_url, scenario):
+    """Run scenario(sessions, statements) on a fresh engine; statements lists every SQL statement sent"""
+    async def main():
+        engine = create_async_engine(database_url)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        try:
+            return await scenario(async_sessionmaker(engine, expire_on_commit=False), statements)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def shard_rows(sessions, event_type="page_view"):
+    """{shard: count} as stored"""
+    async with sessions() as db:
+        rows = (await db.execute(select(ViewCount).where(ViewCount.event_type == event_type))).scalars().all()
+        return {row.shard: row.count for row in rows}
+
+
+async def seed(sessions, counts, event_type="page_view"):
+    async with sessions() as db:
+        db.add_all(ViewCount(event_type=event_type, shard=shard, count=count) for shard, count in counts.items())
+        await db.commit()
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_sharded_increment_returns_the_total_from_one_query(database_url, mode):
+    async def scenario(sessions, statements):
+        await seed(sessions, {0: 10, 1: 20, 2: 30, 7: 5})
+        async with sessions() as db:
+            repository = ViewCountRepository(db, increment_mode=mode, shards=4)
+            totals = []
+            for _ in range(20):
+                statements.clear()
+                totals.append((await repository.increment("page_view", amount=2)).count)
+                selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+                # The ORM path reads the shards once and refreshes the written row; no SUM round trip
+                assert len(selects) <= (2 if mode == "orm" else 0)
+            total = (await repository.get_by_event_type("page_view")).count
+        return totals, total, await shard_rows(sessions)
+
+    totals, total, rows = run(database_url, scenario)
+    assert totals == list(range(67, 67 + 40, 2))
+    assert total == 105
+    assert sum(rows.values()) == 105
+    assert set(rows) <= {0, 1, 2, 3, 7}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_unsharded_increment_writes_shard_zero(database_url, mode):
+    async def scenario(sessions, statements):
+        async with sessions() as db:
+            repository = ViewCountRepository(db, increment_mode=mode, shards=1)
+            counts = [(await repository.increment("page_view")).count for _ in range(3)]
+        return counts, await shard_rows(sessions)
+
+    assert run(database_url, scenario) == ([1, 2, 3], {0: 3})
+
+
+def test_get_all_counts_sums_shards(database_url):
+    async def scenario(sessions, statements):
+        await seed(sessions, {0: 1, 1: 2, 3: 4})
+        await seed(sessions, {2: 7}, event_type="stats_calculated")
+        async with sessions() as db:
+            counts = await ViewCountRepository(db, shards=4).get_all_counts()
+        return {row.event_type: row.count for row in counts}
+
+    assert run(database_url, scenario) == {"page_view": 7, "stats_calculated": 7}
+
+
+def test_compact_folds_and_deletes_every_shard_row(database_url):
+    async def scenario(sessions, statements):
+        # Shards 5 and 6 are left over from a larger VIEW_COUNT_SHARDS; 6 and 2 hold zero
+        await seed(sessions, {0: 10, 1: 3, 2: 0, 5: 4, 6: 0})
+        await seed(sessions, {1: 2, 3: 0}, event_type="stats_calculated")
+        await seed(sessions, {0: 9}, event_type="signup")
+        async with sessions() as db:
+            repository = ViewCountRepository(db, shards=4)
+            folded = await repository.compact()
+            again = await repository.compact()
+        return (
+            folded, again,
+            await shard_rows(sessions), await shard_rows(sessions, "stats_calculated"), await shard_rows(sessions, "signup"),
+        )
+
+    folded, again, page_views, stats, signups = run(database_url, scenario)
+    assert folded == 6
+    assert again == 0
+    assert page_views == {0: 17}
+    assert stats == {0: 2}
+    assert signups == {0: 9}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_increments_after_compaction_keep_the_total(database_url, mode):
+    async def scenario(sessions, statements):
+        async with sessions() as db:
+            repository = ViewCountRepository(db, increment_mode=mode, shards=4)
+            for _ in range(12):
+                await repository.increment("page_view")
+            await repository.compact()
+            after = [(await repository.increment("page_view")).count for _ in range(8)]
+        return after, await shard_rows(sessions)
+
+    after, rows = run(database_url, scenario)
+    assert after == list(range(13, 21))
+    assert sum(rows.values()) == 20
+
+
+async def increment_concurrently(sessions, count, mode="atomic", shards=1, event_type="page_view"):
+    """`count` increments at once, each in its own session, like requests on separate workers"""
+    async def one():
+        async with sessions() as db:
+            return (await ViewCountRepository(db, increment_mode=mode, shards=shards).increment(event_type)).count
+
+    return await asyncio.gather(*(one() for _ in range(count)))
+
+
+def test_concurrent_first_inserts_create_one_row(database_url):
+    async def scenario(sessions, statements):
+        # Every increment finds no row for a new event type, so all of them race to insert it
+        returned = await increment_concurrently(sessions, 40, event_type="signup")
+        upserts = [sql for sql in statements if sql.lstrip().upper().startswith("INSERT")]
+        return returned, upserts, await shard_rows(sessions, "signup")
+
+    returned, upserts, rows = run(database_url, scenario)
+    assert rows == {0: 40}
+    assert sorted(returned) == list(range(1, 41))
+    assert len(upserts) == 40
+    assert all("ON CONFLICT (event_type, shard) DO UPDATE" in sql for sql in upserts)
+
+
+def test_concurrent_increments_lose_nothing(database_url):
+    async def scenario(sessions, statements):
+        await seed(sessions, {0: 100})
+        returned = await increment_concurrently(sessions, 50)
+        return returned, await shard_rows(sessions)
+
+    returned, rows = run(database_url, scenario)
+    assert rows == {0: 150}
+    assert sorted(returned) == list(range(101, 151))
+
+
+def test_concurrent_sharded_increments_lose_nothing(database_url):
+    async def scenario(sessions, statements):
+        returned = await increment_concurrently(sessions, 50, shards=4)
+        return returned, await shard_rows(sessions)
+
+    returned, rows = run(database_url, scenario)
+    assert sum(rows.values()) == 50
+    assert set(rows) <= {0, 1, 2, 3}
+    assert max(returned) == 50
+
+
+def test_sqlite_uses_its_own_upsert_dialect(database_url):
+    async def scenario(sessions, statements):
+        async with sessions() as db:
+            return upsert_dialect(db)
+
+    assert run(database_url, scenario) is sqlite
+
+
+def test_atomic_mode_falls_back_to_orm_without_upsert_support(database_url, monkeypatch):
+    monkeypatch.setattr(view_count_repository, "upsert_dialect", lambda db: None)
+
+    async def scenario(sessions, statements):
+        async with sessions() as db:
+            repository = ViewCountRepository(db, increment_mode="atomic", shards=1)
+            counts = [(await repository.increment("page_view")).count for _ in range(3)]
+        on_conflict = [sql for sql in statements if "ON CONFLICT" in sql]
+        return counts, on_conflict, await shard_rows(sessions)
+
+    counts, on_conflict, rows = run(database_url, scenario)
+    assert counts == [1, 2, 3]
+    assert on_conflict == []
+    assert rows == {0: 3}
@@ -0,0 +1,161 @@
+"""
+Shared view count tests
+Exact counts across processes, persisted-count loading, flushing and leader election
+"""
+import asyncio
+import multiprocessing
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.shared_counters import MAX_KEY_BYTES, SharedCounterTable
+from app.models.view_count import ViewCount
+from app.repositories.view_count_repository import ViewCountRepository
+from app.services.view_count_shared import SharedViewCounts
+
+
+def add_many(path: str, adds: int, start) -> None:
+    """Forked writer: add to two keys once every writer is ready"""
+    table = SharedCounterTable(path)
+    start.wait()
+    for n in range(adds):
+        table.add("page_view")
+        if n % 2:
+            table.add(f"key-{n % 7}")
+    table.close()
+
+
+def test_concurrent_processes_lose_no_increments(tmp_path):
+    path = str(tmp_path / "counters")
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    writers = [context.Process(target=add_many, args=(path, 2000, start)) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    start.set()
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+
+    table = SharedCounterTable(path)
+    assert table.get("page_view")[0] == 8000
+    assert sum(table.get(key)[0] for key in table.keys() if key.startswith("key-")) == 4000
+    assert len(table.keys()) == 8  # Slots claimed concurrently are not duplicated
+    table.close()
+
+
+def test_table_limits(tmp_path):
+    table = SharedCounterTable(str(tmp_path / "counters"), slots=2)
+    table.add("a")
+    table.add("b")
+    with pytest.raises(ValueError, match="slots"):
+        table.add("c")
+    with pytest.raises(ValueError, match="longer than"):
+        table.add("x" * (MAX_KEY_BYTES + 1))
+    assert table.get("x" * (MAX_KEY_BYTES + 1)) is None
+    table.close()
+
+    with pytest.raises(RuntimeError, match="not a counter table with 4 slots"):
+        SharedCounterTable(str(tmp_path / "counters"), slots=4).get("a")
+
+
+def test_first_load_wins(tmp_path):
+    table = SharedCounterTable(str(tmp_path / "counters"))
+    table.add("page_view", 3)
+    table.load("page_view", 10, 0.0)
+    table.load("page_view", 99, 0.0)
+    assert table.get("page_view")[0] == 13
+    assert table.pending("page_view") == 3
+    table.mark_flushed("page_view", 3, 13)
+    assert table.get("page_view")[0] == 13
+    assert table.pending("page_view") == 0
+    table.close()
+
+
+async def persisted(sessions, event_type: str) -> int:
+    async with sessions() as db:
+        return (await db.execute(
+            select(func.coalesce(func.sum(ViewCount.count), 0)).where(ViewCount.event_type == event_type)
+        )).scalar()
+
+
+def counters(tmp_path, sessions, flush_interval: float = 60) -> SharedViewCounts:
+    path = str(tmp_path / "counters")
+    return SharedViewCounts(SharedCounterTable(path), sessions, flush_interval, leader_path=f"{path}.leader")
+
+
+def test_add_get_counts_and_flush(tmp_path, database_url):
+    async def scenario():
+        engine = create_async_engine(database_url)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            await ViewCountRepository(db).increment("page_view", 10)
+        shared = counters(tmp_path, sessions)
+
+        async with sessions() as db:
+            repository = ViewCountRepository(db)
+            assert (await shared.add("page_view", repository)).count == 11
+            assert (await shared.add("page_view", repository, amount=4)).count == 15
+            assert await shared.get("stats_calculated", repository) is None
+            assert await shared.get_counts(["page_view", "stats_calculated"], repository) == {
+                "page_view": 15, "stats_calculated": 0
+            }
+        assert await persisted(sessions, "page_view") == 10
+
+        assert shared._try_lead()
+        assert await shared.flush() == 5
+        assert await shared.flush() == 0
+        total = await persisted(sessions, "page_view")
+        shared._resign()
+        shared.table.close()
+        await engine.dispose()
+        return total
+
+    assert asyncio.run(scenario()) == 15
+
+
+def test_one_leader_at_a_time(tmp_path):
+    first = counters(tmp_path, None)
+    second = counters(tmp_path, None)
+    assert first._try_lead()
+    assert not second._try_lead()
+    assert first.leader and not second.leader
+    first._resign()
+    assert second._try_lead()
+    second._resign()
+
+
+def test_stop_during_flush_writes_each_increment_once(tmp_path, database_url):
+    async def scenario():
+        engine = create_async_engine(database_url)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        committed = []
+
+        def slow_sessions():
+            # Commits return 0.2 s after committing, so stop() lands between commit and mark_flushed
+            session = sessionmaker()
+            commit = session.commit
+
+            async def slow_commit():
+                await commit()
+                committed.append(1)
+                await asyncio.sleep(0.2)
+
+            session.commit = slow_commit
+            return session
+
+        shared = counters(tmp_path, slow_sessions, flush_interval=0.05)
+        async with sessionmaker() as db:
+            await shared.add("page_view", ViewCountRepository(db), amount=5)
+        shared.start()
+        while not committed:
+            await asyncio.sleep(0.01)
+        await shared.stop()
+        total = await persisted(sessionmaker, "page_view")
+        await engine.dispose()
+        return total, shared.leader
+
+    total, leader = asyncio.run(scenario())
+    assert total == 5
+    assert not leader
@@ -0,0 +1,229 @@
+"""
+View count time series tests
+Range bounds may carry a UTC offset, and rollups and retention keep every total
+"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import get_db
+from app.main import app
+from app.models.view_count_bucket import ViewCountMinute, ViewCountHour, ViewCountDay
+from app.repositories.view_count_bucket_repository import ViewCountBucketRepository
+from app.services import view_count_timeseries_service
+from app.services.view_count_timeseries_service import ViewCountRollup, settings
+
+
+def get_series(database_url: str, params: dict) -> httpx.Response:
+    """Record two minute buckets, then query the series endpoint on the given database"""
+    async def scenario():
+        engine = create_async_engine(database_url)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            repository = ViewCountBucketRepository(db)
+            await repository.record("page_view", 2, datetime(2026, 3, 1, 0, 30))
+            await repository.record("page_view", 5, datetime(2026, 3, 1, 2, 10))
+            await db.commit()
+
+        async def session_override():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = session_override
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/api/v1/views/timeseries/page_view", params=params)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await engine.dispose()
+
+    return asyncio.run(scenario())
+
+
+def test_naive_bounds_are_utc(database_url):
+    response = get_series(database_url, {
+        "granularity": "minute", "start": "2026-03-01T00:00:00", "end": "2026-03-01T01:00:00"
+    })
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+
+
+def test_offset_bounds_are_converted_to_utc(database_url):
+    # 09:00-12:00 in UTC+9 is 00:00-03:00 UTC
+    response = get_series(database_url, {
+        "granularity": "minute", "start": "2026-03-01T09:00:00+09:00", "end": "2026-03-01T12:00:00+09:00"
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 7
+    assert body["start"].startswith("2026-03-01T00:00:00")
+    assert [point["bucket_start"] for point in body["points"]] == ["2026-03-01T00:30:00", "2026-03-01T02:10:00"]
+
+
+def test_mixed_bounds(database_url):
+    response = get_series(database_url, {
+        "granularity": "minute", "start": "2026-03-01T01:00:00Z", "end": "2026-03-01T03:00:00"
+    })
+    assert response.status_code == 200
+    assert response.json()["total"] == 5
+
+
+def test_inverted_range_is_rejected(database_url):
+    response = get_series(database_url, {
+        "granularity": "minute", "start": "2026-03-01T03:00:00+00:00", "end": "2026-03-01T09:00:00+09:00"
+    })
+    assert response.status_code == 400
+
+
+# (event type, UTC minute, count) across hours and a day boundary
+EVENTS = [
+    ("page_view", datetime(2026, 3, 1, 22, 5), 3),
+    ("page_view", datetime(2026, 3, 1, 22, 59), 4),
+    ("page_view", datetime(2026, 3, 1, 23, 0), 1),
+    ("page_view", datetime(2026, 3, 2, 0, 15), 6),
+    ("page_view", datetime(2026, 3, 2, 0, 15, 40), 2),
+    ("page_view", datetime(2026, 3, 2, 5, 30), 5),
+    ("stats_calculated", datetime(2026, 3, 1, 23, 45), 7),
+    ("stats_calculated", datetime(2026, 3, 2, 0, 1), 8),
+]
+
+
+def run_buckets(database_url, scenario):
+    async def main():
+        engine = create_async_engine(database_url)
+        try:
+            return await scenario(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def record(sessions, events):
+    async with sessions() as db:
+        repository = ViewCountBucketRepository(db)
+        for event_type, at, amount in events:
+            await repository.record(event_type, amount, at)
+        await db.commit()
+
+
+async def buckets(sessions, model):
+    """{(event_type, bucket_start): count} for one granularity"""
+    async with sessions() as db:
+        rows = (await db.execute(select(model))).scalars().all()
+        return {(row.event_type, row.bucket_start): row.count for row in rows}
+
+
+def totals(rows):
+    by_type = defaultdict(int)
+    for (event_type, _), count in rows.items():
+        by_type[event_type] += count
+    return dict(by_type)
+
+
+def test_rollup_preserves_totals(database_url):
+    async def scenario(sessions):
+        await record(sessions, EVENTS)
+        async with sessions() as db:
+            written = await ViewCountBucketRepository(db).rollup(datetime(2026, 3, 1, 22, 30))
+        return written, await buckets(sessions, ViewCountMinute), await buckets(sessions, ViewCountHour), \
+            await buckets(sessions, ViewCountDay)
+
+    written, minutes, hours, days = run_buckets(database_url, scenario)
+    assert totals(minutes) == totals(hours) == totals(days) == {"page_view": 21, "stats_calculated": 15}
+    assert hours == {
+        ("page_view", datetime(2026, 3, 1, 22)): 7,
+        ("page_view", datetime(2026, 3, 1, 23)): 1,
+        ("page_view", datetime(2026, 3, 2, 0)): 8,
+        ("page_view", datetime(2026, 3, 2, 5)): 5,
+        ("stats_calculated", datetime(2026, 3, 1, 23)): 7,
+        ("stats_calculated", datetime(2026, 3, 2, 0)): 8,
+    }
+    assert days == {
+        ("page_view", datetime(2026, 3, 1)): 8,
+        ("page_view", datetime(2026, 3, 2)): 13,
+        ("stats_calculated", datetime(2026, 3, 1)): 7,
+        ("stats_calculated", datetime(2026, 3, 2)): 8,
+    }
+    assert written == len(hours) + len(days)
+
+
+def test_rollup_is_idempotent(database_url):
+    async def scenario(sessions):
+        await record(sessions, EVENTS)
+        snapshots = []
+        for since in [datetime(2026, 3, 1), datetime(2026, 3, 1), datetime(2026, 3, 2, 0, 30)]:
+            async with sessions() as db:
+                await ViewCountBucketRepository(db).rollup(since)
+            snapshots.append((await buckets(sessions, ViewCountHour), await buckets(sessions, ViewCountDay)))
+
+        # Late events are picked up by the next run without double counting earlier ones
+        await record(sessions, [("page_view", datetime(2026, 3, 2, 5, 45), 10)])
+        async with sessions() as db:
+            await ViewCountBucketRepository(db).rollup(datetime(2026, 3, 2, 5, 40))
+        return snapshots, await buckets(sessions, ViewCountHour), await buckets(sessions, ViewCountDay)
+
+    snapshots, hours, days = run_buckets(database_url, scenario)
+    assert snapshots[0] == snapshots[1] == snapshots[2]
+    assert hours[("page_view", datetime(2026, 3, 2, 5))] == 15
+    assert days[("page_view", datetime(2026, 3, 2))] == 23
+    assert days[("page_view", datetime(2026, 3, 1))] == 8
+    assert totals(hours) == totals(days) == {"page_view": 31, "stats_calculated": 15}
+
+
+def test_purge_keeps_rolled_up_buckets(database_url):
+    async def scenario(sessions):
+        await record(sessions, EVENTS)
+        async with sessions() as db:
+            repository = ViewCountBucketRepository(db)
+            await repository.rollup(datetime(2026, 3, 1))
+            deleted = await repository.purge(
+                minutes_before=datetime(2026, 3, 2, 0, 10),
+                hours_before=datetime(2026, 3, 2)
+            )
+        return deleted, await buckets(sessions, ViewCountMinute), await buckets(sessions, ViewCountHour), \
+            await buckets(sessions, ViewCountDay)
+
+    deleted, minutes, hours, days = run_buckets(database_url, scenario)
+    assert deleted == 5 + 3
+    assert minutes == {("page_view", datetime(2026, 3, 2, 0, 15)): 8, ("page_view", datetime(2026, 3, 2, 5, 30)): 5}
+    assert set(hours) == {("page_view", datetime(2026, 3, 2, 0)), ("page_view", datetime(2026, 3, 2, 5)),
+                          ("stats_calculated", datetime(2026, 3, 2, 0))}
+    assert totals(days) == {"page_view": 21, "stats_calculated": 15}
+
+
+def test_rollup_job_does_not_rebuild_hours_from_purged_minutes(database_url, monkeypatch):
+    now = datetime.utcnow()
+    retention = settings.VIEW_COUNT_MINUTE_RETENTION_HOURS
+    # Minutes on both sides of the retention cutoff, the nearest ones in the hour the cutoff falls in
+    events = [
+        ("page_view", now - timedelta(hours=retention, minutes=30), 4),
+        ("page_view", now - timedelta(hours=retention, minutes=1), 3),
+        ("page_view", now - timedelta(hours=retention) + timedelta(minutes=1), 5),
+        ("page_view", now - timedelta(hours=retention - 1), 2),
+        ("page_view", now - timedelta(minutes=5), 1),
+    ]
+
+    async def scenario(sessions):
+        monkeypatch.setattr(view_count_timeseries_service, "SessionLocal", sessions)
+        await record(sessions, events)
+        async with sessions() as db:
+            await ViewCountBucketRepository(db).rollup(now - timedelta(days=3))
+        before = await buckets(sessions, ViewCountHour), await buckets(sessions, ViewCountDay)
+
+        job = ViewCountRollup()
+        await job.run()  # First run after startup: rebuilds and purges old minutes
+        await job.run()
+        await ViewCountRollup().run()  # As after a restart
+        after = await buckets(sessions, ViewCountHour), await buckets(sessions, ViewCountDay)
+        return before, after, await buckets(sessions, ViewCountMinute)
+
+    before, after, minutes = run_buckets(database_url, scenario)
+    assert after == before
+    assert totals(after[0]) == totals(after[1]) == {"page_view": 15}
+    assert totals(minutes) == {"page_view": 8}
@@ -28,18 +28,18 @@ export const apiService = {
 
   /**
    * Calculates life statistics based on birthdate
+   * Uses GET so the browser and proxy can cache the result until midnight
    * @param birthdate - User's birthdate information
    * @returns Promise resolving to calculated life statistics
    * @throws Error if calculation fails or invalid data provided
    */
   async calculateStats(birthdate: Birthdate): Promise<LifeStats> {
-    const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.CALCULATE_STATS}`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify(birthdate),
+    const params = new URLSearchParams({
+      year: String(birthdate.year),
+      month: String(birthdate.month),
+      day: String(birthdate.day),
     });
+    const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.CALCULATE_STATS}?${params}`);
 
     if (!response.ok) {
       const error = await response.json();